@@ -3,6 +3,90 @@ import heapq
 import networkx as nx
 from typing import Dict, List, Tuple, Set, Any
 
+# Work counted by OperationCounter, in report order
+OPERATION_COUNTERS = ("heap_pushes", "heap_pops", "stale_pops", "relaxations", "updates",
+                      "iterations", "peak_frontier")
+
+
+class OperationCounter:
+    """
+    Step sink counting the work an algorithm does, optionally forwarding every step.
+
+    The algorithms already report each operation as a step, so counting needs
+    no code in them: pass an OperationCounter as ``steps`` and nothing runs
+    when it isn't used. Counts:
+
+    - heap_pushes / heap_pops: priority-queue operations (Dijkstra; the source push is implied)
+    - stale_pops: pops of already settled nodes
+    - relaxations: edges examined (check_neighbor / check_edge)
+    - updates: relaxations that improved a distance
+    - iterations: nodes settled (Dijkstra) or passes over the edges (Bellman-Ford)
+    - peak_frontier: largest heap (Dijkstra) or most nodes improved in one pass (Bellman-Ford)
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        self.stale_pops = 0
+        self.relaxations = 0
+        self.updates = 0
+        self.iterations = 0
+        self.peak_frontier = 0
+        self._frontier = 0
+        self._heap = False
+        self._pass_updated = set()
+
+    @classmethod
+    def from_steps(cls, steps):
+        """Count an already recorded step sequence."""
+        counter = cls()
+        for step in steps:
+            counter.append(step)
+        return counter
+
+    def append(self, step):
+        kind = step[0]
+        if kind == "check_neighbor" or kind == "check_edge":
+            self.relaxations += 1
+        elif kind == "update":
+            self.updates += 1
+            if self._heap:
+                self.heap_pushes += 1
+                self._frontier += 1
+                if self._frontier > self.peak_frontier:
+                    self.peak_frontier = self._frontier
+            else:
+                self._pass_updated.add(step[1])
+                if len(self._pass_updated) > self.peak_frontier:
+                    self.peak_frontier = len(self._pass_updated)
+        elif kind == "examine":
+            if not self._heap:
+                # The heap starts out holding the source
+                self._heap = True
+                self.heap_pushes = self._frontier = self.peak_frontier = 1
+            self.heap_pops += 1
+            self._frontier -= 1
+        elif kind == "visit":
+            self.iterations += 1
+        elif kind == "skip":
+            self.stale_pops += 1
+        elif kind == "iteration":
+            self.iterations += 1
+            self._pass_updated = set()
+        if self.sink is not None:
+            self.sink.append(step)
+
+    def counts(self):
+        """Dictionary of OPERATION_COUNTERS -> count."""
+        return {name: getattr(self, name) for name in OPERATION_COUNTERS}
+
+
+def format_operation_counts(counts):
+    """One-line summary of OperationCounter.counts(), skipping counters that don't apply (zero)."""
+    parts = [f"{name.replace('_', ' ')}: {counts[name]:,}" for name in OPERATION_COUNTERS if counts.get(name)]
+    return "Operations: " + (", ".join(parts) if parts else "none")
+
 
 class PathAlgorithms:
     """
@@ -10,7 +94,7 @@ class PathAlgorithms:
     """
 
     @staticmethod
-    def dijkstra(G, source, target, weight='length') -> Tuple[Dict, Dict, List[Tuple]]:
+    def dijkstra(G, source, target, weight='length', steps=None) -> Tuple[Dict, Dict, List[Tuple]]:
         """
         Implementation of Dijkstra's algorithm with step-by-step tracking.
 
@@ -19,12 +103,14 @@ class PathAlgorithms:
             source: Source node
             target: Target node
             weight: Edge weight attribute
+            steps: Optional sink for the steps (anything with ``append``, e.g. a TraceWriter);
+                a new list by default
 
         Returns:
             Tuple containing:
                 - dist: Dictionary of shortest distances
                 - prev: Dictionary of predecessors
-                - steps: List of algorithm steps for visualization
+                - steps: List of algorithm steps for visualization (or the given sink)
         """
         # Initialize
         dist = {node: float('infinity') for node in G.nodes()}
@@ -36,7 +122,8 @@ class PathAlgorithms:
         visited = set()
 
         # Track steps for visualization
-        steps = []
+        if steps is None:
+            steps = []
 
         while pq:
             # Get node with minimum distance
@@ -82,7 +169,7 @@ class PathAlgorithms:
         return dist, prev, steps
 
     @staticmethod
-    def bellman_ford(G, source, target, weight='length') -> Tuple[Dict, Dict, List[Tuple]]:
+    def bellman_ford(G, source, target, weight='length', steps=None) -> Tuple[Dict, Dict, List[Tuple]]:
         """
         Implementation of Bellman-Ford algorithm with step-by-step tracking.
 
@@ -91,12 +178,14 @@ class PathAlgorithms:
             source: Source node
             target: Target node
             weight: Edge weight attribute
+            steps: Optional sink for the steps (anything with ``append``, e.g. a TraceWriter);
+                a new list by default
 
         Returns:
             Tuple containing:
                 - dist: Dictionary of shortest distances
                 - prev: Dictionary of predecessors
-                - steps: List of algorithm steps for visualization
+                - steps: List of algorithm steps for visualization (or the given sink)
         """
         # Initialize
         dist = {node: float('infinity') for node in G.nodes()}
@@ -104,7 +193,8 @@ class PathAlgorithms:
         dist[source] = 0
 
         # Track steps for visualization
-        steps = []
+        if steps is None:
+            steps = []
 
         # Main algorithm
         num_nodes = len(G.nodes())
@@ -165,83 +255,112 @@ class PathAlgorithms:
         return list(reversed(path))
 
     @staticmethod
-    def format_steps_explanation(G, steps: List[Tuple], prev: Dict, source: Any, target: Any) -> str:
+    def format_step(step: Tuple, node_id=None) -> str:
         """
-        Format algorithm steps into human-readable explanation.
+        Format a single algorithm step into human-readable text.
 
         Args:
-            G: NetworkX graph
-            steps: List of algorithm steps
-            prev: Dictionary of predecessors
-            source: Source node
-            target: Target node
+            step: Step tuple as recorded by dijkstra/bellman_ford
+            node_id: Optional callable mapping a node to the ID shown for it (default: the node itself)
 
         Returns:
-            Formatted explanation string
+            Formatted text for the step (ends with a newline, empty for unknown steps)
         """
-        explanation = f"Finding shortest path from Node {source} to Node {target}\n"
-        explanation += "=" * 50 + "\n\n"
+        if node_id is None:
+            def node_id(n):
+                return n
 
-        for step in steps:
-            step_type = step[0]
+        step_type = step[0]
+
+        if step_type == "examine":
+            node, dist = step[1], step[2]
+            return f"Examining Node {node_id(node)} (distance: {dist:.2f})\n"
+
+        elif step_type == "visit":
+            return f"Visiting Node {node_id(step[1])}\n"
+
+        elif step_type == "skip":
+            return f"Skipping already visited Node {node_id(step[1])}\n"
+
+        elif step_type == "check_neighbor":
+            current, neighbor, old_dist, new_dist = step[1], step[2], step[3], step[4]
+            if old_dist == float('infinity'):
+                old_dist_str = "∞"
+            else:
+                old_dist_str = f"{old_dist:.2f}"
+
+            return (f"  Checking neighbor Node {node_id(neighbor)}: current distance = {old_dist_str}, "
+                    f"potential new distance = {new_dist:.2f}\n")
+
+        elif step_type == "update":
+            node, dist, prev_node = step[1], step[2], step[3]
+            return f"  → Updating Node {node_id(node)}: new distance = {dist:.2f}, predecessor = Node {node_id(prev_node)}\n"
+
+        elif step_type == "target_reached":
+            return f"\nTarget Node {node_id(step[1])} reached!\n"
+
+        elif step_type == "iteration":
+            return f"\nIteration {step[1]}:\n"
 
-            if step_type == "examine":
-                node, dist = step[1], step[2]
-                explanation += f"Examining Node {node} (distance: {dist:.2f})\n"
+        elif step_type == "check_edge":
+            u, v, dist_u, dist_v, weight = step[1], step[2], step[3], step[4], step[5]
+            dist_u_str = f"{dist_u:.2f}" if dist_u != float('infinity') else "∞"
+            dist_v_str = f"{dist_v:.2f}" if dist_v != float('infinity') else "∞"
+            return (f"  Checking edge Node {node_id(u)} → Node {node_id(v)}: distance[{node_id(u)}] = {dist_u_str}, "
+                    f"distance[{node_id(v)}] = {dist_v_str}, weight = {weight:.2f}\n")
 
-            elif step_type == "visit":
-                node = step[1]
-                explanation += f"Visiting Node {node}\n"
+        elif step_type == "early_termination":
+            return f"\nNo updates in iteration {step[1]}, algorithm terminating early\n"
 
-            elif step_type == "skip":
-                node = step[1]
-                explanation += f"Skipping already visited Node {node}\n"
+        elif step_type == "negative_cycle":
+            u, v = step[1], step[2]
+            return f"\nNegative cycle detected involving edge Node {node_id(u)} → Node {node_id(v)}\n"
 
-            elif step_type == "check_neighbor":
-                current, neighbor, old_dist, new_dist = step[1], step[2], step[3], step[4]
-                if old_dist == float('infinity'):
-                    old_dist_str = "∞"
-                else:
-                    old_dist_str = f"{old_dist:.2f}"
+        return ""
 
-                explanation += f"  Checking neighbor Node {neighbor}: current distance = {old_dist_str}, "
-                explanation += f"potential new distance = {new_dist:.2f}\n"
+    @staticmethod
+    def iter_steps_explanation(G, steps: List[Tuple], prev: Dict, source: Any, target: Any,
+                               start: int = 0, stop: int = None):
+        """
+        Lazily format algorithm steps, one chunk of text per step.
 
-            elif step_type == "update":
-                node, dist, prev_node = step[1], step[2], step[3]
-                explanation += f"  → Updating Node {node}: new distance = {dist:.2f}, predecessor = Node {prev_node}\n"
+        Only the steps in ``steps[start:stop]`` are formatted; the header is
+        yielded when ``start`` is 0 and the final path summary when the range
+        reaches the last step, so joining every chunk of the full range gives
+        the complete explanation without holding it in memory.
 
-            elif step_type == "target_reached":
-                node = step[1]
-                explanation += f"\nTarget Node {node} reached!\n"
+        Args:
+            G: NetworkX graph
+            steps: List of algorithm steps
+            prev: Dictionary of predecessors
+            source: Source node
+            target: Target node
+            start: Index of the first step to format
+            stop: Index after the last step to format (default: all steps)
 
-            elif step_type == "iteration":
-                iteration = step[1]
-                explanation += f"\nIteration {iteration}:\n"
+        Yields:
+            Formatted text chunks
+        """
+        if stop is None or stop > len(steps):
+            stop = len(steps)
 
-            elif step_type == "check_edge":
-                u, v, dist_u, dist_v, weight = step[1], step[2], step[3], step[4], step[5]
-                dist_u_str = f"{dist_u:.2f}" if dist_u != float('infinity') else "∞"
-                dist_v_str = f"{dist_v:.2f}" if dist_v != float('infinity') else "∞"
-                explanation += f"  Checking edge Node {u} → Node {v}: distance[{u}] = {dist_u_str}, "
-                explanation += f"distance[{v}] = {dist_v_str}, weight = {weight:.2f}\n"
+        if start == 0:
+            yield f"Finding shortest path from Node {source} to Node {target}\n"
+            yield "=" * 50 + "\n\n"
 
-            elif step_type == "early_termination":
-                iteration = step[1]
-                explanation += f"\nNo updates in iteration {iteration}, algorithm terminating early\n"
+        for i in range(start, stop):
+            yield PathAlgorithms.format_step(steps[i])
 
-            elif step_type == "negative_cycle":
-                u, v = step[1], step[2]
-                explanation += f"\nNegative cycle detected involving edge Node {u} → Node {v}\n"
+        if stop < len(steps):
+            return
 
         # Construct final path
         path = PathAlgorithms.reconstruct_path(prev, source, target)
 
-        explanation += "\n" + "=" * 50 + "\n"
+        yield "\n" + "=" * 50 + "\n"
         if path:
-            explanation += "Final shortest path:\n"
-            path_str = " → ".join([f"Node {node}" for node in path])
-            explanation += path_str + "\n"
+            yield "Final shortest path:\n"
+            yield " → ".join([f"Node {node}" for node in path]) + "\n"
 
             # Calculate total distance
             total_dist = 0
@@ -251,8 +370,23 @@ class PathAlgorithms:
                 weight = edge_data.get('length', 1.0)
                 total_dist += weight
 
-            explanation += f"Total distance: {total_dist:.2f}\n"
+            yield f"Total distance: {total_dist:.2f}\n"
         else:
-            explanation += "No path found!\n"
+            yield "No path found!\n"
+
+    @staticmethod
+    def format_steps_explanation(G, steps: List[Tuple], prev: Dict, source: Any, target: Any) -> str:
+        """
+        Format algorithm steps into human-readable explanation.
+
+        Args:
+            G: NetworkX graph
+            steps: List of algorithm steps
+            prev: Dictionary of predecessors
+            source: Source node
+            target: Target node
 
-        return explanation
\ No newline at end of file
+        Returns:
+            Formatted explanation string
+        """
+        return "".join(PathAlgorithms.iter_steps_explanation(G, steps, prev, source, target))
@@ -1,18 +1,18 @@
+import argparse
 import heapq
-import time
-import sys
 import random
-from turtledemo.forest import start
+import statistics
+import time
 
-import matplotlib.pyplot as plt
-from networkx.classes import edges
+DEFAULT_SIZES = (5, 10, 15, 20, 25)  # complete-graph sizes compared by main()
+DEFAULT_REPEAT = 5
+DEFAULT_PLOT = "performance.png"
 
 
 def dijkstra(graph, start):
     distances = {node: float('inf') for node in graph}
     distances[start] = 0
     priority_queue = [(0, start)]
-    space_complexity = sys.getsizeof(distances) + sys.getsizeof(priority_queue)
 
     while priority_queue:
         current_distance, current_node = heapq.heappop(priority_queue)
@@ -24,28 +24,25 @@ def dijkstra(graph, start):
             if distance < distances[neighbor]:
                 distances[neighbor] = distance
                 heapq.heappush(priority_queue, (distance, neighbor))
-                space_complexity += sys.getsizeof(priority_queue)
 
-    return distances, space_complexity
+    return distances
 
 
 def bellman_ford(edges, vertices, start):
 
     distances = {vertex: float('inf') for vertex in vertices}
     distances[start] = 0
-    space_complexity = sys.getsizeof(distances) + sys.getsizeof(edges)
 
     for _ in range(len(vertices) - 1):
         for u, v, weight in edges:
             if distances[u] != float('inf') and distances[u] + weight < distances[v]:
                 distances[v] = distances[u] + weight
-                space_complexity += sys.getsizeof(distances)
 
     for u, v, weight in edges:
         if distances[u] != float('inf') and distances[u] + weight < distances[v]:
             raise ValueError("Graph contains a negative-weight cycle")
 
-    return distances, space_complexity
+    return distances
 
 
 # Generate one shared graph as a list of edges
@@ -67,22 +64,49 @@ def convert_to_adjacency_list(edges, n):
     return graph
 
 
-def plot_performance(nodes_list, times_dijkstra, times_bellman):
-    plt.plot(nodes_list, times_dijkstra, label='Dijkstra', marker='o')
-    plt.plot(nodes_list, times_bellman, label='Bellman-Ford', marker='s')
-    plt.title('Performance Comparison: Dijkstra vs Bellman-Ford')
-    plt.xlabel('Number of Nodes')
-    plt.ylabel('Execution Time (seconds)')
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
-
-
-def main():
-    nodes_list = [5, 10, 15, 20, 25]
+def plot_performance(nodes_list, times_dijkstra, times_bellman, path=DEFAULT_PLOT):
+    """Save the comparison plot to ``path`` (format taken from the extension); needs no display."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.plot(nodes_list, times_dijkstra, label='Dijkstra', marker='o')
+    ax.plot(nodes_list, times_bellman, label='Bellman-Ford', marker='s')
+    ax.set_title('Performance Comparison: Dijkstra vs Bellman-Ford')
+    ax.set_xlabel('Number of Nodes')
+    ax.set_ylabel('Execution Time (seconds)')
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def _median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    from Main.memory_profile import measure_memory
+
+    parser = argparse.ArgumentParser(prog="python -m Main.DijsktraANDBellmanFord",
+                                     description="Dijkstra vs Bellman-Ford on random complete graphs")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="node counts")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per size (median kept)")
+    parser.add_argument("--plot", default=DEFAULT_PLOT, help="output image (.png/.svg/.pdf)")
+    parser.add_argument("--no-plot", dest="plot", action="store_const", const=None)
+    args = parser.parse_args(argv)
+
+    nodes_list = args.sizes
     times_dijkstra = []
     times_bellman = []
+    peaks_dijkstra = []
+    peaks_bellman = []
 
     for num_nodes in nodes_list:
         start_node = '0'
@@ -92,23 +116,21 @@ def main():
         graph_dijkstra = convert_to_adjacency_list(shared_edges, num_nodes)
         graph_bellman = shared_edges
 
-        # Dijkstra Timing
-        start_time = time.time()
-        dijkstra(graph_dijkstra, start_node)
-        times_dijkstra.append(time.time() - start_time)
+        times_dijkstra.append(_median_time(lambda: dijkstra(graph_dijkstra, start_node), args.repeat))
+        times_bellman.append(_median_time(lambda: bellman_ford(graph_bellman, vertices, start_node), args.repeat))
 
-        # Bellman-Ford Timing
-        start_time = time.time()
-        bellman_ford(graph_bellman, vertices, start_node)
-        times_bellman.append(time.time() - start_time)
+        # Peak memory, measured in separate runs so tracemalloc doesn't slow the timed ones
+        peaks_dijkstra.append(measure_memory(lambda: dijkstra(graph_dijkstra, start_node))[1]["peak_bytes"])
+        peaks_bellman.append(measure_memory(lambda: bellman_ford(graph_bellman, vertices, start_node))[1]["peak_bytes"])
 
     # Print performance results
     print("--- Performance Data ---")
     for i in range(len(nodes_list)):
-        print(f"{nodes_list[i]} nodes -> Dijkstra: {times_dijkstra[i]:.6f}s, Bellman-Ford: {times_bellman[i]:.6f}s")
+        print(f"{nodes_list[i]} nodes -> Dijkstra: {times_dijkstra[i]:.6f}s ({peaks_dijkstra[i] / 1024:.1f} KiB peak), "
+              f"Bellman-Ford: {times_bellman[i]:.6f}s ({peaks_bellman[i] / 1024:.1f} KiB peak)")
 
-    # Plot results
-    plot_performance(nodes_list, times_dijkstra, times_bellman)
+    if args.plot:
+        print(f"Plot saved to {plot_performance(nodes_list, times_dijkstra, times_bellman, args.plot)}")
 
 
 if __name__ == "__main__":
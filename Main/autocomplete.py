@@ -2,21 +2,26 @@
 
 import tkinter as tk
 import customtkinter as ctk
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
 import logging
 import threading
 import sys
+from concurrent.futures import CancelledError
+
+from Main.geocode_cache import MISS, shared_cache
+from Main.geocode_scheduler import PRIORITY_SUGGEST, shared_scheduler
+from Main.performance_metrics import span
 
 # Configure minimal logging
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 class AutocompleteEntry(ctk.CTkEntry):
-    def __init__(self, master=None, debounce_delay=200, **kwargs):
+    def __init__(self, master=None, debounce_delay=200, cache=None, scheduler=None, **kwargs):
         """
         :param master: The parent widget.
         :param debounce_delay: Delay in milliseconds for debouncing geocoding requests.
+        :param cache: GeocodeCache to use (default: the persistent cache shared with LocationHandler).
+        :param scheduler: GeocodeScheduler to send requests through (default: the shared one).
         :param kwargs: Other keyword arguments for the CTkEntry.
         """
         super().__init__(master, **kwargs)
@@ -24,7 +29,7 @@ class AutocompleteEntry(ctk.CTkEntry):
         self.after_id = None
         self.listbox = None
         self.listbox_frame = None
-        self.is_processing = False
+        self.latest_query = None  # Only suggestions for the most recent text are shown
         self.listbox_width = None
         self.location_type = None  # Will be set by the main app
 
@@ -56,21 +61,11 @@ class AutocompleteEntry(ctk.CTkEntry):
         # Current theme (defaults to Dark)
         self.current_theme = "Dark"
 
-        # Configure geolocator with optimized settings
-        self.geolocator = Nominatim(
-            user_agent="ShortestPathFinder/1.0 (robertjhonaracenab@gmail.com)",
-            timeout=3
-        )
-        # Rate limiting to avoid IP bans
-        self.geocode = RateLimiter(
-            self.geolocator.geocode,
-            min_delay_seconds=1.0,
-            max_retries=2,
-            error_wait_seconds=2.0
-        )
+        # Shared rate-limited scheduler; suggestions yield to explicit searches
+        self.scheduler = scheduler if scheduler is not None else shared_scheduler()
 
-        # Cache for geocoding results to reduce API calls
-        self.geocode_cache = {}
+        # Persistent geocoding cache (shared with LocationHandler) to reduce API calls
+        self.geocode_cache = cache if cache is not None else shared_cache()
 
         # Bind events
         self.bind("<KeyRelease>", self.on_key_release)
@@ -106,11 +101,9 @@ class AutocompleteEntry(ctk.CTkEntry):
             self._destroy_listbox()
             return
 
-        if self.is_processing:
-            return
-
+        # A newer query supersedes any suggestion request still waiting in the scheduler
+        self.latest_query = text
         # Use threading to prevent UI freezing
-        self.is_processing = True
         threading.Thread(target=self._fetch_suggestions, args=(text,), daemon=True).start()
 
     def _fetch_suggestions(self, text):
@@ -118,18 +111,25 @@ class AutocompleteEntry(ctk.CTkEntry):
         suggestions = []
         try:
             # Check cache first
-            if text in self.geocode_cache:
-                suggestions = self.geocode_cache[text]
+            cached = self.geocode_cache.get_suggestions(text)
+            if cached is not MISS:
+                suggestions = cached
             else:
                 # Try to get locations
                 try:
-                    locations = self.geocode(
-                        text, exactly_one=False, addressdetails=True, limit=5
-                    )
-                    if locations:
-                        suggestions = [loc.address for loc in locations]
-                        # Cache the results
-                        self.geocode_cache[text] = suggestions
+                    with span("geocode_suggestions", query=text):
+                        locations = self.scheduler.geocode(
+                            text, PRIORITY_SUGGEST, channel=id(self),
+                            exactly_one=False, addressdetails=True, limit=5
+                        )
+                    suggestions = [loc.address for loc in locations or []]
+                    # Cache the results, including "nothing found" (errors raise and skip this)
+                    self.geocode_cache.put_suggestions(text, suggestions)
+                    # A picked suggestion is then searched by its address; seed those lookups
+                    for loc in locations or []:
+                        self.geocode_cache.put_location(loc.address, loc)
+                except CancelledError:
+                    return  # Superseded by a newer query before it was sent
                 except Exception as ex:
                     # Reduce logging verbosity for common errors
                     if "not found" not in str(ex).lower():
@@ -137,6 +137,9 @@ class AutocompleteEntry(ctk.CTkEntry):
         except Exception as ex:
             logging.warning(f"Error in background thread: {str(ex)}")
 
+        if text != self.latest_query:
+            return  # The user has typed on; a newer request will update the list
+
         # Make sure we're still connected to the UI before updating
         try:
             if self.winfo_exists():
@@ -151,8 +154,6 @@ class AutocompleteEntry(ctk.CTkEntry):
             self.show_suggestions(suggestions)
         except Exception as e:
             logging.warning(f"Error showing suggestions: {str(e)}")
-        finally:
-            self.is_processing = False
 
     def detect_theme(self):
         """Detect current theme from appearance mode or parent widget"""
@@ -332,5 +333,5 @@ class AutocompleteEntry(ctk.CTkEntry):
         self.after(200, self._destroy_listbox)
 
     def clear_cache(self):
-        """Clear the geocoding cache"""
-        self.geocode_cache.clear()
\ No newline at end of file
+        """Clear the cached suggestions"""
+        self.geocode_cache.clear("suggestions")
\ No newline at end of file
@@ -0,0 +1,389 @@
+import argparse
+import glob
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+import networkx as nx
+import osmnx as ox
+
+from Main.Algorithms.pathAlgorithms import OPERATION_COUNTERS, OperationCounter, PathAlgorithms
+
+GRAPH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphs")
+ALGORITHMS = {
+    "dijkstra": PathAlgorithms.dijkstra,
+    "bellman_ford": PathAlgorithms.bellman_ford,
+}
+
+DEFAULT_PAIRS = 3     # seeded origin-destination pairs per graph
+DEFAULT_WARMUP = 1    # untimed runs per pair before measuring
+DEFAULT_REPEAT = 5    # timed runs per pair
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 2000
+# Upper node-count bound (exclusive) and label of each size class in the report
+SIZE_BUCKETS = ((1000, "< 1k nodes"), (5000, "1k-5k nodes"), (math.inf, ">= 5k nodes"))
+
+
+class DiscardSteps:
+    """Step sink that drops everything, for timing the algorithms without their trace."""
+
+    def append(self, step):
+        pass
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile (0-100) of an already sorted list."""
+    if not sorted_values:
+        return math.nan
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def bootstrap_ci(samples, stat, confidence=CONFIDENCE, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """Percentile-bootstrap confidence interval of ``stat`` over ``samples``."""
+    if len(samples) < 2:
+        value = stat(samples) if samples else math.nan
+        return value, value
+    rng = random.Random(seed)
+    n = len(samples)
+    estimates = sorted(stat(rng.choices(samples, k=n)) for _ in range(resamples))
+    alpha = (1 - confidence) / 2 * 100
+    return percentile(estimates, alpha), percentile(estimates, 100 - alpha)
+
+
+def summarize(samples, seed=0):
+    """
+    Summary statistics of timing samples (seconds).
+
+    Returns:
+        Dictionary with n, median, p95, mean, min, max and bootstrap confidence
+        intervals for the median and p95
+    """
+    ordered = sorted(samples)
+    median_ci = bootstrap_ci(samples, statistics.median, seed=seed)
+    p95_ci = bootstrap_ci(samples, lambda s: percentile(sorted(s), 95), seed=seed)
+    return {
+        "n": len(samples),
+        "median": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "mean": statistics.fmean(samples) if samples else math.nan,
+        "min": ordered[0] if ordered else math.nan,
+        "max": ordered[-1] if ordered else math.nan,
+        "median_ci": median_ci,
+        "p95_ci": p95_ci,
+    }
+
+
+def size_bucket(num_nodes):
+    for bound, label in SIZE_BUCKETS:
+        if num_nodes < bound:
+            return label
+    return SIZE_BUCKETS[-1][1]
+
+
+def corpus_paths(graph_dir=GRAPH_DIR):
+    return sorted(glob.glob(os.path.join(graph_dir, "*.graphml")))
+
+
+def load_graph(path, weight='length'):
+    """Load a cached graphml the way the app routes on it (simple DiGraph keeping the shortest parallel edge)."""
+    G = ox.load_graphml(path)
+    return ox.convert.to_digraph(G, weight=weight)
+
+
+def sample_od_pairs(G, count, seed=0):
+    """
+    Seeded origin-destination pairs where the destination is reachable.
+
+    Args:
+        G: NetworkX graph
+        count: Number of pairs
+        seed: Random seed (any hashable, e.g. combined with the graph name)
+
+    Returns:
+        List of (source, target) tuples
+    """
+    rng = random.Random(seed)
+    nodes = sorted(G.nodes())
+    pairs = []
+    attempts = 0
+    while len(pairs) < count and attempts < count * 20:
+        attempts += 1
+        source = rng.choice(nodes)
+        reachable = sorted(nx.descendants(G, source))
+        if reachable:
+            pairs.append((source, rng.choice(reachable)))
+    return pairs
+
+
+def time_call(fn, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT):
+    """Run ``fn`` ``warmup`` times untimed, then ``repeat`` times; returns the timings in seconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def benchmark_graph(G, name, algorithms=tuple(ALGORITHMS), pairs=DEFAULT_PAIRS, warmup=DEFAULT_WARMUP,
+                    repeat=DEFAULT_REPEAT, trace=True, seed=0, weight='length', memory=False, counters=False):
+    """
+    Time each algorithm on seeded origin-destination pairs of one graph.
+
+    Args:
+        G: NetworkX graph
+        name: Graph name used in the results and to derive the pair seed
+        algorithms: Names from ALGORITHMS
+        pairs: Number of origin-destination pairs
+        warmup: Untimed runs per pair
+        repeat: Timed runs per pair
+        trace: Record the step trace as the app does; False discards it
+        seed: Base random seed
+        weight: Edge weight attribute
+        memory: Also measure tracemalloc peak/retained bytes (median over pairs) in one
+            extra untimed run per pair, so tracing overhead never skews the timings
+        counters: Also count operations (heap pushes, relaxations, ...; median over
+            pairs) in one extra untimed run per pair
+
+    Returns:
+        List of result dictionaries, one per algorithm, with the raw samples and ``summarize`` fields
+    """
+    od_pairs = sample_od_pairs(G, pairs, seed=f"{seed}:{name}")
+    results = []
+    for algorithm in algorithms:
+        run = ALGORITHMS[algorithm]
+        samples = []
+        peaks, retained = [], []
+        operations = []
+        for source, target in od_pairs:
+            if trace:
+                def fn(source=source, target=target):
+                    return run(G, source, target, weight)
+            else:
+                def fn(source=source, target=target):
+                    return run(G, source, target, weight, steps=DiscardSteps())
+            samples.extend(time_call(fn, warmup, repeat))
+            if memory:
+                from Main.memory_profile import measure_memory
+                _, stats = measure_memory(fn)
+                peaks.append(stats["peak_bytes"])
+                retained.append(stats["retained_bytes"])
+            if counters:
+                counter = OperationCounter()
+                run(G, source, target, weight, steps=counter)
+                operations.append(counter.counts())
+        result = {
+            "graph": name,
+            "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(),
+            "bucket": size_bucket(G.number_of_nodes()),
+            "algorithm": algorithm,
+            "pairs": len(od_pairs),
+            "trace": trace,
+            "samples": samples,
+        }
+        result.update(summarize(samples, seed=seed))
+        if memory and peaks:
+            result["peak_bytes"] = statistics.median(peaks)
+            result["retained_bytes"] = statistics.median(retained)
+        if counters and operations:
+            result["operations"] = {name: statistics.median(counts[name] for counts in operations)
+                                    for name in OPERATION_COUNTERS}
+        results.append(result)
+    return results
+
+
+def run_suite(paths=None, algorithms=tuple(ALGORITHMS), pairs=DEFAULT_PAIRS, warmup=DEFAULT_WARMUP,
+              repeat=DEFAULT_REPEAT, trace=True, seed=0, max_nodes=None, memory=False, graphs=None,
+              counters=False):
+    """
+    Benchmark every graph in ``paths`` (default: the cached graphml corpus), smallest first.
+
+    ``graphs`` adds already-built (name, graph) pairs, e.g. from
+    Main.synthetic_graphs.synthetic_corpus; when given without ``paths`` the
+    graphml corpus is skipped.
+    """
+    if paths is None:
+        paths = corpus_paths() if graphs is None else []
+    candidates = [(os.path.splitext(os.path.basename(path))[0], load_graph(path)) for path in paths]
+    candidates.extend(graphs or [])
+    graphs = [(name, G) for name, G in candidates if max_nodes is None or G.number_of_nodes() <= max_nodes]
+    graphs.sort(key=lambda item: item[1].number_of_nodes())
+
+    results = []
+    for name, G in graphs:
+        results.extend(benchmark_graph(G, name, algorithms, pairs, warmup, repeat, trace, seed,
+                                       memory=memory, counters=counters))
+    return results
+
+
+def summarize_by_bucket(results, seed=0):
+    """Pool samples per (size bucket, algorithm)."""
+    pooled = {}
+    for r in results:
+        entry = pooled.setdefault((r["bucket"], r["algorithm"]), {"graphs": 0, "samples": []})
+        entry["graphs"] += 1
+        entry["samples"].extend(r["samples"])
+    order = {label: i for i, (_, label) in enumerate(SIZE_BUCKETS)}
+    summary = []
+    for (bucket, algorithm), entry in sorted(pooled.items(), key=lambda kv: (order[kv[0][0]], kv[0][1])):
+        row = {"bucket": bucket, "algorithm": algorithm, "graphs": entry["graphs"]}
+        row.update(summarize(entry["samples"], seed=seed))
+        summary.append(row)
+    return summary
+
+
+def _ms(seconds):
+    return f"{seconds * 1e3:9.2f}"
+
+
+def format_operations(results):
+    """Operation counts (median per query) of the results that have them."""
+    lines = [f"{'graph':<50} {'algorithm':<13} " + " ".join(f"{name:>13}" for name in OPERATION_COUNTERS)]
+    for r in results:
+        if "operations" in r:
+            lines.append(f"{r['graph']:<50} {r['algorithm']:<13} "
+                         + " ".join(f"{r['operations'][name]:>13,.0f}" for name in OPERATION_COUNTERS))
+    return "\n".join(lines)
+
+
+def format_results(results, seed=0):
+    """Text report: one row per graph and algorithm, then the size-bucket summary."""
+    with_memory = any("peak_bytes" in r for r in results)
+    header = (f"{'graph':<50} {'nodes':>6} {'edges':>6} {'algorithm':<13} {'median ms':>9} "
+              f"{f'{CONFIDENCE:.0%} CI':>21} {'p95 ms':>9} {f'{CONFIDENCE:.0%} CI':>21}")
+    lines = [header + (f" {'peak MiB':>8} {'kept MiB':>8}" if with_memory else "")]
+    for r in results:
+        line = (f"{r['graph']:<50} {r['nodes']:>6} {r['edges']:>6} {r['algorithm']:<13} "
+                f"{_ms(r['median'])} [{_ms(r['median_ci'][0])}, {_ms(r['median_ci'][1])}] "
+                f"{_ms(r['p95'])} [{_ms(r['p95_ci'][0])}, {_ms(r['p95_ci'][1])}]")
+        if "peak_bytes" in r:
+            line += f" {r['peak_bytes'] / 2 ** 20:8.2f} {r['retained_bytes'] / 2 ** 20:8.2f}"
+        lines.append(line)
+    if any("operations" in r for r in results):
+        lines.append("")
+        lines.append(format_operations(results))
+    lines.append("")
+    lines.append(f"{'size':<14} {'algorithm':<13} {'graphs':>6} {'runs':>5} {'median ms':>9} "
+                 f"{f'{CONFIDENCE:.0%} CI':>21} {'p95 ms':>9}")
+    for row in summarize_by_bucket(results, seed):
+        lines.append(f"{row['bucket']:<14} {row['algorithm']:<13} {row['graphs']:>6} {row['n']:>5} "
+                     f"{_ms(row['median'])} [{_ms(row['median_ci'][0])}, {_ms(row['median_ci'][1])}] "
+                     f"{_ms(row['p95'])}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    from Main.benchmark_report import PLOT_FORMATS
+    from Main.synthetic_graphs import GENERATORS
+
+    parser = argparse.ArgumentParser(prog="python -m Main.benchmark",
+                                     description="Headless shortest-path benchmark")
+    parser.add_argument("--algorithms", nargs="+", choices=tuple(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--cached", action=argparse.BooleanOptionalAction, default=None,
+                        help="benchmark the cached graphml corpus (default: on unless --sizes is given)")
+    parser.add_argument("--graph-dir", default=GRAPH_DIR, help="directory of cached .graphml files")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[],
+                        help="also benchmark synthetic networks of these node counts")
+    parser.add_argument("--kinds", nargs="+", choices=tuple(GENERATORS), default=["grid"],
+                        help="synthetic generators used with --sizes")
+    parser.add_argument("--max-nodes", type=int, help="skip graphs larger than this")
+    parser.add_argument("--pairs", type=int, default=DEFAULT_PAIRS, help="O-D pairs per graph")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="untimed runs per pair")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per pair")
+    parser.add_argument("--no-trace", dest="trace", action="store_false", help="discard the step trace")
+    parser.add_argument("--memory", action="store_true", help="also measure tracemalloc peak/retained memory")
+    parser.add_argument("--counters", action="store_true",
+                        help="also count heap operations, relaxations, updates and iterations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int,
+                        help="run cases in this many isolated worker processes (one case per process)")
+    parser.add_argument("--pin", action="store_true", help="pin each worker to its own CPU (with --workers)")
+    parser.add_argument("--timeout", type=float, help="seconds per case before its worker is killed (with --workers)")
+    parser.add_argument("--output-dir", help="write results.csv, results.json and scaling plots here")
+    parser.add_argument("--formats", nargs="*", choices=PLOT_FORMATS, default=list(PLOT_FORMATS),
+                        help="plot formats (none to skip plots)")
+    parser.add_argument("--store", default=None, help="results store to record the run in")
+    parser.add_argument("--no-store", dest="record", action="store_false", help="do not record the run")
+    parser.add_argument("--label", help="label stored with the run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command-line entry point; never opens a window, so it runs on headless machines.
+
+    Exit status: 0 on success, 1 when parallel cases timed out or failed,
+    2 when no graph matched the selection.
+    """
+    args = parse_args(argv)
+    cached = args.cached if args.cached is not None else not args.sizes
+
+    paths = corpus_paths(args.graph_dir) if cached else []
+
+    print("--- Routing Benchmark ---")
+    print(f"{args.pairs} seeded O-D pairs per graph, {args.warmup} warm-up + {args.repeat} timed runs each")
+    failures = []
+    if args.workers or args.pin or args.timeout:
+        from Main.parallel_benchmark import (corpus_cases, format_failures, run_parallel,
+                                             synthetic_cases)
+        cases = corpus_cases(paths, args.algorithms)
+        cases += synthetic_cases(args.kinds, args.sizes, args.algorithms, seed=args.seed)
+        try:
+            results, failures = run_parallel(cases, args.workers, args.pin, args.timeout, args.pairs,
+                                             args.warmup, args.repeat, args.trace, args.seed,
+                                             args.max_nodes, memory=args.memory, counters=args.counters)
+        except (OSError, ValueError) as e:
+            print(e)
+            return 2
+    else:
+        graphs = None
+        if args.sizes:
+            from Main.synthetic_graphs import synthetic_corpus
+            graphs = synthetic_corpus(args.kinds, args.sizes, seed=args.seed)
+        results = run_suite(paths, args.algorithms, args.pairs, args.warmup, args.repeat, args.trace,
+                            args.seed, args.max_nodes, memory=args.memory, graphs=graphs,
+                            counters=args.counters)
+    if failures:
+        print(f"{len(failures)} case(s) did not finish:")
+        print(format_failures(failures))
+    if not results:
+        print("No graphs matched the selection")
+        return 2
+    print(format_results(results))
+
+    from Main.benchmark_store import DEFAULT_STORE, ResultStore, run_metadata
+    # Everything that shapes the timings; runs are only compared with runs of equal parameters
+    metadata = run_metadata(parameters={
+        "pairs": args.pairs, "warmup": args.warmup, "repeat": args.repeat, "seed": args.seed,
+        "isolated": bool(args.workers or args.pin or args.timeout), "workers": args.workers or 0,
+        "pin": args.pin, "memory": args.memory,
+    })
+    if args.record:
+        store = ResultStore(args.store or DEFAULT_STORE)
+        run_id = store.append_run(results, metadata=metadata, label=args.label)
+        print(f"\nRecorded run {run_id} in {store.path}")
+        print("Check for regressions with: python -m Main.benchmark_store compare")
+
+    if args.output_dir:
+        from Main.benchmark_report import fit_results, write_report
+        for label, fit in fit_results(results).items():
+            if fit and fit["model"]:
+                print(f"{label}: best fit O({fit['model']}), empirical exponent {fit['exponent']:.2f}")
+            elif fit:
+                print(f"{label}: no growth model fits, empirical exponent {fit['exponent']:.2f}")
+        for path in write_report(results, args.output_dir, metadata, args.formats):
+            print(f"Wrote {path}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import csv
+import itertools
+import json
+import math
+import os
+
+from Main.Algorithms.pathAlgorithms import OPERATION_COUNTERS
+
+PLOT_FORMATS = ("png", "svg")
+PLOT_DPI = 150
+
+# Reference growth curves fitted to the medians; x is the node count
+COMPLEXITY_MODELS = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * math.log2(n),
+    "n^2": lambda n: n ** 2,
+    "n^2 log n": lambda n: n ** 2 * math.log2(n),
+    "n^3": lambda n: n ** 3,
+}
+MIN_FIT_SIZES = 3                   # distinct sizes needed before a growth model is named
+MODEL_EXPONENT_RANGE = (0.8, 3.2)   # empirical exponents the models above can explain
+MAX_FIT_LOG_ERROR = 0.35            # rms residual in log(time) beyond which no model is claimed
+
+CSV_FIELDS = ("graph", "nodes", "edges", "bucket", "algorithm", "pairs", "trace", "n",
+              "median", "median_ci_low", "median_ci_high", "p95", "p95_ci_low", "p95_ci_high",
+              "mean", "min", "max", "peak_bytes", "retained_bytes") + OPERATION_COUNTERS
+
+
+def _csv_row(result):
+    row = {k: result.get(k) for k in CSV_FIELDS}
+    row["median_ci_low"], row["median_ci_high"] = result["median_ci"]
+    row["p95_ci_low"], row["p95_ci_high"] = result["p95_ci"]
+    row.update(result.get("operations") or {})
+    return row
+
+
+def write_csv(results, path):
+    """One row per graph and algorithm with the summary statistics (seconds, bytes)."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(_csv_row(result))
+
+
+def write_json(results, path, metadata=None):
+    """Full results including the raw samples, plus run metadata and fitted complexities."""
+    with open(path, "w") as f:
+        json.dump({"metadata": metadata or {}, "fits": fit_results(results), "results": results}, f, indent=2)
+
+
+def _series(results):
+    """(algorithm label) -> sorted [(nodes, median, ci_low, ci_high)] for the scaling plot."""
+    series = {}
+    for r in results:
+        label = r["algorithm"] if r.get("trace", True) else f"{r['algorithm']} (no trace)"
+        series.setdefault(label, []).append((r["nodes"], r["median"], *r["median_ci"]))
+    return {label: sorted(points) for label, points in series.items()}
+
+
+def fit_complexity(sizes, times):
+    """
+    Fit growth models to (size, time) points in log-log space.
+
+    The free fit is a least-squares line through log(time) vs log(size), whose
+    slope is the empirical exponent. Each model in COMPLEXITY_MODELS is fitted
+    as time = c * f(size) with c chosen in log space; the best model is the one
+    with the smallest squared log residual. No model is named (model and
+    coefficient are None) when the exponent lies outside MODEL_EXPONENT_RANGE
+    or even the best model misses the points by more than MAX_FIT_LOG_ERROR.
+
+    Returns:
+        Dictionary with exponent, model, coefficient and rms_log_error, or None
+        when fewer than MIN_FIT_SIZES distinct sizes are given
+    """
+    points = [(n, t) for n, t in zip(sizes, times) if n > 1 and t > 0]
+    if len({n for n, _ in points}) < MIN_FIT_SIZES:
+        return None
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(t) for _, t in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    exponent = (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+                / sum((x - mean_x) ** 2 for x in xs))
+
+    best = None
+    for name, f in COMPLEXITY_MODELS.items():
+        offsets = [y - math.log(f(n)) for (n, _), y in zip(points, ys)]
+        log_c = sum(offsets) / len(offsets)
+        error = math.sqrt(sum((o - log_c) ** 2 for o in offsets) / len(offsets))
+        if best is None or error < best["rms_log_error"]:
+            best = {"model": name, "coefficient": math.exp(log_c), "rms_log_error": error}
+    best["exponent"] = exponent
+    low, high = MODEL_EXPONENT_RANGE
+    if not low <= exponent <= high or best["rms_log_error"] > MAX_FIT_LOG_ERROR:
+        best.update(model=None, coefficient=None)
+    return best
+
+
+def fit_results(results):
+    """Best complexity fit per algorithm series (None when it spans too few sizes)."""
+    return {label: fit_complexity([p[0] for p in points], [p[1] for p in points])
+            for label, points in _series(results).items()}
+
+
+def plot_scaling(results, path_stem, formats=PLOT_FORMATS, title="Shortest-path scaling"):
+    """
+    Log-log plot of median time vs node count per algorithm, with the median
+    confidence interval as error bars and the best-fitting complexity curve.
+
+    Uses matplotlib's object-oriented API without pyplot, so no display or
+    GUI backend is involved.
+
+    Returns:
+        List of written file paths
+    """
+    from matplotlib import rcParams
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 5.5))
+    ax = fig.add_subplot()
+    colors = itertools.cycle(rcParams["axes.prop_cycle"].by_key()["color"])
+    for label, points in _series(results).items():
+        sizes = [p[0] for p in points]
+        medians = [p[1] for p in points]
+        lower = [max(p[1] - p[2], 0) for p in points]
+        upper = [max(p[3] - p[1], 0) for p in points]
+        color = next(colors)
+        ax.errorbar(sizes, medians, yerr=[lower, upper], fmt="o", color=color, capsize=3, label=label)
+
+        fit = fit_complexity(sizes, medians)
+        if fit and fit["model"]:
+            f = COMPLEXITY_MODELS[fit["model"]]
+            lo, hi = min(sizes), max(sizes)
+            xs = [lo * (hi / lo) ** (i / 49) for i in range(50)]
+            ax.plot(xs, [fit["coefficient"] * f(x) for x in xs], linestyle="--", color=color,
+                    label=f"{label}: ~O({fit['model']}), slope {fit['exponent']:.2f}")
+
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("Number of nodes")
+    ax.set_ylabel("Median time per query (s)")
+    ax.set_title(title)
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend(fontsize="small")
+    fig.tight_layout()
+
+    written = []
+    for fmt in formats:
+        path = f"{path_stem}.{fmt}"
+        fig.savefig(path, format=fmt, dpi=PLOT_DPI)
+        written.append(path)
+    return written
+
+
+def write_report(results, output_dir, metadata=None, formats=PLOT_FORMATS, title="Shortest-path scaling"):
+    """
+    Write results.csv, results.json and the scaling plot into ``output_dir``.
+
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, "results.csv")
+    json_path = os.path.join(output_dir, "results.json")
+    write_csv(results, csv_path)
+    write_json(results, json_path, metadata)
+    written = [csv_path, json_path]
+    if formats:
+        written.extend(plot_scaling(results, os.path.join(output_dir, "scaling"), formats, title))
+    return written
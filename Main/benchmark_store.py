@@ -0,0 +1,327 @@
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results.jsonl")
+
+ALPHA = 0.05               # significance level of the one-sided Mann-Whitney test
+REGRESSION_THRESHOLD = 0.05  # median slowdown (5%) that must also be exceeded to count
+ROLLING_RUNS = 5           # previous runs pooled into the rolling baseline
+
+# Fields kept per result record; raw samples are kept so later runs can be tested against them
+RECORD_FIELDS = ("graph", "nodes", "edges", "bucket", "algorithm", "pairs", "trace", "samples",
+                 "n", "median", "p95", "mean", "min", "max", "median_ci", "p95_ci",
+                 "peak_bytes", "retained_bytes", "operations")
+
+# Run properties that must match for two runs' timings to be comparable
+COMPARABLE_FIELDS = ("cpu", "hostname", "parameters")
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True,
+                              timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def run_metadata(parameters=None):
+    """
+    Environment a benchmark run was taken in: git revision, Python, CPU and host.
+
+    Args:
+        parameters: Optional dictionary of the settings that shape the timings
+            (pairs, warm-up, repeats, seed, workers...); only runs with equal
+            parameters on the same host and CPU are compared
+    """
+    return {
+        "parameters": parameters,
+        "git_revision": _git("rev-parse", "HEAD") or None,
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "hostname": platform.node(),
+    }
+
+
+class ResultStore:
+    """
+    Append-only JSON-lines store of benchmark results.
+
+    Every line is one (graph, algorithm) result of a run, tagged with the run
+    id, timestamp and run metadata, so the file can be grepped, appended to
+    from several machines and read back without a schema.
+    """
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+
+    def append_run(self, results, metadata=None, label=None):
+        """
+        Record the results of one benchmark run.
+
+        Args:
+            results: Result dictionaries from Main.benchmark (benchmark_graph / run_suite)
+            metadata: Run metadata (default: ``run_metadata()``)
+            label: Optional free-form label, e.g. a branch or change description
+
+        Returns:
+            The new run id
+        """
+        run_id = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        meta = dict(metadata or run_metadata(), run_id=run_id, timestamp=time.time(), label=label)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            for result in results:
+                record = {k: result[k] for k in RECORD_FIELDS if k in result}
+                f.write(json.dumps(dict(meta, **record)) + "\n")
+        return run_id
+
+    def records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def runs(self):
+        """Run summaries in the order they were recorded."""
+        runs = {}
+        for r in self.records():
+            entry = runs.setdefault(r["run_id"], {
+                "run_id": r["run_id"], "timestamp": r["timestamp"], "label": r.get("label"),
+                "git_revision": r.get("git_revision"), "git_dirty": r.get("git_dirty"),
+                "python": r.get("python"), "cpu": r.get("cpu"), "hostname": r.get("hostname"),
+                "parameters": r.get("parameters"), "results": 0,
+            })
+            entry["results"] += 1
+        return sorted(runs.values(), key=lambda run: run["timestamp"])
+
+    def load_run(self, run_id):
+        """All result records of one run (a unique run-id prefix is enough)."""
+        matches = {run["run_id"] for run in self.runs() if run["run_id"].startswith(run_id)}
+        if len(matches) != 1:
+            raise KeyError(f"{run_id!r} matches {len(matches)} runs")
+        run_id = matches.pop()
+        return [r for r in self.records() if r["run_id"] == run_id]
+
+
+def comparable_key(record):
+    """Key equal for runs (or records) whose timings may be compared: same CPU, host and run parameters."""
+    return json.dumps({field: record.get(field) for field in COMPARABLE_FIELDS}, sort_keys=True)
+
+
+def _describe_mismatch(a, b):
+    return ", ".join(field for field in COMPARABLE_FIELDS if a.get(field) != b.get(field))
+
+
+def _result_key(record):
+    return comparable_key(record), record["graph"], record["algorithm"], record.get("trace", True)
+
+
+def mann_whitney_greater(a, b):
+    """
+    One-sided Mann-Whitney U test that values in ``b`` tend to be larger than in ``a``.
+
+    Uses the normal approximation with tie and continuity correction, which is
+    adequate for the 10+ samples per side a benchmark result carries.
+
+    Returns:
+        p-value
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    combined = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    n = n1 + n2
+    rank_sum_b = 0.0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        rank_sum_b += avg_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 1)
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    u_b = rank_sum_b - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_b - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def compare(baseline, candidate, alpha=ALPHA, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare candidate results against baseline results.
+
+    Baseline records sharing a (graph, algorithm, trace) key and taken on the
+    same CPU and host with the same run parameters are pooled, which is how a
+    rolling baseline over several runs is formed; baseline records from other
+    environments never match a candidate result. A result is a
+    regression when the candidate's samples are significantly slower
+    (one-sided Mann-Whitney, p < alpha) and its median is more than
+    ``threshold`` slower; improvements are tested the other way round.
+
+    Returns:
+        List of row dictionaries with medians, ratio, p-values and a status of
+        "regression", "improvement", "unchanged" or "new"
+    """
+    pooled = {}
+    for r in baseline:
+        pooled.setdefault(_result_key(r), []).extend(r["samples"])
+
+    rows = []
+    for r in candidate:
+        key = _result_key(r)
+        row = {"graph": r["graph"], "algorithm": r["algorithm"], "trace": key[3],
+               "candidate_median": _median(r["samples"])}
+        base = pooled.get(key)
+        if not base:
+            row.update(status="new", baseline_median=None, ratio=None, p_slower=None, p_faster=None)
+            rows.append(row)
+            continue
+        base_median = _median(base)
+        ratio = row["candidate_median"] / base_median if base_median else math.inf
+        p_slower = mann_whitney_greater(base, r["samples"])
+        p_faster = mann_whitney_greater(r["samples"], base)
+        if p_slower < alpha and ratio > 1 + threshold:
+            status = "regression"
+        elif p_faster < alpha and ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        row.update(status=status, baseline_median=base_median, ratio=ratio, p_slower=p_slower, p_faster=p_faster)
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'graph':<50} {'algorithm':<13} {'base ms':>9} {'new ms':>9} {'ratio':>6} {'p':>7}  status"]
+    for row in rows:
+        if row["baseline_median"] is None:
+            lines.append(f"{row['graph']:<50} {row['algorithm']:<13} {'-':>9} "
+                         f"{row['candidate_median'] * 1e3:9.2f} {'-':>6} {'-':>7}  new")
+            continue
+        p = row["p_slower"] if row["ratio"] >= 1 else row["p_faster"]
+        lines.append(f"{row['graph']:<50} {row['algorithm']:<13} {row['baseline_median'] * 1e3:9.2f} "
+                     f"{row['candidate_median'] * 1e3:9.2f} {row['ratio']:6.3f} {p:7.4f}  {row['status']}")
+    return "\n".join(lines)
+
+
+def _compare_command(args):
+    store = ResultStore(args.store)
+    runs = store.runs()
+    if not runs:
+        print(f"No benchmark runs recorded in {store.path}", file=sys.stderr)
+        return 2
+    try:
+        candidate = store.load_run(args.candidate or runs[-1]["run_id"])
+        baseline = store.load_run(args.baseline) if args.baseline else None
+    except KeyError as e:
+        print(f"Unknown run: {e.args[0]}", file=sys.stderr)
+        return 2
+    candidate_id = candidate[0]["run_id"]
+    environment = comparable_key(candidate[0])
+
+    if baseline is not None:
+        if comparable_key(baseline[0]) != environment:
+            print(f"Run {baseline[0]['run_id']} is not comparable with {candidate_id} "
+                  f"(different {_describe_mismatch(baseline[0], candidate[0])})", file=sys.stderr)
+            return 2
+        baseline_desc = f"run {baseline[0]['run_id']}"
+    else:
+        earlier = [run for run in runs if run["run_id"] != candidate_id
+                   and run["timestamp"] < candidate[0]["timestamp"]]
+        skipped = [run for run in earlier if comparable_key(run) != environment]
+        if skipped:
+            print(f"Warning: skipping {len(skipped)} earlier run(s) taken on another host/CPU or with "
+                  f"different parameters", file=sys.stderr)
+        earlier = [run["run_id"] for run in earlier if comparable_key(run) == environment][-args.rolling:]
+        if not earlier:
+            print("No comparable earlier runs to form a rolling baseline", file=sys.stderr)
+            return 2
+        baseline = [r for run_id in earlier for r in store.load_run(run_id)]
+        baseline_desc = f"rolling baseline of {len(earlier)} run(s)"
+
+    rows = compare(baseline, candidate, alpha=args.alpha, threshold=args.threshold)
+    print(f"Candidate run {candidate_id} vs {baseline_desc}")
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} significant regression(s)")
+        return 1
+    print("\nNo significant regressions")
+    return 0
+
+
+def _list_command(args):
+    for run in ResultStore(args.store).runs():
+        revision = (run["git_revision"] or "unknown")[:10] + ("+dirty" if run["git_dirty"] else "")
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["timestamp"]))
+        label = f"  {run['label']}" if run["label"] else ""
+        print(f"{run['run_id']}  {when}  {revision:<16} py{run['python']}  {run['results']:>3} results{label}")
+    return 0
+
+
+def main(argv=None):
+    """
+    ``list`` recorded runs, or ``compare`` two runs / a run against a rolling baseline.
+
+    Exit status of compare: 0 no regressions, 1 regressions found, 2 nothing to compare.
+    """
+    parser = argparse.ArgumentParser(prog="python -m Main.benchmark_store",
+                                     description="Benchmark results store and regression check")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="JSON-lines results file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list recorded runs").set_defaults(func=_list_command)
+
+    cmp_parser = commands.add_parser("compare", help="flag significant regressions")
+    cmp_parser.add_argument("--candidate", help="run id (prefix) to check; default: latest run")
+    cmp_parser.add_argument("--baseline", help="run id (prefix) to compare against; default: rolling baseline")
+    cmp_parser.add_argument("--rolling", type=int, default=ROLLING_RUNS,
+                            help="number of earlier runs pooled into the rolling baseline")
+    cmp_parser.add_argument("--alpha", type=float, default=ALPHA, help="significance level")
+    cmp_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                            help="minimum relative median slowdown to flag")
+    cmp_parser.set_defaults(func=_compare_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import time
+import warnings
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+MAX_PARKED = 2000  # hidden objects kept for reuse before they are really deleted
+STATS_WINDOW = 100  # number of recent update timings kept
+
+
+class _CanvasPool(ABC):
+    """
+    Keeps tkintermapview canvas objects alive across viewport changes.
+
+    Objects are keyed by the caller (e.g. a chain id). ``update`` applies the
+    minimal diff between the shown set and the wanted set: objects that leave
+    the view are hidden and parked instead of deleted, and objects that enter
+    it are re-shown from the park when possible, re-coordinated from a parked
+    object of another key otherwise, and only created as a last resort.
+    """
+
+    def __init__(self, map_widget, max_parked=MAX_PARKED):
+        self.map_widget = map_widget
+        self.max_parked = max_parked
+        self.active = {}            # key -> (obj, spec)
+        self.parked = OrderedDict()  # key -> (obj, spec), oldest first
+        self.counters = {"created": 0, "reused": 0, "reshown": 0, "hidden": 0, "deleted": 0}
+        self.update_times = deque(maxlen=STATS_WINDOW)
+
+    # Subclasses implement these against the tkintermapview object type
+    @abstractmethod
+    def _create(self, spec):
+        """Create a new, visible object for ``spec``."""
+
+    @abstractmethod
+    def _recycle(self, obj, spec):
+        """Restyle and move an existing object to ``spec``."""
+
+    @abstractmethod
+    def _hide(self, obj):
+        """Hide the object's canvas items (it is taken out of the registry separately)."""
+
+    @abstractmethod
+    def _show(self, obj):
+        """Put a hidden object back in the registry and make its canvas items visible."""
+
+    @abstractmethod
+    def _registry(self):
+        """The map widget list whose objects tkintermapview redraws on every pan and zoom."""
+
+    def _unregister(self, objs):
+        # Out of the registry, so pans and zooms no longer recompute their coordinates.
+        # One filtering pass for a batch instead of an O(n) list.remove per object.
+        registry = self._registry()
+        if len(objs) == 1:
+            if objs[0] in registry:
+                registry.remove(objs[0])
+            return
+        hidden = {id(obj) for obj in objs}
+        registry[:] = [obj for obj in registry if id(obj) not in hidden]
+
+    def show(self, key, spec):
+        """Make sure ``key`` is shown with ``spec``."""
+        if key in self.active:
+            obj, old_spec = self.active[key]
+            if old_spec != spec:
+                self._recycle(obj, spec)
+                self.active[key] = (obj, spec)
+            return obj
+        try:
+            if key in self.parked:
+                obj, old_spec = self.parked.pop(key)
+                if old_spec != spec:
+                    self._recycle(obj, spec)
+                self._show(obj)
+                self.counters["reshown"] += 1
+            elif self.parked:
+                _, (obj, _) = self.parked.popitem(last=False)
+                self._recycle(obj, spec)
+                self._show(obj)
+                self.counters["reused"] += 1
+            else:
+                obj = self._create(spec)
+                self.counters["created"] += 1
+        except Exception as e:
+            warnings.warn(f"Error showing canvas object {key}: {e}")
+            return None
+        self.active[key] = (obj, spec)
+        return obj
+
+    def hide(self, key):
+        """Hide ``key`` and park its object for reuse."""
+        self.hide_many((key,))
+
+    def hide_many(self, keys):
+        """Hide several keys at once, parking their objects for reuse."""
+        hidden = []
+        for key in keys:
+            entry = self.active.pop(key, None)
+            if entry is None:
+                continue
+            try:
+                self._hide(entry[0])
+            except Exception:
+                pass
+            self.parked[key] = entry
+            self.counters["hidden"] += 1
+            hidden.append(entry[0])
+        if hidden:
+            self._unregister(hidden)
+
+    def update(self, specs):
+        """
+        Apply the minimal diff so exactly the keys of ``specs`` are shown.
+
+        Args:
+            specs: Dictionary of key -> spec for everything that should be visible
+        """
+        start = time.perf_counter()
+        self.hide_many([k for k in self.active if k not in specs])
+        for key, spec in specs.items():
+            self.show(key, spec)
+        self._trim()
+        self.update_times.append(time.perf_counter() - start)
+
+    def hide_all(self):
+        self.hide_many(list(self.active))
+        self._trim()
+
+    def _trim(self):
+        while len(self.parked) > self.max_parked:
+            _, (obj, _) = self.parked.popitem(last=False)
+            self._destroy(obj)
+
+    def _destroy(self, obj):
+        try:
+            obj.delete()
+        except Exception:
+            pass
+        self.counters["deleted"] += 1
+
+    def clear(self):
+        """Really delete every pooled object."""
+        for obj, _ in list(self.active.values()) + list(self.parked.values()):
+            self._destroy(obj)
+        self.active.clear()
+        self.parked.clear()
+
+    def active_keys(self):
+        return set(self.active)
+
+    def active_objects(self):
+        return [obj for obj, _ in self.active.values()]
+
+    def stats(self):
+        """Counters of created vs reused objects and recent update timings (ms)."""
+        times = sorted(self.update_times)
+        result = dict(self.counters, active=len(self.active), parked=len(self.parked))
+        if times:
+            result["last_update_ms"] = self.update_times[-1] * 1000
+            result["mean_update_ms"] = sum(times) / len(times) * 1000
+            result["max_update_ms"] = times[-1] * 1000
+        return result
+
+
+class PathPool(_CanvasPool):
+    """Pool of ``set_path`` objects; a spec is (coords, color, width)."""
+
+    def _create(self, spec):
+        coords, color, width = spec
+        return self.map_widget.set_path(coords, color=color, width=width)
+
+    def _recycle(self, obj, spec):
+        coords, color, width = spec
+        obj.path_color = color
+        obj.width = width
+        if obj.canvas_line is not None:
+            self.map_widget.canvas.itemconfigure(obj.canvas_line, fill=color, width=width)
+        obj.set_position_list(coords)
+
+    def _registry(self):
+        return self.map_widget.canvas_path_list
+
+    def _hide(self, obj):
+        if obj.canvas_line is not None:
+            self.map_widget.canvas.itemconfigure(obj.canvas_line, state="hidden")
+
+    def _show(self, obj):
+        self.map_widget.canvas_path_list.append(obj)
+        obj.draw()
+        if obj.canvas_line is not None:
+            self.map_widget.canvas.itemconfigure(obj.canvas_line, state="normal")
+
+
+class MarkerPool(_CanvasPool):
+    """Pool of ``set_marker`` objects; a spec is (lat, lon, text, font, text_color, icon)."""
+
+    _ITEM_ATTRS = ("polygon", "big_circle", "canvas_text", "canvas_icon", "canvas_image")
+
+    def _items(self, marker):
+        return [item for item in (getattr(marker, a, None) for a in self._ITEM_ATTRS) if item is not None]
+
+    def _create(self, spec):
+        lat, lon, text, font, text_color, icon = spec
+        return self.map_widget.set_marker(lat, lon, text=text, font=font, text_color=text_color,
+                                          icon=icon, icon_anchor="center")
+
+    def _recycle(self, obj, spec):
+        lat, lon, text, font, text_color, icon = spec
+        obj.font = font
+        obj.text_color = text_color
+        if obj.icon is not icon:
+            obj.change_icon(icon)
+        obj.set_text(text)
+        obj.set_position(lat, lon)
+
+    def _registry(self):
+        return self.map_widget.canvas_marker_list
+
+    def _hide(self, obj):
+        for item in self._items(obj):
+            self.map_widget.canvas.itemconfigure(item, state="hidden")
+
+    def _show(self, obj):
+        self.map_widget.canvas_marker_list.append(obj)
+        obj.draw()
+        for item in self._items(obj):
+            self.map_widget.canvas.itemconfigure(item, state="normal")
@@ -0,0 +1,257 @@
+import argparse
+import math
+import os
+import statistics
+import sys
+
+import networkx as nx
+
+from Main.Algorithms.pathAlgorithms import PathAlgorithms
+from Main import DijsktraANDBellmanFord as reference
+from Main.benchmark import (ALGORITHMS, DiscardSteps, corpus_paths, load_graph, sample_od_pairs, time_call)
+
+DEFAULT_PAIRS = 3
+DEFAULT_REPEAT = 3        # timed runs per pair; the checked run doubles as warm-up
+DEFAULT_MAX_NODES = 1200  # the reference Bellman-Ford has no early exit, keep the default sweep short
+REL_TOL = 1e-9
+ABS_TOL = 1e-6            # metres; sums of float lengths in a different order differ slightly
+ORACLE = "networkx.dijkstra"
+
+# name -> factory(G, weight) returning query(source, target) -> (distance, path or None).
+# Anything the factory needs (adjacency dicts, edge lists) is built once, outside the timings.
+ENGINES = {}
+
+
+def register_engine(name):
+    """Decorator adding an engine factory to ENGINES so the harness checks it."""
+    def decorator(factory):
+        ENGINES[name] = factory
+        return factory
+    return decorator
+
+
+def _path_algorithms_engine(run):
+    def factory(G, weight):
+        def query(source, target):
+            dist, prev, _ = run(G, source, target, weight, steps=DiscardSteps())
+            if dist is None:  # negative cycle
+                return math.nan, None
+            return dist[target], PathAlgorithms.reconstruct_path(prev, source, target)
+        return query
+    return factory
+
+
+# Every PathAlgorithms entry the benchmarks know about is checked as well
+for _name, _run in ALGORITHMS.items():
+    register_engine(f"pathalgorithms.{_name}")(_path_algorithms_engine(_run))
+
+
+def _adjacency(G, weight):
+    adjacency = {u: {} for u in G.nodes()}
+    for u, v, data in G.edges(data=True):
+        w = data.get(weight, 1.0)
+        if w < adjacency[u].get(v, math.inf):
+            adjacency[u][v] = w
+    return adjacency
+
+
+@register_engine("reference.dijkstra")
+def _reference_dijkstra(G, weight):
+    adjacency = _adjacency(G, weight)
+    return lambda source, target: (reference.dijkstra(adjacency, source)[target], None)
+
+
+@register_engine("reference.bellman_ford")
+def _reference_bellman_ford(G, weight):
+    adjacency = _adjacency(G, weight)
+    edges = [(u, v, w) for u, nbrs in adjacency.items() for v, w in nbrs.items()]
+    vertices = list(G.nodes())
+    return lambda source, target: (reference.bellman_ford(edges, vertices, source)[target], None)
+
+
+@register_engine(ORACLE)
+def _networkx_dijkstra(G, weight):
+    def query(source, target):
+        try:
+            distance, path = nx.single_source_dijkstra(G, source, target, weight=weight)
+        except nx.NetworkXNoPath:
+            return math.inf, []
+        return distance, path
+    return query
+
+
+@register_engine("networkx.shortest_simple_paths")
+def _networkx_simple_paths(G, weight):
+    # The k-paths code path of the app; its first path is the shortest one
+    from Main.graph_builder import _enumerate_k_paths
+
+    def query(source, target):
+        paths = _enumerate_k_paths(G, source, target, 1, weight)
+        if not paths:
+            return math.inf, []
+        return path_weight(G, paths[0], weight), paths[0]
+    return query
+
+
+def path_weight(G, path, weight='length'):
+    """Total weight of a node path (lightest parallel edge on multigraphs); inf if an edge is missing."""
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        if not G.has_edge(u, v):
+            return math.inf
+        data = G[u][v]
+        if G.is_multigraph():
+            total += min(d.get(weight, 1.0) for d in data.values())
+        else:
+            total += data.get(weight, 1.0)
+    return total
+
+
+def _same_distance(a, b, rel_tol, abs_tol):
+    if math.isinf(a) or math.isinf(b):
+        return a == b
+    return math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol)
+
+
+def check_answer(G, source, target, expected, distance, path, weight='length', rel_tol=REL_TOL, abs_tol=ABS_TOL):
+    """
+    Reason an engine's answer is wrong, or None when it is correct.
+
+    The distance must match the oracle's within tolerance. A returned path
+    only has to be a valid source-target path whose own weight matches that
+    distance: equal-cost routes are all accepted, whatever the tie-breaking.
+    """
+    if not _same_distance(expected, distance, rel_tol, abs_tol):
+        return f"distance {distance!r} != expected {expected!r}"
+    if path is None or math.isinf(expected):
+        return None
+    if not path or path[0] != source or path[-1] != target:
+        return "path does not run from source to target"
+    length = path_weight(G, path, weight)
+    if math.isinf(length):
+        return "path uses a missing edge"
+    if not _same_distance(length, distance, rel_tol, abs_tol):
+        return f"path weight {length!r} != reported distance {distance!r}"
+    return None
+
+
+def check_graph(G, name, od_pairs, engines=None, repeat=DEFAULT_REPEAT, weight='length',
+                rel_tol=REL_TOL, abs_tol=ABS_TOL):
+    """
+    Run every engine on the same origin-destination pairs, check them against
+    the oracle and time them.
+
+    Returns:
+        Tuple of (timings as {engine: [seconds]}, list of mismatch dictionaries)
+    """
+    engines = list(engines or ENGINES)
+    queries = {engine: ENGINES[engine](G, weight) for engine in engines}
+    oracle = queries.get(ORACLE) or ENGINES[ORACLE](G, weight)
+
+    timings = {engine: [] for engine in engines}
+    mismatches = []
+    for source, target in od_pairs:
+        expected, _ = oracle(source, target)
+        for engine, query in queries.items():
+            try:
+                distance, path = query(source, target)
+                problem = check_answer(G, source, target, expected, distance, path, weight, rel_tol, abs_tol)
+            except Exception as e:
+                problem = f"{type(e).__name__}: {e}"
+            if problem:
+                mismatches.append({"graph": name, "engine": engine, "source": source, "target": target,
+                                   "problem": problem})
+                continue
+            if repeat:
+                timings[engine].extend(time_call(lambda: query(source, target), warmup=0, repeat=repeat))
+    return timings, mismatches
+
+
+def run_differential(graphs, engines=None, pairs=DEFAULT_PAIRS, repeat=DEFAULT_REPEAT, seed=0,
+                     weight='length', rel_tol=REL_TOL, abs_tol=ABS_TOL):
+    """
+    Check all engines on (name, graph) pairs with seeded O-D pairs (the same as Main.benchmark's).
+
+    Returns:
+        Tuple of (per-engine rows for format_speed_table, list of mismatches)
+    """
+    engines = list(engines or ENGINES)
+    samples = {engine: [] for engine in engines}
+    queries = 0
+    mismatches = []
+    for name, G in graphs:
+        od_pairs = sample_od_pairs(G, pairs, seed=f"{seed}:{name}")
+        queries += len(od_pairs)
+        timings, found = check_graph(G, name, od_pairs, engines, repeat, weight, rel_tol, abs_tol)
+        mismatches.extend(found)
+        for engine, times in timings.items():
+            samples[engine].extend(times)
+
+    failed = {}
+    for m in mismatches:
+        failed[m["engine"]] = failed.get(m["engine"], 0) + 1
+    oracle_median = statistics.median(samples[ORACLE]) if samples.get(ORACLE) else None
+    rows = []
+    for engine in engines:
+        median = statistics.median(samples[engine]) if samples[engine] else math.nan
+        rows.append({
+            "engine": engine,
+            "queries": queries,
+            "mismatches": failed.get(engine, 0),
+            "median": median,
+            "vs_oracle": median / oracle_median if oracle_median else math.nan,
+        })
+    rows.sort(key=lambda row: (math.isnan(row["median"]), row["median"]))
+    return rows, mismatches
+
+
+def format_speed_table(rows):
+    lines = [f"{'engine':<34} {'queries':>7} {'wrong':>5} {'median ms':>10} {'x ' + ORACLE:>24}"]
+    for row in rows:
+        lines.append(f"{row['engine']:<34} {row['queries']:>7} {row['mismatches']:>5} "
+                     f"{row['median'] * 1e3:10.3f} {row['vs_oracle']:24.2f}")
+    return "\n".join(lines)
+
+
+def format_mismatches(mismatches):
+    return "\n".join(f"{m['graph']} {m['engine']} {m['source']} -> {m['target']}: {m['problem']}"
+                     for m in mismatches)
+
+
+def main(argv=None):
+    """Exit status: 0 when every engine agrees with the oracle, 1 on any mismatch."""
+    parser = argparse.ArgumentParser(prog="python -m Main.differential",
+                                     description="Check all shortest-path engines against each other")
+    parser.add_argument("--engines", nargs="+", choices=tuple(ENGINES), help="default: all registered")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES, help="skip larger cached graphs")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[], help="also check synthetic grids of these sizes")
+    parser.add_argument("--pairs", type=int, default=DEFAULT_PAIRS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per pair (0 = check only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rel-tol", type=float, default=REL_TOL)
+    parser.add_argument("--abs-tol", type=float, default=ABS_TOL)
+    args = parser.parse_args(argv)
+
+    graphs = []
+    for path in corpus_paths():
+        G = load_graph(path)
+        if G.number_of_nodes() <= args.max_nodes:
+            graphs.append((os.path.splitext(os.path.basename(path))[0], G))
+    if args.sizes:
+        from Main.synthetic_graphs import synthetic_corpus
+        graphs.extend(synthetic_corpus(("grid",), args.sizes, seed=args.seed))
+
+    print(f"--- Differential check: {len(graphs)} graphs, {args.pairs} O-D pairs each, oracle {ORACLE} ---")
+    rows, mismatches = run_differential(graphs, args.engines, args.pairs, args.repeat, args.seed,
+                                        rel_tol=args.rel_tol, abs_tol=args.abs_tol)
+    print(format_speed_table(rows))
+    if mismatches:
+        print(f"\n{len(mismatches)} mismatch(es):")
+        print(format_mismatches(mismatches))
+        return 1
+    print("\nAll engines agree")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
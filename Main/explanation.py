@@ -0,0 +1,103 @@
+from Main.Algorithms.pathAlgorithms import PathAlgorithms
+from Main.performance_metrics import timed
+
+PAGE_STEPS = 250            # steps formatted and shown per page
+SEARCH_CHUNK_STEPS = 5000   # steps scanned per search call so the UI can yield in between
+
+
+class PagedExplanation:
+    """
+    Step-by-step explanation of an algorithm run, formatted on demand.
+
+    Nothing is formatted up front: a page, a single step or a search only
+    formats the steps it touches, so memory stays flat however long the trace
+    is. ``str()`` still gives the complete text for callers that want it.
+    """
+
+    def __init__(self, steps, header="", footer="", node_id=None, page_size=PAGE_STEPS):
+        self.steps = steps
+        self.header = header
+        self.footer = footer
+        self.node_id = node_id
+        self.page_size = page_size
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __bool__(self):
+        # An explanation without steps still has a header and a summary to show
+        return True
+
+    def __str__(self):
+        return "".join(self.iter_text())
+
+    @property
+    def page_count(self):
+        return max(1, -(-len(self.steps) // self.page_size))
+
+    def page_of(self, step_index):
+        """Page number (0-based) containing step ``step_index`` (0-based)."""
+        step_index = max(0, min(step_index, len(self.steps) - 1))
+        return step_index // self.page_size
+
+    def page_range(self, number):
+        """(start, stop) step indices of page ``number``."""
+        start = number * self.page_size
+        return start, min(start + self.page_size, len(self.steps))
+
+    def step_text(self, index):
+        return PathAlgorithms.format_step(self.steps[index], self.node_id)
+
+    def iter_text(self, start=0, stop=None):
+        """Yield the text of steps[start:stop], with the header/footer when the range touches either end."""
+        if stop is None or stop > len(self.steps):
+            stop = len(self.steps)
+        if start == 0 and self.header:
+            yield self.header
+        for i in range(start, stop):
+            yield self.step_text(i)
+        if stop == len(self.steps) and self.footer:
+            yield self.footer
+
+    @timed("format_explanation_page")
+    def page(self, number):
+        """
+        Format one page.
+
+        Returns:
+            Tuple of (page text, list with the 0-based line of each step on the page)
+        """
+        start, stop = self.page_range(number)
+        chunks = []
+        step_lines = []
+        line = 0
+        if start == 0 and self.header:
+            chunks.append(self.header)
+            line += self.header.count("\n")
+        for i in range(start, stop):
+            text = self.step_text(i)
+            # Steps opening with blank lines (e.g. a new iteration) are located by their first text line
+            step_lines.append(line + len(text) - len(text.lstrip("\n")))
+            chunks.append(text)
+            line += text.count("\n")
+        if stop == len(self.steps) and self.footer:
+            chunks.append(self.footer)
+        return "".join(chunks), step_lines
+
+    def find(self, query, start=0, max_steps=SEARCH_CHUNK_STEPS):
+        """
+        Case-insensitive search for ``query`` in the steps from ``start`` on.
+
+        At most ``max_steps`` steps are scanned per call so long traces can be
+        searched incrementally from the Tk event loop.
+
+        Returns:
+            Tuple of (index of the matching step or None, index to resume from;
+            the resume index equals len(self) once the end is reached)
+        """
+        query = query.lower()
+        stop = min(start + max_steps, len(self.steps))
+        for i in range(start, stop):
+            if query in self.step_text(i).lower():
+                return i, i + 1
+        return None, stop
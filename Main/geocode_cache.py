@@ -0,0 +1,227 @@
+import atexit
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+
+DEFAULT_PATH = os.path.join("cache", "geocode.sqlite")  # next to osmnx's HTTP cache
+DEFAULT_TTL = 30 * 24 * 3600      # seconds a found result stays valid
+NEGATIVE_TTL = 24 * 3600          # seconds a "not found" stays valid; places do get added
+MAX_ENTRIES = 20000               # least recently used entries beyond this are evicted
+EVICT_EVERY = 100                 # writes between eviction passes
+TOUCH_FLUSH = 100                 # buffered hit timestamps written back at once (LRU recency is approximate)
+
+KINDS = ("location", "suggestions")
+
+# Returned by get_* on a cache miss; None is a cached negative result
+MISS = object()
+
+
+class CachedLocation(namedtuple("CachedLocation", "address latitude longitude")):
+    """The parts of a geopy Location the app uses, as stored in the cache."""
+
+    @classmethod
+    def from_location(cls, location):
+        return cls(location.address, location.latitude, location.longitude)
+
+
+def normalize_query(text):
+    """
+    Cache key for a free-text query: Unicode-normalised, case-folded, with
+    runs of whitespace collapsed, comma spacing unified and surrounding
+    whitespace/punctuation stripped, so trivially different spellings of the
+    same search share an entry.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"\s*,\s*", ", ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ,.;")
+
+
+class GeocodeCache:
+    """
+    Persistent geocoding cache shared by the search box and autocomplete.
+
+    Entries live in one SQLite table keyed by (kind, normalised query): a
+    "location" is a single geocode result, "suggestions" a list of addresses.
+    Results expire after ``ttl`` seconds, "not found" results (stored as
+    NULL) after ``negative_ttl``, and the least recently used entries are
+    evicted past ``max_entries``. Hits do not write: their access times are
+    buffered and written back in batches, so a lookup is a single indexed
+    read. The database uses WAL (synchronous=NORMAL) so several app
+    instances can share it; within a process one connection is guarded by a
+    lock, so the cache is safe to use from worker threads.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._touched = {}  # (kind, key) -> last hit time not yet written back
+        self._lock = threading.Lock()
+        self._conn = self._connect(path)
+
+    @staticmethod
+    def _connect(path):
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL stays consistent without a sync per commit; a crash can only lose the newest entries
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except (OSError, sqlite3.Error) as e:
+            logging.warning("Geocode cache %s unavailable (%s); using an in-memory cache", path, e)
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode (accessed)")
+        conn.commit()
+        return conn
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+    def get(self, kind, query):
+        """Decoded JSON value, None for a cached negative result, or MISS."""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM geocode WHERE kind = ? AND key = ?",
+                                     (kind, key)).fetchone()
+            if row is not None:
+                value, created = row
+                if now - created > (self.ttl if value is not None else self.negative_ttl):
+                    self._conn.execute("DELETE FROM geocode WHERE kind = ? AND key = ?", (kind, key))
+                    self._conn.commit()
+                    self._touched.pop((kind, key), None)
+                    row = None
+                else:
+                    self._touched[(kind, key)] = now
+                    if len(self._touched) >= TOUCH_FLUSH:
+                        self._flush_touched()
+                        self._conn.commit()
+            if row is None:
+                self.misses += 1
+                return MISS
+            self.hits += 1
+        return None if row[0] is None else json.loads(row[0])
+
+    def put(self, kind, query, value):
+        """Store a JSON-serialisable value; None records that nothing was found."""
+        key = normalize_query(query)
+        if not key:
+            return
+        now = time.time()
+        encoded = None if value is None else json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (kind, key, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, encoded, now, now))
+            self._touched.pop((kind, key), None)
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._flush_touched()
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        """Write buffered hit times back (caller holds the lock and commits)."""
+        if self._touched:
+            self._conn.executemany("UPDATE geocode SET accessed = ? WHERE kind = ? AND key = ?",
+                                   [(t, kind, key) for (kind, key), t in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM geocode WHERE rowid IN (SELECT rowid FROM geocode ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,))
+
+    def get_location(self, query):
+        """CachedLocation, None if the query is known to find nothing, or MISS."""
+        value = self.get("location", query)
+        if value is MISS or value is None:
+            return value
+        return CachedLocation(*value)
+
+    def put_location(self, query, location):
+        """
+        Cache a geopy Location (or CachedLocation), or None for "not found".
+        Only record answers the geocoder actually gave; a failed request must not be stored as None.
+        """
+        value = None if location is None else list(CachedLocation.from_location(location))
+        self.put("location", query, value)
+
+    def get_suggestions(self, query):
+        """List of addresses ([] if nothing matched) or MISS."""
+        value = self.get("suggestions", query)
+        return [] if value is None else value
+
+    def put_suggestions(self, query, addresses):
+        """Cache suggestion addresses; an empty list records that nothing matched (never store a failure)."""
+        self.put("suggestions", query, list(addresses) or None)
+
+    def clear(self, kind=None):
+        """Remove all entries, or only those of one kind."""
+        with self._lock:
+            self._touched = {k: t for k, t in self._touched.items() if kind is not None and k[0] != kind}
+            if kind is None:
+                self._conn.execute("DELETE FROM geocode")
+            else:
+                self._conn.execute("DELETE FROM geocode WHERE kind = ?", (kind,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        """Delete expired entries; returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM geocode WHERE (value IS NOT NULL AND created < ?) OR (value IS NULL AND created < ?)",
+                (now - self.ttl, now - self.negative_ttl))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def flush(self):
+        """Write buffered access times to disk."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """The process-wide cache (path from GEOCODE_CACHE_PATH, default cache/geocode.sqlite)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = GeocodeCache(os.environ.get("GEOCODE_CACHE_PATH", DEFAULT_PATH))
+            _shared.purge_expired()
+            atexit.register(_shared.flush)
+        return _shared
@@ -0,0 +1,229 @@
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from Main.geocode_cache import normalize_query
+from Main.performance_metrics import span
+
+USER_AGENT = "ShortestPathFinder/1.0 (robertjhonaracenab@gmail.com)"
+MIN_INTERVAL = 1.0   # seconds between requests; Nominatim's usage policy allows at most one per second
+TIMEOUT = 5          # seconds per HTTP request
+MAX_RETRIES = 2      # extra attempts after a service error (timeouts, 5xx, 429)
+RETRY_WAIT = 2.0     # seconds before a retry, on top of the rate interval
+
+# Lower runs first
+PRIORITY_SEARCH = 0    # explicit FROM/TO searches: the user is waiting on them
+PRIORITY_SUGGEST = 10  # autocomplete suggestions
+
+
+class _Request:
+    __slots__ = ("key", "query", "params", "priority", "future", "channels", "keep", "state")
+
+    def __init__(self, key, query, params, priority):
+        self.key = key
+        self.query = query
+        self.params = params
+        self.priority = priority
+        self.future = Future()
+        self.channels = set()  # channels that still want this result
+        self.keep = False      # submitted at least once without a channel
+        self.state = "queued"  # queued | running | done
+
+
+class GeocodeScheduler:
+    """
+    Single gateway for all Nominatim traffic in the process.
+
+    One dispatcher thread sends requests in priority order and never faster
+    than one per ``min_interval`` seconds, so the search box and the
+    autocomplete entries share one rate budget instead of each keeping its
+    own. ``submit`` returns a Future:
+
+    - identical requests (same normalised query and parameters) queued or in
+      flight are coalesced onto one Future; a higher priority promotes it;
+    - a request submitted on a ``channel`` (e.g. one autocomplete entry, or
+      "FROM") supersedes that channel's earlier request. Queued requests
+      nobody wants any more are dropped and their Future cancelled.
+
+    ``geocoder`` defaults to geopy's Nominatim on ``domain``/``scheme``
+    (environment NOMINATIM_DOMAIN / NOMINATIM_SCHEME), so the whole app can be
+    pointed at a local stand-in server, e.g. domain="127.0.0.1:8080",
+    scheme="http". Any object with a geopy-style ``geocode(query, **params)``
+    can be passed instead, as long as it raises on failure: None must mean
+    "nothing found", because callers cache it as a negative result (do not
+    hand in geopy's RateLimiter, which swallows errors by default).
+    """
+
+    def __init__(self, geocoder=None, min_interval=MIN_INTERVAL, max_retries=MAX_RETRIES, retry_wait=RETRY_WAIT,
+                 domain=None, scheme=None):
+        if geocoder is None:
+            from geopy.geocoders import Nominatim
+            options = {"user_agent": USER_AGENT, "timeout": TIMEOUT}
+            domain = domain or os.environ.get("NOMINATIM_DOMAIN")
+            scheme = scheme or os.environ.get("NOMINATIM_SCHEME")
+            if domain:
+                options["domain"] = domain
+            if scheme:
+                options["scheme"] = scheme
+            geocoder = Nominatim(**options)
+        self.geocoder = geocoder
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.retry_wait = retry_wait
+        self.stats = {"submitted": 0, "sent": 0, "coalesced": 0, "dropped": 0, "failed": 0}
+        self._heap = []              # (priority, sequence, request); stale entries are skipped
+        self._requests = {}          # key -> queued or running request
+        self._channels = {}          # channel -> its latest request
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._next_send = 0.0        # monotonic time the next request may start
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="geocode-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, query, priority=PRIORITY_SEARCH, channel=None, **params):
+        """
+        Queue a geocode of ``query`` (keyword arguments go to the geocoder).
+
+        Returns:
+            Future resolving to the geocoder's result; cancelled if the request
+            was superseded on its channel before it was sent
+        """
+        key = (normalize_query(query), tuple(sorted(params.items())))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("GeocodeScheduler is closed")
+            self.stats["submitted"] += 1
+            request = self._requests.get(key)
+            if request is None:
+                request = self._requests[key] = _Request(key, query, params, priority)
+                heapq.heappush(self._heap, (priority, next(self._sequence), request))
+            else:
+                self.stats["coalesced"] += 1
+                if priority < request.priority and request.state == "queued":
+                    request.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._sequence), request))
+
+            if channel is None:
+                request.keep = True
+            else:
+                previous = self._channels.get(channel)
+                self._channels[channel] = request
+                request.channels.add(channel)
+                if previous is not None and previous is not request:
+                    previous.channels.discard(channel)
+                    self._drop_if_unwanted(previous)
+            self._condition.notify()
+        return request.future
+
+    def geocode(self, query, priority=PRIORITY_SEARCH, channel=None, **params):
+        """Blocking ``submit``; raises CancelledError if the request was superseded."""
+        return self.submit(query, priority, channel, **params).result()
+
+    def _drop_if_unwanted(self, request):
+        if request.state == "queued" and not request.keep and not request.channels:
+            request.state = "done"
+            del self._requests[request.key]
+            request.future.cancel()
+            self.stats["dropped"] += 1
+
+    def _next_request(self):
+        """Highest-priority live request, waiting for work and for the rate budget; None once closed."""
+        with self._condition:
+            while True:
+                while self._heap and self._heap[0][2].state != "queued":
+                    heapq.heappop(self._heap)
+                if self._closed:
+                    return None
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._next_send - time.monotonic()
+                if delay > 0:
+                    # Re-check on wake-up: a more urgent request may have arrived meanwhile
+                    self._condition.wait(delay)
+                    continue
+                priority, _, request = heapq.heappop(self._heap)
+                if priority != request.priority:
+                    continue  # superseded heap entry of a promoted request
+                request.state = "running"
+                self._next_send = time.monotonic() + self.min_interval
+                return request
+
+    def _run(self):
+        while True:
+            request = self._next_request()
+            if request is None:
+                return
+            try:
+                result = self._send(request)
+            except Exception as e:
+                self._finish(request)
+                self.stats["failed"] += 1
+                request.future.set_exception(e)
+            else:
+                self._finish(request)
+                request.future.set_result(result)
+
+    def _send(self, request):
+        from geopy.exc import GeocoderQueryError, GeocoderServiceError
+
+        attempt = 0
+        while True:
+            with self._condition:
+                self.stats["sent"] += 1
+            try:
+                with span("nominatim_request", query=request.query, priority=request.priority):
+                    return self.geocoder.geocode(request.query, **request.params)
+            except GeocoderQueryError:
+                raise
+            except GeocoderServiceError as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logging.warning("Geocoding '%s' failed (%s); retry %d of %d",
+                                request.query, e, attempt, self.max_retries)
+                with self._condition:
+                    self._next_send = max(self._next_send, time.monotonic() + self.retry_wait)
+                    delay = self._next_send - time.monotonic()
+                    self._next_send += self.min_interval
+                time.sleep(delay)
+
+    def _finish(self, request):
+        with self._condition:
+            request.state = "done"
+            if self._requests.get(request.key) is request:
+                del self._requests[request.key]
+            for channel in request.channels:
+                if self._channels.get(channel) is request:
+                    del self._channels[channel]
+
+    def close(self):
+        """Stop the dispatcher; queued requests are cancelled."""
+        with self._condition:
+            self._closed = True
+            for request in list(self._requests.values()):
+                if request.state == "queued":
+                    request.state = "done"
+                    request.future.cancel()
+            self._requests.clear()
+            self._channels.clear()
+            self._condition.notify_all()
+        self._thread.join()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_scheduler():
+    """The process-wide scheduler every Nominatim request goes through."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = GeocodeScheduler()
+        return _shared
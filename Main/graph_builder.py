@@ -1,41 +1,86 @@
 import os
 import warnings
-from functools import lru_cache
+from functools import lru_cache, wraps
 import colorsys
+import math
 import threading
-import time
-from queue import Queue
 
+import numpy as np
 import osmnx as ox
 import networkx as nx
-from shapely.geometry import Point, LineString
+import shapely
+from shapely.geometry import Point
 from PIL import Image, ImageDraw, ImageTk
 
-from Main.Algorithms.pathAlgorithms import PathAlgorithms
+from Main.Algorithms.pathAlgorithms import OperationCounter, PathAlgorithms, format_operation_counts
+from Main.osm_extract import OSMExtractIndex
+from Main.spatial_index import GridIndex, grid_clusters
+from Main.lod import MAJOR_RANK, build_lod_tiers, road_rank, tier_for_zoom
+from Main.polyline_chains import EdgeChains, build_chains, street_name
+from Main.raster_overlay import RasterOverlay
+from Main.canvas_pool import MarkerPool, PathPool
+from Main.render_scheduler import RenderScheduler
+from Main.explanation import PagedExplanation
+from Main.trace_export import write_trace
+from Main.replay import ReplayPlayer, StepReplay
+from Main.performance_metrics import span, timed
+from Main.profiling import ProfileController
 
 ox.settings.timeout = 300
 MAX_PATHS = 100
 MAX_NODES = 10000
 PATH_SIMPLIFICATION_TOLERANCE = 0.0001  # Degrees
+# Route markers (distance labels and path node labels) are at least this many screen pixels apart
+ROUTE_MARKER_SPACING_PX = 60
+MAX_ROUTE_MARKERS = 200
+EARTH_RADIUS_M = 6371009  # same mean radius as ox.distance.great_circle
 # Viewport-based rendering settings
-MAX_EDGES_PER_BATCH = 500
-EDGE_BATCH_DELAY = 0.05  # seconds between batches
-EDGE_VISIBILITY_THRESHOLD = 200  # maximum number of edges visible at once
+# Draw order score = distance from viewport centre (in viewport diagonals) + weight * road rank,
+# so one road class step counts as much as a quarter of the viewport
+RANK_PRIORITY_WEIGHT = 0.25
+
+# Node label virtualisation: individual labels only when zoomed in this far,
+# otherwise grid clusters of roughly LABEL_CLUSTER_PX screen pixels with counts
+LABEL_MIN_ZOOM = 17
+LABEL_CLUSTER_PX = 80
+MAX_NODE_LABELS = 300  # more nodes than this in view are clustered even above LABEL_MIN_ZOOM
 
 # Define neon green color
 NEON_GREEN = "#39FF14"  # Bright neon green
 
+# "vector" draws the network as canvas paths; "raster" as pre-rendered PIL image tiles
+RENDER_MODES = ("vector", "raster")
+
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    """Vectorised great-circle distance in metres over NumPy coordinate arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def _spaced_indices(cum_dist, spacing):
+    """Indices into a cumulative-distance array, one at (or just past) every ``spacing`` metres."""
+    targets = np.arange(spacing, cum_dist[-1], spacing)
+    idx = np.unique(np.searchsorted(cum_dist, targets))
+    return idx[(idx > 0) & (idx < len(cum_dist))]
+
 
 @lru_cache(maxsize=None)
 def _load_graphml_cached(path):
     return ox.load_graphml(path)
 
 
-def load_or_build_graph(center_point, radius, graphml_path, network_type="drive"):  # returns an OSMnx graph
+@timed("load_or_build_graph")
+def load_or_build_graph(center_point, radius, graphml_path, network_type="drive", extract=None):  # returns an OSMnx graph
     if os.path.exists(graphml_path):
         return _load_graphml_cached(graphml_path)
-    G = ox.graph_from_point(center_point, dist=radius,
-                            network_type=network_type, simplify=True)
+    if extract is not None:
+        # Cut the route graph from the local OSM extract instead of querying Overpass
+        G = extract.subgraph_from_point(center_point, radius)
+    else:
+        G = ox.graph_from_point(center_point, dist=radius,
+                                network_type=network_type, simplify=True)
     if len(G.nodes) > MAX_NODES:
         raise MemoryError(f"Graph exceeds safety limit of {MAX_NODES} nodes")
     ox.save_graphml(G, graphml_path)
@@ -43,6 +88,20 @@ def load_or_build_graph(center_point, radius, graphml_path, network_type="drive"
     return _load_graphml_cached(graphml_path)
 
 
+def _profiled(kind, algorithm=None):
+    """Run the method as one operation of the builder's profiler, named after the graph it ends on."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.operation(kind, algorithm=algorithm) as op:
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    op.graph = self.graph_key
+        return wrapper
+    return decorator
+
+
 def _enumerate_k_paths(G_simple, source, target, k, weight):
     if k is None:
         k = MAX_PATHS
@@ -54,24 +113,49 @@ def _enumerate_k_paths(G_simple, source, target, k, weight):
 
 
 class OptimizedGraphBuilder:
-    def __init__(self, map_widget, cache_dir='graphs', default_weight='length'):
+    def __init__(self, map_widget, cache_dir='graphs', default_weight='length', osm_extract=None,
+                 render_mode=None):
         self.map_widget = map_widget
         self.cache_dir = cache_dir
         os.makedirs(self.cache_dir, exist_ok=True)
 
+        render_mode = render_mode or os.environ.get("GRAPH_RENDER_MODE", "vector")
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"render_mode must be one of {RENDER_MODES}, got {render_mode!r}")
+        self.render_mode = render_mode
+        # In raster mode only the highlighted route is drawn as vector paths
+        self.overlay = RasterOverlay(map_widget, cache_dir, NEON_GREEN) if render_mode == "raster" else None
+        self.graph_key = None
+
+        # Optional local .osm/.osm.pbf extract used instead of Overpass for new graphs
+        osm_extract = osm_extract or os.environ.get("OSM_EXTRACT_PATH")
+        self.extract = OSMExtractIndex(osm_extract, self.cache_dir) if osm_extract else None
+
         self.G_proj = None
         self.G_simple = None
         self.edge_coords = []
+        self.edge_nodes = []  # (u, v) per edge id
+        self.edge_index = {}  # (u, v) -> first edge id
+        self.edge_ranks = []  # road class rank per edge id (see Main.lod)
+        self.edge_names = []  # normalised street name per edge id
+        # Full-detail polylines chained through degree-2/same-street nodes; one canvas path each
+        self.edge_chains = EdgeChains()
         self.orig_node = None
         self.dest_node = None
         self.node_coords = {}
         self.highlight_objects = []
-        self.edge_objects = []
-        self.node_objects = []
-        self.node_labels = []
+        # Pooled canvas objects: road network paths (chains and LOD polylines) and node labels
+        self.edge_pool = PathPool(map_widget)
+        self.label_pool = MarkerPool(map_widget)
+        # Level-of-detail tiers (precomputed per graph) and the polylines currently drawn
+        self.lod_tiers = []
+        self.current_lod_tier = None
+        self.visible_lod = set()  # polyline indices of the current tier that are drawn
+        self.node_labels = []  # node markers along the highlighted path
         self.distance_markers = []
-        # hold onto PhotoImage refs so they don't get GC'd
-        self._marker_icons = []
+        # PhotoImage cache keyed by (color, size); also holds the refs so they don't get GC'd
+        self._icon_cache = {}
+        self.labels_enabled = False  # node labels follow the viewport once display_graph ran
 
         self.weight = default_weight
         self.proj_s = None
@@ -79,11 +163,19 @@ class OptimizedGraphBuilder:
         self.path_cache = {}
         self.algo_steps = []
         self.algorithm_results = {}
-
-        # Progressive loading state
-        self.loading_edges = False
-        self.edge_queue = Queue()
-        self.visible_edges = set()
+        self.replay_player = None
+        # Every run's step trace is also written here when set, so it outlives clear_highlights
+        self.trace_dir = os.environ.get("TRACE_EXPORT_DIR")
+        # Opt-in operation counters (heap pushes, relaxations, ...) for every run
+        self.count_operations = os.environ.get("PATH_OPERATION_COUNTERS", "") not in ("", "0")
+        # On-demand / slow-operation profiling of builds and routes (PROFILE_* env vars, debug menu)
+        self.profiler = ProfileController.from_env(os.path.join(self.cache_dir, "profiles"))
+
+        # Progressive loading state: pending draws run in frame-budgeted, prioritised batches
+        self.scheduler = RenderScheduler(map_widget)
+        self.visible_chains = set()
+        self.route_chains = set()  # chains lying entirely under the highlighted route; not drawn
+        self.chain_ranks = []  # best road rank per chain id
         self.edge_batch_lock = threading.Lock()
 
         # Add node ID mapping
@@ -96,8 +188,9 @@ class OptimizedGraphBuilder:
         # Bind map events for viewport-based rendering
         self._setup_map_bindings()
 
-        # Store spatial index for edges (for viewport optimization)
-        self.edge_spatial_index = {}
+        # Grid indexes over chain bboxes and node positions (for viewport optimization)
+        self.chain_spatial_index = GridIndex.from_segments([])
+        self.node_spatial_index = None
 
     def _setup_map_bindings(self):
         """Set up event bindings for viewport-based rendering"""
@@ -107,50 +200,141 @@ class OptimizedGraphBuilder:
         canvas.bind("<MouseWheel>", self._on_viewport_change)
         canvas.bind("<Button-4>", self._on_viewport_change)
         canvas.bind("<Button-5>", self._on_viewport_change)
-        self._last_viewport_update = 0
 
     def _on_viewport_change(self, event):
-        """Handle map viewport changes - update visible edges"""
-        current_time = time.time()
-        if current_time - self._last_viewport_update < 0.2:
+        """Handle map viewport changes - update visible edges once the view settles"""
+        self.scheduler.request_viewport(self._on_viewport_settled)
+
+    def _on_viewport_settled(self):
+        self._update_visible_edges()
+        if self.labels_enabled:
+            self.display_node_labels()
+
+    def _get_viewport_bounds(self):
+        """Return the current viewport as (lat_s, lon_w, lat_n, lon_e), or None if unknown."""
+        # 1) If a get_bounds() method exists, use it:
+        if hasattr(self.map_widget, "get_bounds"):
+            northeast, southwest = self.map_widget.get_bounds()
+
+        # 2) Otherwise, fall back to converting canvas corners:
+        elif hasattr(self.map_widget, "convert_canvas_coords_to_decimal_coords"):
+            canvas = self.map_widget.canvas
+            w, h = canvas.winfo_width(), canvas.winfo_height()
+            ne_lat, ne_lon = self.map_widget.convert_canvas_coords_to_decimal_coords(w, 0)
+            sw_lat, sw_lon = self.map_widget.convert_canvas_coords_to_decimal_coords(0, h)
+            northeast, southwest = (ne_lat, ne_lon), (sw_lat, sw_lon)
+
+        # 3) If neither is available, we can't proceed:
+        else:
+            return None
+
+        lat_n, lon_e = northeast
+        lat_s, lon_w = southwest
+        return lat_s, lon_w, lat_n, lon_e
+
+    def _current_zoom(self):
+        return getattr(self.map_widget, "zoom", None)
+
+    def _chain_spec(self, chain_id):
+        # Use neon green for all edges
+        return self.edge_chains.polylines[chain_id], NEON_GREEN, 1
+
+    def _draw_priority(self, coords, rank, bounds):
+        """Lower is drawn first: near the viewport centre and major road classes."""
+        if bounds is None:
+            return rank
+        lat_s, lon_w, lat_n, lon_e = bounds
+        lat, lon = coords[len(coords) // 2]
+        diag = math.hypot(lat_n - lat_s, lon_e - lon_w) or 1e-9
+        dist = math.hypot(lat - (lat_s + lat_n) / 2, lon - (lon_w + lon_e) / 2) / diag
+        return dist + RANK_PRIORITY_WEIGHT * rank
+
+    def _schedule_network(self, specs, ranks):
+        """
+        Render exactly ``specs``: objects that left the view are hidden at once, and
+        new ones are queued in priority order, replacing any stale pending work.
+        """
+        with self.edge_batch_lock:
+            self.edge_pool.hide_many(self.edge_pool.active_keys() - specs.keys())
+            pending = [key for key in specs if key not in self.edge_pool.active]
+
+        bounds = self._get_viewport_bounds()
+        self.scheduler.submit(
+            ((self._draw_priority(specs[key][0], ranks[key], bounds), key) for key in pending),
+            lambda key: self._draw_network_item(key, specs[key]))
+
+    def _draw_network_item(self, key, spec):
+        with self.edge_batch_lock:
+            self.edge_pool.show(key, spec)
+
+    def chains_for_path(self, path):
+        """Return the chain ids drawing the edges of a node path (for highlighting)."""
+        edge_ids = [self.edge_index.get((u, v)) for u, v in zip(path[:-1], path[1:])]
+        return self.edge_chains.chains_for_edges(e for e in edge_ids if e is not None)
+
+    def _covered_chains(self, paths):
+        """Chains every edge of which lies on one of the paths, i.e. hidden under the route line."""
+        pairs = {(u, v) if u <= v else (v, u) for path in paths for u, v in zip(path[:-1], path[1:])}
+        candidates = set().union(*(self.chains_for_path(path) for path in paths))
+        return {c for c in candidates
+                if all((u, v) in pairs or (v, u) in pairs
+                       for u, v in (self.edge_nodes[e] for e in self.edge_chains.edge_ids[c]))}
+
+    def _set_route_chains(self, chains):
+        """Skip drawing the network chains the route line covers; restore those it no longer does."""
+        if chains == self.route_chains:
+            return
+        self.route_chains = chains
+        if self.overlay is None and self.current_lod_tier is None and self.visible_chains:
+            self._update_edge_visibility(self.visible_chains)
+
+    def _show_lod_tier(self, tier):
+        """Swap the drawn network to a precomputed level-of-detail tier, culled to the viewport for fine tiers."""
+        visible = tier.visible(self._get_viewport_bounds())
+        if tier is self.current_lod_tier and visible == self.visible_lod:
             return
-        self._last_viewport_update = current_time
-        self.map_widget.after(200, self._update_visible_edges)
+        specs, ranks = {}, {}
+        for i in visible:
+            key = ("lod", tier.max_zoom, i)
+            rank = tier.ranks[i]
+            specs[key] = (tier.polylines[i], NEON_GREEN, 2 if rank <= MAJOR_RANK else 1)
+            ranks[key] = rank
+        # The previous tier's or chains' objects are hidden and reused for this tier
+        self._schedule_network(specs, ranks)
+        self.visible_chains.clear()
+        self.current_lod_tier = tier
+        self.visible_lod = visible
+
+    def _show_overlay(self):
+        """Show the raster overlay tiles for the current viewport and zoom."""
+        zoom = self._current_zoom()
+        if zoom is not None:
+            self.overlay.show(self._get_viewport_bounds(), zoom)
 
     def _update_visible_edges(self):
         """Update which edges are visible based on the current map viewport."""
         if not self.edge_coords:
             return
 
+        if self.overlay is not None:
+            self._show_overlay()
+            return
+
+        # Zoomed out: draw the precomputed tier for this zoom instead of individual edges
+        tier = tier_for_zoom(self.lod_tiers, self._current_zoom())
+        if tier is not None:
+            self._show_lod_tier(tier)
+            return
+
         try:
-            # 1) If a get_bounds() method exists, use it:
-            if hasattr(self.map_widget, "get_bounds"):
-                northeast, southwest = self.map_widget.get_bounds()
-
-            # 2) Otherwise, fall back to converting canvas corners:
-            elif hasattr(self.map_widget, "convert_canvas_coords_to_decimal_coords"):
-                canvas = self.map_widget.canvas
-                w, h = canvas.winfo_width(), canvas.winfo_height()
-                ne_lat, ne_lon = self.map_widget.convert_canvas_coords_to_decimal_coords(w, 0)
-                sw_lat, sw_lon = self.map_widget.convert_canvas_coords_to_decimal_coords(0, h)
-                northeast, southwest = (ne_lat, ne_lon), (sw_lat, sw_lon)
-
-            # 3) If neither is available, we can't proceed:
-            else:
+            bounds = self._get_viewport_bounds()
+            if bounds is None:
                 # If we can't determine the viewport, show all edges
                 self._display_all_edges()
                 return
 
-            lat_n, lon_e = northeast
-            lat_s, lon_w = southwest
-
-            visible = set()
-            for edge_id, (start, end) in enumerate(self.edge_coords):
-                lat1, lon1 = start
-                lat2, lon2 = end
-                if (min(lat1, lat2) <= lat_n and max(lat1, lat2) >= lat_s and
-                        min(lon1, lon2) <= lon_e and max(lon1, lon2) >= lon_w):
-                    visible.add(edge_id)
+            # Only the grid cells under the viewport are inspected
+            visible = self.chain_spatial_index.query(*bounds)
 
             # Ensure we're showing a minimum number of edges for better visualization
             # If very few edges are visible, show more edges to ensure graph connectivity is visible
@@ -159,12 +343,11 @@ class OptimizedGraphBuilder:
                 self._display_all_edges()
                 return
 
-            to_add = visible - self.visible_edges
-            to_remove = self.visible_edges - visible
-
-            if len(to_add) > 0 or len(to_remove) > 10:
-                self._update_edge_visibility(to_add, to_remove)
-                self.visible_edges = visible
+            # Leaving a tier: its polylines give way to the culled individual edges
+            if self.current_lod_tier is not None or visible != self.visible_chains:
+                self._update_edge_visibility(visible)
+                self.visible_chains = visible
+                self.current_lod_tier = None
 
         except Exception as e:
             warnings.warn(f"Error updating visible edges: {e}")
@@ -172,153 +355,158 @@ class OptimizedGraphBuilder:
             self._display_all_edges()
 
     def _display_all_edges(self):
-        """Fallback method to display all edges when viewport-based rendering fails"""
-        with self.edge_batch_lock:
-            for i, obj in enumerate(self.edge_objects):
-                if obj:
-                    try:
-                        obj.delete()
-                    except Exception:
-                        pass
-            self.edge_objects = [None] * len(self.edge_coords)
-
-            # Limit to a reasonable number of edges to avoid performance issues
-            max_edges = min(len(self.edge_coords), 1000)
-            step = max(1, len(self.edge_coords) // max_edges)
-
-            for edge_id in range(0, len(self.edge_coords), step):
-                if edge_id < len(self.edge_coords):
-                    u, v = self.edge_coords[edge_id]
-                    try:
-                        # Use neon green for all edges
-                        path_obj = self.map_widget.set_path([u, v], color=NEON_GREEN, width=1)
-                        if edge_id >= len(self.edge_objects):
-                            self.edge_objects.extend([None] * (edge_id - len(self.edge_objects) + 1))
-                        self.edge_objects[edge_id] = path_obj
-                        self.visible_edges.add(edge_id)
-                    except Exception as e:
-                        warnings.warn(f"Error drawing edge {edge_id}: {e}")
-
-    def _update_edge_visibility(self, to_add, to_remove):
-        """Update which edges are displayed on the map"""
-        with self.edge_batch_lock:
-            for edge_id in to_remove:
-                if edge_id < len(self.edge_objects) and self.edge_objects[edge_id]:
-                    try:
-                        self.edge_objects[edge_id].delete()
-                        self.edge_objects[edge_id] = None
-                    except Exception:
-                        pass
-
-            edges_to_add = list(to_add)[:EDGE_VISIBILITY_THRESHOLD]
-            for edge_id in edges_to_add:
-                if edge_id < len(self.edge_coords):
-                    u, v = self.edge_coords[edge_id]
-                    try:
-                        if edge_id >= len(self.edge_objects):
-                            self.edge_objects.extend([None] * (edge_id - len(self.edge_objects) + 1))
-                        # Use neon green for all edges
-                        path_obj = self.map_widget.set_path([u, v], color=NEON_GREEN, width=1)
-                        self.edge_objects[edge_id] = path_obj
-                    except Exception as e:
-                        warnings.warn(f"Error adding edge {edge_id}: {e}")
+        """Fallback that draws the whole network at the level of detail for the current zoom"""
+        if self.overlay is not None:
+            self._show_overlay()
+            return
+        if not self.lod_tiers:
+            return
+        # Past the last tier's zoom the most detailed tier is still far cheaper than every edge
+        tier = tier_for_zoom(self.lod_tiers, self._current_zoom()) or self.lod_tiers[-1]
+        self._show_lod_tier(tier)
+
+    def _update_edge_visibility(self, visible):
+        """Show exactly the given chains, reusing pooled path objects"""
+        visible = visible - self.route_chains
+        specs = {("chain", c): self._chain_spec(c) for c in visible}
+        ranks = {("chain", c): self.chain_ranks[c] for c in visible}
+        self._schedule_network(specs, ranks)
+
+    def get_render_stats(self):
+        """Objects created vs reused, per-update render times and scheduler throughput."""
+        return {"edges": self.edge_pool.stats(), "labels": self.label_pool.stats(),
+                "scheduler": dict(self.scheduler.stats, pending=self.scheduler.pending)}
 
     def clear_highlights(self):
         """Remove all paths, edges and node markers."""
-        for obj in self.highlight_objects + self.distance_markers + self.node_objects + self.node_labels:
+        for obj in self.highlight_objects + self.distance_markers + self.node_labels:
             try:
                 obj.delete()
             except Exception:
                 pass
 
+        # Network and label objects are parked, not deleted, so the next graph can reuse them
+        self.scheduler.cancel()
         with self.edge_batch_lock:
-            for i, obj in enumerate(self.edge_objects):
-                if obj:
-                    try:
-                        obj.delete()
-                    except Exception:
-                        pass
-            self.edge_objects = []
-
-        self._marker_icons.clear()
+            self.edge_pool.hide_all()
+            self.visible_chains.clear()
+            self.current_lod_tier = None
+        self.label_pool.hide_all()
+        self.labels_enabled = False
+        self.route_chains = set()
+        if self.overlay is not None:
+            self.overlay.clear()
+
+        if self.replay_player is not None:
+            self.replay_player.clear()
+            self.replay_player = None
+
         self.highlight_objects.clear()
         self.distance_markers.clear()
-        self.node_objects.clear()
         self.node_labels.clear()
-        self.visible_edges.clear()
         self.path_cache.clear()
         self.algorithm_results.clear()
 
-        self.loading_edges = False
-        while not self.edge_queue.empty():
-            try:
-                self.edge_queue.get_nowait()
-                self.edge_queue.task_done()
-            except Exception:
-                pass
-
     def _make_circle_icon(self, color, size=6):
-        img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        draw.ellipse((0, 0, size - 1, size - 1), fill=color, outline=color)
-        return ImageTk.PhotoImage(img)
+        key = (color, size)
+        icon = self._icon_cache.get(key)
+        if icon is None:
+            img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+            draw.ellipse((0, 0, size - 1, size - 1), fill=color, outline=color)
+            icon = self._icon_cache[key] = ImageTk.PhotoImage(img)
+        return icon
+
+    def _label_text_color(self):
+        """White or black label text, whichever contrasts with the map background."""
+        bg = self.map_widget.canvas.cget('bg')
+        if isinstance(bg, str) and bg.startswith('#') and len(bg) == 7:
+            r_bg = int(bg[1:3], 16)
+            g_bg = int(bg[3:5], 16)
+            b_bg = int(bg[5:7], 16)
+            lum = (0.299 * r_bg + 0.587 * g_bg + 0.114 * b_bg) / 255
+            return '#FFFFFF' if lum < 0.5 else '#000000'
+        return '#FFFFFF'
 
+    def _simplified_route_lines(self, paths):
+        """
+        Segments shared by several paths, chained and simplified once for all paths.
+
+        Returns:
+            List of [(lat, lon), ...] polylines
+        """
+        segments = {}
+        for path in paths:
+            for u, v in zip(path[:-1], path[1:]):
+                segments.setdefault((u, v) if u <= v else (v, u), (u, v))
+        seg_nodes = list(segments.values())
+        chains = build_chains(range(len(seg_nodes)), seg_nodes, max_edges=len(seg_nodes))
+
+        coords = np.array([self.node_coords[n] for nodes, _ in chains for n in nodes])
+        indices = np.repeat(np.arange(len(chains)), [len(nodes) for nodes, _ in chains])
+        lines = shapely.simplify(shapely.linestrings(coords, indices=indices), PATH_SIMPLIFICATION_TOLERANCE)
+        pts, idx = shapely.get_coordinates(lines, return_index=True)
+        splits = np.flatnonzero(np.diff(idx)) + 1
+        return [list(map(tuple, part)) for part in np.split(pts, splits) if len(part) >= 2]
+
+    @timed("highlight_paths")
     def highlight_paths(self, paths, width=3):
-        for obj in self.highlight_objects + self.distance_markers:
+        for obj in self.highlight_objects + self.distance_markers + self.node_labels:
             try:
                 obj.delete()
             except Exception:
                 pass
         self.highlight_objects.clear()
         self.distance_markers.clear()
-        self._marker_icons.clear()
+        self.node_labels.clear()
 
-        simplified_paths = []
-        for path in paths:
-            if len(path) < 2:
-                continue
-            line = LineString([self.node_coords[n] for n in path])
-            simp = line.simplify(PATH_SIMPLIFICATION_TOLERANCE)
-            if simp.geom_type == 'LineString':
-                simplified_paths.append(list(simp.coords))
-            else:
-                for part in getattr(simp, 'geoms', [line]):
-                    simplified_paths.append(list(part.coords))
-
-        for coords in simplified_paths:
+        paths = [path for path in paths if len(path) >= 2]
+        self._set_route_chains(self._covered_chains(paths) if paths else set())
+        if not paths:
+            return []
+
+        # Shared route segments are drawn once
+        for coords in self._simplified_route_lines(paths):
             p = self.map_widget.set_path(coords, color="#0000FF", width=width)
             self.highlight_objects.append(p)
 
-        bg = self.map_widget.canvas.cget('bg')
-        if isinstance(bg, str) and bg.startswith('#') and len(bg) == 7:
-            r_bg = int(bg[1:3], 16)
-            g_bg = int(bg[3:5], 16)
-            b_bg = int(bg[5:7], 16)
-            lum = (0.299 * r_bg + 0.587 * g_bg + 0.114 * b_bg) / 255
-            text_color = '#FFFFFF' if lum < 0.5 else '#000000'
-        else:
-            text_color = '#FFFFFF'
+        text_color = self._label_text_color()
 
-        for idx_path, coords in enumerate(simplified_paths):
+        # Marker spacing follows the zoom: ROUTE_MARKER_SPACING_PX in metres at the route's latitude
+        path_arrays = [np.array([self.node_coords[n] for n in path]) for path in paths]
+        mid_lat = float(path_arrays[0][:, 0].mean())
+        zoom = self._current_zoom() or 15
+        spacing = ROUTE_MARKER_SPACING_PX * 156543.03392 * math.cos(math.radians(mid_lat)) / 2 ** zoom
+        cell_deg = spacing / 111320.0
+        occupied = set()
+
+        for idx_path, arr in enumerate(path_arrays):
             hue = (idx_path * 0.618033988749895) % 1.0
             r, g, b = colorsys.hls_to_rgb(hue, 0.5, 1.0)
             node_color = f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}"
             icon = self._make_circle_icon(node_color, size=6)
-            self._marker_icons.append(icon)
-
-            step = max(1, len(coords) // 10)
-            for i in range(step, len(coords), step):
-                prev_lat, prev_lon = coords[i - step]
-                curr_lat, curr_lon = coords[i]
-                dist_m = ox.distance.great_circle(prev_lat, prev_lon,
-                                                  curr_lat, curr_lon)
+
+            seg = _haversine_m(arr[:-1, 0], arr[:-1, 1], arr[1:, 0], arr[1:, 1])
+            cum = np.concatenate(([0.0], np.cumsum(seg)))
+            last = 0
+            for i in _spaced_indices(cum, spacing):
+                if len(self.distance_markers) >= MAX_ROUTE_MARKERS:
+                    break
+                curr_lat, curr_lon = arr[i]
+                # Paths overlapping on shared segments don't stack labels on the same spot
+                cell = (round(curr_lat / cell_deg), round(curr_lon / cell_deg))
+                if cell in occupied:
+                    continue
+                occupied.add(cell)
+                dist_m = cum[i] - cum[last]
+                last = i
                 label = (f"{dist_m:.0f} m"
                          if dist_m < 1000
                          else f"{dist_m / 1000:.2f} km")
 
                 m = self.map_widget.set_marker(
-                    curr_lat,
-                    curr_lon,
+                    float(curr_lat),
+                    float(curr_lon),
                     text=label,
                     font=("Helvetica", 8, "bold"),
                     icon=icon,
@@ -327,99 +515,89 @@ class OptimizedGraphBuilder:
                 )
                 self.distance_markers.append(m)
 
-        # Add node markers for the path nodes
-        if paths and paths[0]:
-            path = paths[0]  # Use the first path for node labels
-            for node in path:
-                lat, lon = self.node_coords[node]
-                # Create a node label with its sequential ID
-                seq_id = self.node_id_map.get(node, 0)
-                node_label = f"Node {seq_id}"
-                m = self.map_widget.set_marker(
-                    lat, lon,
-                    text=node_label,
-                    font=("Helvetica", 10, "bold"),
-                    text_color=text_color,
-                    marker_color_circle="blue",
-                    marker_color_outside="white",
-                    icon_anchor="center"
-                )
-                self.node_labels.append(m)
+        # Add node markers for the first path: its ends plus nodes at marker spacing
+        path = paths[0]
+        arr = path_arrays[0]
+        cum = np.concatenate(([0.0], np.cumsum(_haversine_m(arr[:-1, 0], arr[:-1, 1], arr[1:, 0], arr[1:, 1]))))
+        picks = sorted({0, len(path) - 1, *_spaced_indices(cum, spacing).tolist()})[:MAX_ROUTE_MARKERS]
+        for i in picks:
+            node = path[i]
+            lat, lon = self.node_coords[node]
+            # Create a node label with its sequential ID
+            seq_id = self.node_id_map.get(node, 0)
+            node_label = f"Node {seq_id}"
+            m = self.map_widget.set_marker(
+                lat, lon,
+                text=node_label,
+                font=("Helvetica", 10, "bold"),
+                text_color=text_color,
+                marker_color_circle="blue",
+                marker_color_outside="white",
+                icon_anchor="center"
+            )
+            self.node_labels.append(m)
 
         return self.highlight_objects + self.distance_markers + self.node_labels
 
     def display_node_labels(self):
-        """Display labels for all nodes in the graph"""
-        for obj in self.node_objects + self.node_labels:
-            try:
-                obj.delete()
-            except Exception:
-                pass
-        self.node_objects.clear()
-        self.node_labels.clear()
-
-        # Get text color based on background
-        bg = self.map_widget.canvas.cget('bg')
-        if isinstance(bg, str) and bg.startswith('#') and len(bg) == 7:
-            r_bg = int(bg[1:3], 16)
-            g_bg = int(bg[3:5], 16)
-            b_bg = int(bg[5:7], 16)
-            lum = (0.299 * r_bg + 0.587 * g_bg + 0.114 * b_bg) / 255
-            text_color = '#FFFFFF' if lum < 0.5 else '#000000'
-        else:
-            text_color = '#FFFFFF'
-
+        """
+        Display labels for the nodes in the viewport, diffing against those already shown.
+
+        Zoomed out (or with too many nodes in view) nodes are aggregated into grid
+        clusters showing a count; the starting node is always labelled.
+        """
+        self.labels_enabled = True
+        text_color = self._label_text_color()
         # Create a larger icon for the starting node (Node 1)
         start_node_icon = self._make_circle_icon("red", size=12)
         # Create a smaller icon for other nodes
         node_icon = self._make_circle_icon("orange", size=8)
-        self._marker_icons.append(start_node_icon)
-        self._marker_icons.append(node_icon)
-
-        # Limit the number of nodes to display to avoid performance issues
-        visible_nodes = set()
 
         # Get current viewport
-        if hasattr(self.map_widget, "get_bounds"):
-            northeast, southwest = self.map_widget.get_bounds()
-            lat_n, lon_e = northeast
-            lat_s, lon_w = southwest
-
+        bounds = self._get_viewport_bounds()
+        if bounds is not None and self.node_spatial_index is not None:
             # Filter nodes to those in the viewport
-            for node, (lat, lon) in self.node_coords.items():
-                if (lat <= lat_n and lat >= lat_s and lon <= lon_e and lon >= lon_w):
-                    visible_nodes.add(node)
+            visible_nodes = self.node_spatial_index.query(*bounds)
         else:
-            # If we can't get bounds, limit to a reasonable number
-            visible_nodes = set(list(self.node_coords.keys())[:100])
+            # Without a viewport, cluster the whole graph instead of labelling every node
+            visible_nodes = set(self.node_coords)
+        visible_nodes.discard(self.starting_node)
+
+        specs = {}
+        zoom = self._current_zoom()
+        if zoom is not None and zoom >= LABEL_MIN_ZOOM and len(visible_nodes) <= MAX_NODE_LABELS:
+            # Add node markers with sequential labels
+            font = ("Helvetica", 8, "normal")
+            for node in visible_nodes:
+                lat, lon = self.node_coords[node]
+                specs[node] = (lat, lon, f"Node {self.node_id_map.get(node, 0)}", font, text_color, node_icon)
+        else:
+            # Cell size of LABEL_CLUSTER_PX screen pixels at this zoom (256 px tiles)
+            cell = LABEL_CLUSTER_PX * 360.0 / (256 * 2 ** round(zoom if zoom is not None else 12))
+            font = ("Helvetica", 9, "bold")
+            clusters = grid_clusters(((n, self.node_coords[n]) for n in visible_nodes), cell)
+            for (row, col), (count, lat, lon, nodes) in clusters.items():
+                if count == 1:
+                    node = nodes[0]
+                    lat, lon = self.node_coords[node]
+                    specs[node] = (lat, lon, f"Node {self.node_id_map.get(node, 0)}", font, text_color, node_icon)
+                else:
+                    size = min(24, 10 + 2 * int(math.log2(count)))
+                    icon = self._make_circle_icon("orange", size=size)
+                    # Keyed by zoom and cell so clusters stay put (and pooled) while panning
+                    specs[("cluster", round(zoom or 0), row, col)] = (lat, lon, str(count), font, text_color, icon)
 
         # Ensure the starting node (Node 1) is always included
-        if self.starting_node and self.starting_node in self.node_coords:
-            visible_nodes.add(self.starting_node)
-
-        # Add node markers with sequential labels
-        for node in visible_nodes:
-            lat, lon = self.node_coords[node]
-            seq_id = self.node_id_map.get(node, 0)
-
-            # Determine if this is the starting node (Node 1)
-            is_starting_node = (seq_id == 1)
-
-            font_size = 10 if is_starting_node else 8
-            icon = start_node_icon if is_starting_node else node_icon
-
-            m = self.map_widget.set_marker(
-                lat, lon,
-                text=f"Node {seq_id}",
-                font=("Helvetica", font_size, "bold" if is_starting_node else "normal"),
-                text_color=text_color,
-                icon=icon,
-                icon_anchor="center"
-            )
-            self.node_labels.append(m)
+        if self.starting_node is not None and self.starting_node in self.node_coords:
+            lat, lon = self.node_coords[self.starting_node]
+            specs[self.starting_node] = (lat, lon, "Node 1", ("Helvetica", 10, "bold"), text_color, start_node_icon)
 
-        return self.node_labels
+        # Only labels that entered or left the view are added or removed
+        self.label_pool.update(specs)
+        return self.label_pool.active_objects()
 
+    @_profiled("build")
+    @timed("build_graph")
     def build_graph(self, start, end, use_bbox=False, buffer=1000):
         self.clear_highlights()
 
@@ -430,18 +608,23 @@ class OptimizedGraphBuilder:
         straight = ox.distance.great_circle(lat1, lon1, lat2, lon2)
         radius = straight / 2 + buffer
         center = ((lat1 + lat2) / 2, (lon1 + lon2) / 2)
+        prefix = "ex" if self.extract is not None else "pt"
         fname = os.path.join(self.cache_dir,
-                             f"pt_{center[0]:.5f}_{center[1]:.5f}_{radius:.0f}.graphml")
-        G0 = load_or_build_graph(center, radius, fname)
-        G0 = ox.distance.add_edge_lengths(G0)
-        Gp = ox.project_graph(G0)
+                             f"{prefix}_{center[0]:.5f}_{center[1]:.5f}_{radius:.0f}.graphml")
+        G0 = load_or_build_graph(center, radius, fname, extract=self.extract)
+        self.graph_key = os.path.splitext(os.path.basename(fname))[0]
+        with span("add_edge_lengths"):
+            G0 = ox.distance.add_edge_lengths(G0)
+        with span("project_graph"):
+            Gp = ox.project_graph(G0)
 
         self.node_coords = {n: (d['y'], d['x'])
                             for n, d in G0.nodes(data=True)}
 
         # Find the node closest to the start point - this will be assigned ID 1
         self.proj_s = ox.projection.project_geometry(Point(lon1, lat1), crs=G0.graph.get('crs'))[0]
-        orig_node = ox.distance.nearest_nodes(Gp, X=self.proj_s.x, Y=self.proj_s.y)
+        with span("nearest_nodes"):
+            orig_node = ox.distance.nearest_nodes(Gp, X=self.proj_s.x, Y=self.proj_s.y)
 
         # Create sequential node ID mapping starting from 1, with orig_node as ID 1
         nodes = list(G0.nodes())
@@ -459,89 +642,64 @@ class OptimizedGraphBuilder:
         # Keep track of the starting node
         self.starting_node = orig_node
 
+        edges = list(G0.edges(data=True))
+        self.edge_nodes = [(u, v) for u, v, _ in edges]
+        self.edge_index = {}
+        for edge_id, uv in enumerate(self.edge_nodes):
+            self.edge_index.setdefault(uv, edge_id)
+        self.edge_ranks = [road_rank(d.get('highway')) for _, _, d in edges]
+        self.edge_names = [street_name(d.get('name')) for _, _, d in edges]
         self.edge_coords = [
             ((G0.nodes[u]['y'], G0.nodes[u]['x']),
              (G0.nodes[v]['y'], G0.nodes[v]['x']))
-            for u, v in G0.edges()
+            for u, v in self.edge_nodes
         ]
 
-        self.edge_objects = [None] * len(self.edge_coords)
+        self.edge_chains = EdgeChains.from_edges(self.edge_nodes, self.node_coords, self.edge_names)
+        self.chain_spatial_index = GridIndex.from_segments(self.edge_chains.polylines)
+        self.chain_ranks = [min(self.edge_ranks[e] for e in ids) for ids in self.edge_chains.edge_ids]
+        self.node_spatial_index = GridIndex.from_points(self.node_coords)
+        self.lod_tiers = build_lod_tiers(self.edge_nodes, self.edge_ranks, self.node_coords, self.edge_names)
+        if self.overlay is not None:
+            self.overlay.set_graph(self.graph_key, self.edge_chains.polylines, self.chain_spatial_index)
 
         crs = G0.graph.get('crs')
         self.proj_s = ox.projection.project_geometry(Point(lon1, lat1), crs=crs)[0]
         self.proj_e = ox.projection.project_geometry(Point(lon2, lat2), crs=crs)[0]
-        self.orig_node = ox.distance.nearest_nodes(Gp,
-                                                   X=self.proj_s.x,
-                                                   Y=self.proj_s.y)
-        self.dest_node = ox.distance.nearest_nodes(Gp,
-                                                   X=self.proj_e.x,
-                                                   Y=self.proj_e.y)
+        with span("nearest_nodes"):
+            self.orig_node = ox.distance.nearest_nodes(Gp,
+                                                       X=self.proj_s.x,
+                                                       Y=self.proj_s.y)
+            self.dest_node = ox.distance.nearest_nodes(Gp,
+                                                       X=self.proj_e.x,
+                                                       Y=self.proj_e.y)
         self.G_proj = Gp
-        self.G_simple = ox.convert.to_digraph(Gp, weight=self.weight)
+        with span("to_digraph"):
+            self.G_simple = ox.convert.to_digraph(Gp, weight=self.weight)
 
         # Force display all edges initially for better visualization
         self._display_all_edges()
 
         return self
 
-    def _process_edge_queue(self):
-        if not self.loading_edges:
-            return
-
-        with self.edge_batch_lock:
-            edges_to_draw = []
-            for _ in range(min(MAX_EDGES_PER_BATCH, self.edge_queue.qsize())):
-                if not self.loading_edges:
-                    break
-                try:
-                    edge_id = self.edge_queue.get_nowait()
-                    edges_to_draw.append(edge_id)
-                    self.edge_queue.task_done()
-                except Exception:
-                    break
-
-            for edge_id in edges_to_draw:
-                if edge_id in self.visible_edges and edge_id < len(self.edge_coords):
-                    u, v = self.edge_coords[edge_id]
-                    try:
-                        if edge_id >= len(self.edge_objects):
-                            self.edge_objects.extend([None] * (edge_id - len(self.edge_objects) + 1))
-                        # Use neon green for all edges
-                        path_obj = self.map_widget.set_path([u, v], color=NEON_GREEN, width=1)
-                        self.edge_objects[edge_id] = path_obj
-                    except Exception:
-                        pass
-
-        if self.loading_edges and not self.edge_queue.empty():
-            self.map_widget.after(int(EDGE_BATCH_DELAY * 1000), self._process_edge_queue)
-
+    # Times queueing plus the first frame; the drawing itself shows up as
+    # render_frame / render_batch spans from RenderScheduler
+    @timed("display_graph")
     def display_graph(self, color=NEON_GREEN, width=1):
+        self.scheduler.cancel()
         with self.edge_batch_lock:
-            for i, obj in enumerate(self.edge_objects):
-                if obj:
-                    try:
-                        obj.delete()
-                    except Exception:
-                        pass
-            self.edge_objects = [None] * len(self.edge_coords)
-            self.visible_edges.clear()
-
-        self.loading_edges = True
-
-        # Initially force display all edges
-        self._display_all_edges()
-
-        # Queue remaining edges for progressive loading if needed
-        for edge_id in range(len(self.edge_coords)):
-            if edge_id not in self.visible_edges:
-                self.edge_queue.put(edge_id)
+            self.edge_pool.hide_all()
+            self.visible_chains.clear()
+            self.current_lod_tier = None
 
-        self._process_edge_queue()
+        # Draws the overlay, the LOD tier or the culled chains for the current view,
+        # nearest and most important roads first
+        self._update_visible_edges()
 
         # Display node labels
         self.display_node_labels()
 
-        return self.edge_objects
+        return self.edge_pool.active_objects()
 
     def find_k_paths(self, k=5, weight=None):
         if not all([self.G_simple, self.orig_node, self.dest_node]):
@@ -553,21 +711,27 @@ class OptimizedGraphBuilder:
                 k, weight or self.weight)
         return self.path_cache[key]
 
+    @_profiled("route", "dijkstra")
     def run_dijkstra(self):
         """Run Dijkstra's algorithm and format the explanation"""
         if not all([self.G_simple, self.orig_node, self.dest_node]):
             raise RuntimeError("Graph not initialized")
 
         # Run Dijkstra with step tracking
-        dist, prev, steps = PathAlgorithms.dijkstra(
-            self.G_simple, self.orig_node, self.dest_node, self.weight)
+        counter = OperationCounter([]) if self.count_operations else None
+        with span("algorithm", algorithm="dijkstra", graph=self.graph_key):
+            dist, prev, steps = PathAlgorithms.dijkstra(
+                self.G_simple, self.orig_node, self.dest_node, self.weight, steps=counter)
+        operations = None
+        if counter is not None:
+            steps, operations = counter.sink, counter.counts()
 
         # Reconstruct path
         path = PathAlgorithms.reconstruct_path(prev, self.orig_node, self.dest_node)
 
         # Generate explanation with sequential node IDs
         explanation = self._format_steps_explanation_with_seq_ids(
-            self.G_simple, steps, prev, self.orig_node, self.dest_node)
+            self.G_simple, steps, prev, self.orig_node, self.dest_node, operations)
 
         # Store results
         self.algorithm_results["dijkstra"] = {
@@ -575,27 +739,39 @@ class OptimizedGraphBuilder:
             "dist": dist,
             "prev": prev,
             "steps": steps,
-            "explanation": explanation
+            "explanation": explanation,
+            "operations": operations
         }
 
+        if self.trace_dir:
+            self.export_trace("dijkstra", os.path.join(self.trace_dir, self._trace_name("dijkstra")))
+
         # Highlight the path
         if path:
             self.highlight_paths([path])
 
         return path, explanation
 
+    @_profiled("route", "bellman_ford")
     def run_bellman_ford(self):
         """Run Bellman-Ford algorithm and format the explanation"""
         if not all([self.G_simple, self.orig_node, self.dest_node]):
             raise RuntimeError("Graph not initialized")
 
         # Run Bellman-Ford with step tracking
-        dist, prev, steps = PathAlgorithms.bellman_ford(
-            self.G_simple, self.orig_node, self.dest_node, self.weight)
+        counter = OperationCounter([]) if self.count_operations else None
+        with span("algorithm", algorithm="bellman_ford", graph=self.graph_key):
+            dist, prev, steps = PathAlgorithms.bellman_ford(
+                self.G_simple, self.orig_node, self.dest_node, self.weight, steps=counter)
+        operations = None
+        if counter is not None:
+            steps, operations = counter.sink, counter.counts()
 
         # Check if a path was found (could be None if negative cycle was detected)
         if dist is None or prev is None:
             explanation = "Negative cycle detected in the graph. Cannot find shortest path."
+            if operations:
+                explanation += "\n" + format_operation_counts(operations) + "\n"
             path = []
         else:
             # Reconstruct path
@@ -603,7 +779,7 @@ class OptimizedGraphBuilder:
 
             # Generate explanation with sequential node IDs
             explanation = self._format_steps_explanation_with_seq_ids(
-                self.G_simple, steps, prev, self.orig_node, self.dest_node)
+                self.G_simple, steps, prev, self.orig_node, self.dest_node, operations)
 
         # Store results
         self.algorithm_results["bellman_ford"] = {
@@ -611,56 +787,84 @@ class OptimizedGraphBuilder:
             "dist": dist,
             "prev": prev,
             "steps": steps,
-            "explanation": explanation
+            "explanation": explanation,
+            "operations": operations
         }
 
+        if self.trace_dir:
+            self.export_trace("bellman_ford", os.path.join(self.trace_dir, self._trace_name("bellman_ford")))
+
         # Highlight the path
         if path:
             self.highlight_paths([path])
 
         return path, explanation
 
-    def _format_steps_explanation_with_seq_ids(self, G, steps, prev, source, target):
-        """Format algorithm steps with sequential node IDs for better readability"""
+    def create_replay(self, algorithm, on_progress=None, on_finish=None, on_ready=None):
+        """
+        Create an animated replay of a stored run ("dijkstra" or "bellman_ford") on the map.
+        Seek keyframes are built in the background on the Tk loop; ``on_ready`` fires when seeking is available.
+        """
+        result = self.algorithm_results.get(algorithm)
+        if not result or not result.get("steps"):
+            raise RuntimeError(f"No recorded steps for {algorithm}; run it first")
+        if self.replay_player is not None:
+            self.replay_player.clear()
+        replay = StepReplay(result["steps"], self.orig_node, build=False)
+        self.replay_player = ReplayPlayer(self.map_widget, replay, self.node_coords,
+                                          on_progress=on_progress, on_finish=on_finish, on_ready=on_ready)
+        return self.replay_player
+
+    def _trace_name(self, algorithm):
+        return f"{self.graph_key}_{algorithm}_{self.orig_node}_{self.dest_node}"
+
+    def export_trace(self, algorithm, path=None):
+        """
+        Write the step trace of a stored run ("dijkstra" or "bellman_ford") as a columnar trace.
+
+        Args:
+            algorithm: Which stored run to export
+            path: Trace directory (default: <cache_dir>/traces/<graph>_<algorithm>_<orig>_<dest>)
+
+        Returns:
+            Path of the written trace, readable with Main.trace_export.TraceReader
+        """
+        result = self.algorithm_results.get(algorithm)
+        if not result or not result.get("steps"):
+            raise RuntimeError(f"No recorded steps for {algorithm}; run it first")
+        path = path or os.path.join(self.cache_dir, "traces", self._trace_name(algorithm))
+        metadata = {
+            "graph": self.graph_key,
+            "algorithm": algorithm,
+            "source": self.orig_node,
+            "target": self.dest_node,
+            "weight": self.weight,
+            "nodes": self.G_simple.number_of_nodes(),
+            "edges": self.G_simple.number_of_edges(),
+            "path_length": len(result["path"]),
+        }
+        write_trace(path, result["steps"], metadata=metadata, nodes=self.G_simple.nodes())
+        return path
+
+    @timed("format_explanation")
+    def _format_steps_explanation_with_seq_ids(self, G, steps, prev, source, target, operations=None):
+        """Lazily formatted explanation using sequential node IDs for better readability"""
         if not steps:
             return "No steps recorded during algorithm execution."
 
-        explanation = []
-        explanation.append(f"Starting from Node {self.node_id_map.get(source, '?')} (original ID: {source})")
-
-        for step_num, step in enumerate(steps, 1):
-            if isinstance(step, dict):  # Distance update
-                step_details = []
-                for node, (dist, prev_node) in step.items():
-                    seq_node_id = self.node_id_map.get(node, '?')
-                    seq_prev_id = self.node_id_map.get(prev_node, '?') if prev_node is not None else 'None'
-
-                    step_details.append(
-                        f"Updated Node {seq_node_id}: distance = {dist:.2f}, previous = Node {seq_prev_id}")
-
-                explanation.append(f"Step {step_num}:")
-                explanation.extend([f"  {detail}" for detail in sorted(step_details)])
-            elif isinstance(step, tuple) and len(step) == 3:  # Node selection (Dijkstra)
-                node, dist, _ = step
-                seq_node_id = self.node_id_map.get(node, '?')
-                explanation.append(f"Step {step_num}: Selected Node {seq_node_id} with distance {dist:.2f}")
+        seq_id = self.node_id_map.get
+        header = f"Starting from Node {seq_id(source, '?')} (original ID: {source})\n"
+        if operations:
+            header = format_operation_counts(operations) + "\n\n" + header
 
         # Reconstruct the path using sequential IDs
-        if target in prev or target == source:
-            path = []
-            at = target
-            while at is not None:
-                path.append(at)
-                at = prev.get(at)
-            path.reverse()
-
-            path_str = " → ".join([f"Node {self.node_id_map.get(n, '?')}" for n in path])
+        # prev holds every node (None when unreached), so only the reconstructed path tells
+        path = PathAlgorithms.reconstruct_path(prev, source, target)
+        if path:
+            path_str = " → ".join([f"Node {seq_id(n, '?')}" for n in path])
             total_dist = sum(G[u][v].get(self.weight, 0) for u, v in zip(path[:-1], path[1:]))
-
-            explanation.append(f"\nFinal shortest path ({total_dist:.2f} units):")
-            explanation.append(path_str)
+            footer = f"\nFinal shortest path ({total_dist:.2f} units):\n{path_str}\n"
         else:
-            explanation.append(
-                f"\nNo path found from Node {self.node_id_map.get(source, '?')} to Node {self.node_id_map.get(target, '?')}")
+            footer = f"\nNo path found from Node {seq_id(source, '?')} to Node {seq_id(target, '?')}\n"
 
-        return "\n".join(explanation)
\ No newline at end of file
+        return PagedExplanation(steps, header=header, footer=footer, node_id=lambda n: seq_id(n, '?'))
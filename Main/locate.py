@@ -2,71 +2,108 @@
 
 import tkinter as tk
 import logging
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 import threading
 
+from Main.geocode_cache import MISS, shared_cache
+from Main.geocode_scheduler import PRIORITY_SEARCH, shared_scheduler
+from Main.performance_metrics import span
+
 # Configure logging (can also be configured to write to a file)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 class LocationHandler:
-    def __init__(self, map_viewer, text_output):
+    def __init__(self, map_viewer, text_output, cache=None, scheduler=None):
         """
         :param map_viewer: The tkintermapview widget to display the map.
         :param text_output: A text widget to output search messages.
+        :param cache: GeocodeCache to use (default: the persistent cache shared with autocomplete).
+        :param scheduler: GeocodeScheduler to send requests through (default: the shared one).
         """
         self.map_viewer = map_viewer
         self.text_output = text_output
-        self.geolocator = Nominatim(
-            user_agent="ShortestPathFinder/1.0 (robertjhonaracenab@gmail.com)"
-        )
-        self.geocode = RateLimiter(
-            self.geolocator.geocode,
-            min_delay_seconds=1,
-            max_retries=3
-        )
-        self.cache = {}
-        self.cache_lock = threading.Lock()  # Ensure thread-safe cache access.
+        # All Nominatim traffic goes through one rate-limited, prioritised scheduler,
+        # which also coalesces concurrent lookups of the same address.
+        self.scheduler = scheduler if scheduler is not None else shared_scheduler()
+        self.cache = cache if cache is not None else shared_cache()
         self.markers = {}  # Dictionary to store marker references by location type ("FROM", "TO").
 
+        # Latest search per location type; older ones are cancelled or their results dropped.
+        # The lock only guards these dictionaries and is never held during network I/O.
+        self.search_lock = threading.Lock()
+        self.generations = {}
+        self.pending = {}
+
         # Use a ThreadPoolExecutor to limit concurrent geocoding threads.
         self.executor = ThreadPoolExecutor(max_workers=4)
 
     def search_location(self, address, location_type):
         """
-        Submit a geocoding task to the thread pool.
+        Submit a geocoding task to the thread pool, superseding any earlier
+        search for the same location type.
         :param address: The address string to search.
         :param location_type: "FROM" or "TO".
         """
-        self.executor.submit(self._search_location_thread, address, location_type)
+        with self.search_lock:
+            generation = self.generations.get(location_type, 0) + 1
+            self.generations[location_type] = generation
+            previous = self.pending.get(location_type)
+            if previous is not None:
+                previous.cancel()  # Only succeeds while it is still queued.
+            self.pending[location_type] = self.executor.submit(
+                self._search_location_thread, address, location_type, generation)
+
+    def _is_current(self, location_type, generation):
+        return self.generations.get(location_type) == generation
+
+    def _geocode(self, address, location_type):
+        """
+        Geocode through the scheduler at search priority. A newer search for the
+        same location type drops this request if it has not been sent yet.
+        """
+        with span("geocode", address=address):
+            location = self.scheduler.geocode(address, PRIORITY_SEARCH, channel=(id(self), location_type),
+                                              exactly_one=True)
+        # Reached only when Nominatim answered: errors raise, so None really means "not found"
+        self.cache.put_location(address, location)
+        logging.info("Geocoded '%s' successfully.", address)
+        return location
 
-    def _search_location_thread(self, address, location_type):
+    def _search_location_thread(self, address, location_type, generation):
         try:
-            with self.cache_lock:
-                if address in self.cache:
-                    location = self.cache[address]
-                    logging.info("Using cached geocode result for '%s'.", address)
-                else:
-                    location = self.geocode(address, exactly_one=True)
-                    self.cache[address] = location
-                    logging.info("Geocoded '%s' successfully.", address)
+            if not self._is_current(location_type, generation):
+                return
+            location = self.cache.get_location(address)
+            if location is not MISS:
+                logging.info("Using cached geocode result for '%s'.", address)
+            else:
+                location = self._geocode(address, location_type)
+            if not self._is_current(location_type, generation):
+                logging.info("Dropping superseded %s search for '%s'.", location_type, address)
+                return
 
             if location:
                 lat, lon = location.latitude, location.longitude
-                self.map_viewer.after(0, lambda: self._update_map(lat, lon, location_type))
-                self.map_viewer.after(0, lambda: self._append_text(
-                    f"{location_type} location set at ({lat}, {lon}).\n\n"))
+                self.map_viewer.after(0, lambda: self._show_location(lat, lon, location_type, generation))
             else:
                 msg = f"Location {location_type} not found for address: {address}\n\n"
                 self.map_viewer.after(0, lambda: self._append_text(msg))
                 logging.error(msg)
+        except CancelledError:
+            logging.info("Dropped superseded %s search for '%s' before sending it.", location_type, address)
         except Exception as e:
             msg = f"Error searching for location {location_type}: {e}\n\n"
             self.map_viewer.after(0, lambda: self._append_text(msg))
             logging.exception("Error during geocoding:")
 
+    def _show_location(self, lat, lon, location_type, generation):
+        """Place the marker on the main thread unless a newer search has been submitted meanwhile."""
+        if not self._is_current(location_type, generation):
+            return
+        self._update_map(lat, lon, location_type)
+        self._append_text(f"{location_type} location set at ({lat}, {lon}).\n\n")
+
     def _update_map(self, lat, lon, location_type):
         """
         Update the map on the main thread:
@@ -0,0 +1,126 @@
+import ast
+from collections import defaultdict
+
+from shapely.geometry import LineString
+
+from Main.polyline_chains import MAX_CHAIN_EDGES, build_chains, dedupe_directions
+from Main.spatial_index import GridIndex
+
+# Lower rank = more important road; unknown classes are treated as minor streets
+HIGHWAY_RANK = {
+    "motorway": 0, "motorway_link": 0,
+    "trunk": 1, "trunk_link": 1,
+    "primary": 2, "primary_link": 2,
+    "secondary": 3, "secondary_link": 3,
+    "tertiary": 4, "tertiary_link": 4,
+    "unclassified": 5, "residential": 5,
+    "living_street": 6, "service": 6, "road": 6,
+}
+MINOR_RANK = 6
+MAJOR_RANK = 2  # motorway/trunk/primary are drawn first and wider
+
+# (max zoom, max road rank, simplification tolerance in degrees)
+# Above the last tier's zoom the full-detail, viewport-culled edges are drawn instead.
+LOD_TIER_SPECS = (
+    (12, 2, 0.0008),
+    (14, 4, 0.0003),
+    (16, MINOR_RANK, 0.0001),
+)
+LOD_FULL_DETAIL_ZOOM = LOD_TIER_SPECS[-1][0]
+LOD_CULL_ZOOM = 14  # tiers up to this zoom are drawn whole; finer tiers are culled to the viewport
+
+
+def road_rank(highway):
+    """Rank an OSM highway tag (string or list after simplification); lists take the best rank."""
+    if isinstance(highway, str) and highway.startswith("["):
+        # graphml round-trips merged tags as their list repr
+        try:
+            highway = ast.literal_eval(highway)
+        except (ValueError, SyntaxError):
+            pass
+    if isinstance(highway, (list, tuple)):
+        return min((road_rank(h) for h in highway), default=MINOR_RANK)
+    return HIGHWAY_RANK.get(highway, MINOR_RANK)
+
+
+class LODTier:
+    """Precomputed polylines for one zoom band, ordered major roads first."""
+
+    def __init__(self, max_zoom, max_rank, tolerance):
+        self.max_zoom = max_zoom
+        self.max_rank = max_rank
+        self.tolerance = tolerance
+        self.polylines = []  # list of [(lat, lon), ...]
+        self.ranks = []      # road rank of each polyline
+        self.edge_ids = []   # constituent edge ids of each polyline
+        self.spatial_index = GridIndex.from_segments([])
+
+    def __len__(self):
+        return len(self.polylines)
+
+    @property
+    def culled(self):
+        """Whether only the polylines under the viewport are drawn."""
+        return self.max_zoom > LOD_CULL_ZOOM
+
+    def visible(self, bounds):
+        """Indices of the polylines to draw for viewport ``bounds`` (all of them for coarse tiers)."""
+        if bounds is None or not self.culled:
+            return set(range(len(self.polylines)))
+        return self.spatial_index.query(*bounds)
+
+
+def _simplify(coords, tolerance):
+    if len(coords) <= 2 or tolerance <= 0:
+        return coords
+    simp = LineString(coords).simplify(tolerance, preserve_topology=False)
+    if simp.geom_type != 'LineString' or len(simp.coords) < 2:
+        return [coords[0], coords[-1]]
+    return list(simp.coords)
+
+
+def build_lod_tiers(edge_nodes, edge_ranks, node_coords, edge_names=None, specs=LOD_TIER_SPECS):
+    """
+    Precompute the drawing tiers for a graph.
+
+    Args:
+        edge_nodes: List of (u, v) node ids, indexed by edge id
+        edge_ranks: List of road ranks, indexed by edge id
+        node_coords: Dictionary of node id -> (lat, lon)
+        edge_names: Optional list of normalised street names, indexed by edge id
+        specs: Iterable of (max_zoom, max_rank, tolerance) tuples
+
+    Returns:
+        List of LODTier, sorted by max_zoom
+    """
+    all_ids = dedupe_directions(range(len(edge_nodes)), edge_nodes)
+    by_rank = defaultdict(list)
+    for edge_id in all_ids:
+        by_rank[edge_ranks[edge_id]].append(edge_id)
+
+    tiers = []
+    for max_zoom, max_rank, tolerance in sorted(specs):
+        tier = LODTier(max_zoom, max_rank, tolerance)
+        # Merge per rank so a chain never mixes a highway with side streets
+        for rank in sorted(r for r in by_rank if r <= max_rank):
+            # Bounded chains keep each polyline's bbox small enough to cull
+            for nodes, ids in build_chains(by_rank[rank], edge_nodes, edge_names, max_edges=MAX_CHAIN_EDGES):
+                coords = [node_coords[n] for n in nodes]
+                # Major roads keep their shape; minor streets are simplified harder
+                tol = tolerance / 2 if rank <= MAJOR_RANK else tolerance
+                tier.polylines.append(_simplify(coords, tol))
+                tier.ranks.append(rank)
+                tier.edge_ids.append(ids)
+        tier.spatial_index = GridIndex.from_segments(tier.polylines)
+        tiers.append(tier)
+    return tiers
+
+
+def tier_for_zoom(tiers, zoom):
+    """Return the tier covering ``zoom``, or None when full detail should be drawn."""
+    if zoom is None:
+        return None
+    for tier in tiers:
+        if zoom <= tier.max_zoom:
+            return tier
+    return None
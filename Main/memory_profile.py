@@ -0,0 +1,146 @@
+import gc
+import os
+import statistics
+import tracemalloc
+
+from Main.Algorithms.pathAlgorithms import PathAlgorithms
+from Main import DijsktraANDBellmanFord as reference
+from Main.benchmark import DiscardSteps, corpus_paths, load_graph, sample_od_pairs
+
+TRACE_FRAMES = 1  # frames kept per allocation; 1 is enough for line attribution
+TOP_LINES = 10
+
+# Allocations made by the profiler itself are not attributed to the code under test
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+
+def measure_memory(fn, top_lines=0, frames=TRACE_FRAMES):
+    """
+    Run ``fn`` under tracemalloc.
+
+    Peak is the highest traced memory above the starting point during the call;
+    retained is what is still allocated when it returns, i.e. held by the
+    result (distances, predecessors, step trace). tracemalloc only tracks
+    live allocations, so per-line attribution describes the retained memory.
+
+    Args:
+        fn: Callable taking no arguments
+        top_lines: Number of source lines to attribute retained memory to (0 = skip)
+        frames: Traceback depth recorded per allocation
+
+    Returns:
+        Tuple of (fn's return value, dictionary with peak_bytes, retained_bytes
+        and optionally top_lines as [(file:line, bytes, allocations)])
+    """
+    gc.collect()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(frames)
+    try:
+        baseline = tracemalloc.take_snapshot() if top_lines else None
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = {"peak_bytes": peak - before, "retained_bytes": current - before}
+        if top_lines:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+            diff = snapshot.compare_to(baseline.filter_traces(_FILTERS), "lineno")
+            stats["top_lines"] = [
+                (f"{os.path.relpath(s.traceback[0].filename)}:{s.traceback[0].lineno}", s.size_diff, s.count_diff)
+                for s in diff[:top_lines] if s.size_diff > 0
+            ]
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, stats
+
+
+def memory_engines(G, weight='length'):
+    """
+    Engines measured by ``profile_graph``: name -> callable(source, target).
+
+    The PathAlgorithms implementations are measured with and without their step
+    trace; the standalone implementations from DijsktraANDBellmanFord.py get the
+    adjacency dict / edge list they expect, built outside the measurement.
+    """
+    adjacency = {u: {} for u in G.nodes()}
+    for u, v, data in G.edges(data=True):
+        adjacency[u][v] = data.get(weight, 1.0)
+    edge_list = [(u, v, w) for u, nbrs in adjacency.items() for v, w in nbrs.items()]
+    vertices = list(G.nodes())
+
+    return {
+        "dijkstra": lambda s, t: PathAlgorithms.dijkstra(G, s, t, weight),
+        "dijkstra (no trace)": lambda s, t: PathAlgorithms.dijkstra(G, s, t, weight, steps=DiscardSteps()),
+        "bellman_ford": lambda s, t: PathAlgorithms.bellman_ford(G, s, t, weight),
+        "bellman_ford (no trace)": lambda s, t: PathAlgorithms.bellman_ford(G, s, t, weight,
+                                                                             steps=DiscardSteps()),
+        "reference dijkstra": lambda s, t: reference.dijkstra(adjacency, s),
+        "reference bellman_ford": lambda s, t: reference.bellman_ford(edge_list, vertices, s),
+    }
+
+
+def profile_graph(G, name, od_pairs, engines=None, top_lines=0, weight='length'):
+    """
+    Peak and retained memory of each engine on the given origin-destination pairs.
+
+    Returns:
+        List of result dictionaries, one per engine, with the medians over the
+        pairs (and the line attribution of the first pair when ``top_lines``)
+    """
+    available = memory_engines(G, weight)
+    results = []
+    for engine in engines or available:
+        run = available[engine]
+        peaks, retained, lines = [], [], None
+        for i, (source, target) in enumerate(od_pairs):
+            _, stats = measure_memory(lambda: run(source, target), top_lines=top_lines if i == 0 else 0)
+            peaks.append(stats["peak_bytes"])
+            retained.append(stats["retained_bytes"])
+            lines = lines or stats.get("top_lines")
+        results.append({
+            "graph": name,
+            "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(),
+            "engine": engine,
+            "peak_bytes": statistics.median(peaks),
+            "retained_bytes": statistics.median(retained),
+            "top_lines": lines or [],
+        })
+    return results
+
+
+def _mib(num_bytes):
+    return f"{num_bytes / 2 ** 20:8.2f}"
+
+
+def format_memory(results):
+    lines = [f"{'graph':<50} {'nodes':>6} {'engine':<24} {'peak MiB':>8} {'retained MiB':>12}"]
+    for r in results:
+        lines.append(f"{r['graph']:<50} {r['nodes']:>6} {r['engine']:<24} "
+                     f"{_mib(r['peak_bytes'])} {_mib(r['retained_bytes']):>12}")
+        for location, size, count in r["top_lines"]:
+            lines.append(f"    {location:<60} {size / 1024:10.1f} KiB {count:>8} allocs")
+    return "\n".join(lines)
+
+
+def main():
+    print("--- Memory: tracemalloc peak / retained per run ---")
+    graphs = [(os.path.splitext(os.path.basename(p))[0], load_graph(p)) for p in corpus_paths()]
+    graphs.sort(key=lambda item: item[1].number_of_nodes())
+    results = []
+    for name, G in graphs:
+        od_pairs = sample_od_pairs(G, 3, seed=f"0:{name}")
+        # Line attribution only for the largest graph to keep the report short
+        top = TOP_LINES if G is graphs[-1][1] else 0
+        results.extend(profile_graph(G, name, od_pairs, top_lines=top))
+    print(format_memory(results))
+
+
+if __name__ == "__main__":
+    main()
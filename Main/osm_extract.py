@@ -0,0 +1,142 @@
+import os
+import hashlib
+import warnings
+import threading
+
+import numpy as np
+import osmnx as ox
+import networkx as nx
+
+# Highway classes that are not drivable; mirrors OSMnx's "drive" network filter
+DRIVE_EXCLUDED_HIGHWAYS = {
+    "abandoned", "bridleway", "bus_guideway", "construction", "corridor", "cycleway",
+    "elevator", "escalator", "footway", "no", "path", "pedestrian", "planned",
+    "platform", "proposed", "raceway", "razed", "service", "steps", "track",
+}
+EXCLUDED_ACCESS = {"no", "private"}
+METERS_PER_DEGREE_LAT = 111_320.0
+
+
+def _is_drivable(data):
+    """Return True if an unsimplified OSM edge belongs to the drive network."""
+    highway = data.get("highway")
+    if highway is None or highway in DRIVE_EXCLUDED_HIGHWAYS:
+        return False
+    if data.get("access") in EXCLUDED_ACCESS:
+        return False
+    if data.get("area") == "yes":
+        return False
+    return True
+
+
+def _read_extract(extract_path):
+    """Read a raw (unsimplified) OSMnx graph from a .osm or .osm.pbf file."""
+    if extract_path.endswith(".pbf"):
+        try:
+            from pyrosm import OSM
+        except ImportError as e:
+            raise ImportError("Reading .osm.pbf extracts requires the 'pyrosm' package; "
+                              "install it or convert the extract to .osm XML") from e
+        osm = OSM(extract_path)
+        nodes, edges = osm.get_network(network_type="driving", nodes=True)
+        G = osm.to_graph(nodes, edges, graph_type="networkx", osmnx_compatible=True)
+        G.graph.setdefault("crs", "epsg:4326")
+        return G
+    return ox.graph_from_xml(extract_path, simplify=False, retain_all=True)
+
+
+class OSMExtractIndex:
+    """
+    Routable graph built once from a local OSM extract.
+
+    The extract is parsed, filtered to the drive network and simplified a single
+    time, then cached as graphml next to the other graphs. Node coordinates are
+    kept in NumPy arrays so per-route subgraphs can be cut with one vectorised
+    bounding-box mask instead of an Overpass query.
+    """
+
+    def __init__(self, extract_path, cache_dir='graphs', network_type="drive"):
+        if not os.path.exists(extract_path):
+            raise FileNotFoundError(f"OSM extract not found: {extract_path}")
+        if network_type != "drive":
+            raise ValueError("Only the 'drive' network type is supported for local extracts")
+        self.extract_path = extract_path
+        self.cache_dir = cache_dir
+        self.network_type = network_type
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.G = None
+        self._node_ids = None
+        self._lats = None
+        self._lons = None
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self):
+        """Graphml cache path, keyed by the extract's name, size and mtime."""
+        st = os.stat(self.extract_path)
+        key = f"{os.path.abspath(self.extract_path)}:{st.st_size}:{st.st_mtime_ns}:{self.network_type}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        stem = os.path.basename(self.extract_path).split(".")[0]
+        return os.path.join(self.cache_dir, f"extract_{stem}_{digest}.graphml")
+
+    def ensure_index(self):
+        """Load the indexed extract graph, building it on first use."""
+        with self._lock:
+            if self.G is not None:
+                return self.G
+
+            path = self.index_path
+            if os.path.exists(path):
+                G = ox.load_graphml(path)
+            else:
+                G = self._build_index_graph()
+                ox.save_graphml(G, path)
+
+            self.G = G
+            self._node_ids = np.fromiter(G.nodes(), dtype=object, count=len(G))
+            self._lats = np.fromiter((d['y'] for _, d in G.nodes(data=True)), dtype=float, count=len(G))
+            self._lons = np.fromiter((d['x'] for _, d in G.nodes(data=True)), dtype=float, count=len(G))
+            return G
+
+    def _build_index_graph(self):
+        G = _read_extract(self.extract_path)
+
+        drop = [(u, v, k) for u, v, k, d in G.edges(keys=True, data=True) if not _is_drivable(d)]
+        G.remove_edges_from(drop)
+        G.remove_nodes_from([n for n in list(G.nodes()) if G.degree(n) == 0])
+        if len(G) == 0:
+            raise ValueError(f"No drivable roads found in extract {self.extract_path}")
+
+        if not G.graph.get("simplified"):
+            G = ox.simplify_graph(G)
+        return G
+
+    def subgraph_from_point(self, center_point, dist):
+        """
+        Cut the graph within a square of half-side ``dist`` metres around a point.
+
+        Args:
+            center_point: (lat, lon) tuple
+            dist: Distance from the centre to each side of the box, in metres
+
+        Returns:
+            OSMnx MultiDiGraph with the same shape as ``ox.graph_from_point``
+        """
+        G = self.ensure_index()
+        lat, lon = center_point
+        dlat = dist / METERS_PER_DEGREE_LAT
+        dlon = dist / (METERS_PER_DEGREE_LAT * max(np.cos(np.radians(lat)), 1e-6))
+
+        mask = ((self._lats >= lat - dlat) & (self._lats <= lat + dlat) &
+                (self._lons >= lon - dlon) & (self._lons <= lon + dlon))
+        nodes = self._node_ids[mask]
+        if len(nodes) == 0:
+            raise nx.NetworkXPointlessConcept(
+                f"No extract nodes within {dist:.0f} m of {center_point}; is it inside the extract?")
+
+        sub = G.subgraph(nodes.tolist()).copy()
+        sub = ox.truncate.largest_component(sub, strongly=False)
+        if len(sub) < 2:
+            warnings.warn(f"Extract subgraph around {center_point} has fewer than 2 nodes")
+        return sub
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from Main.benchmark import (ALGORITHMS, DEFAULT_PAIRS, DEFAULT_REPEAT, DEFAULT_WARMUP, benchmark_graph,
+                            corpus_paths, load_graph)
+
+DEFAULT_TIMEOUT = None  # seconds per case (graph load + all pairs); None = no limit
+KILL_GRACE = 2.0        # seconds a timed-out worker gets after terminate() before kill()
+
+
+def corpus_cases(paths=None, algorithms=tuple(ALGORITHMS)):
+    """One case per cached graphml file and algorithm."""
+    return [{"path": path, "algorithm": algorithm}
+            for path in (corpus_paths() if paths is None else paths) for algorithm in algorithms]
+
+
+def synthetic_cases(kinds, sizes, algorithms=tuple(ALGORITHMS), seed=0):
+    """One case per synthetic network (kind, size) and algorithm; workers generate their own graph."""
+    return [{"kind": kind, "size": size, "seed": seed, "algorithm": algorithm}
+            for kind in kinds for size in sizes for algorithm in algorithms]
+
+
+def case_label(case):
+    source = os.path.splitext(os.path.basename(case["path"]))[0] if "path" in case \
+        else f"{case['kind']}_{case['size']}"
+    return f"{source}/{case['algorithm']}"
+
+
+def _load_case(case):
+    if "path" in case:
+        return os.path.splitext(os.path.basename(case["path"]))[0], load_graph(case["path"])
+    from Main.synthetic_graphs import generate
+    network = generate(case["kind"], case["size"], seed=case.get("seed", 0))
+    return network.name, network.to_networkx()
+
+
+def run_case(case, options):
+    """
+    Benchmark one case in the current process.
+
+    Args:
+        case: Dictionary with "algorithm" and either "path" (graphml) or "kind"/"size"/"seed" (synthetic)
+        options: Keyword arguments for benchmark_graph plus optional max_nodes
+
+    Returns:
+        List with the single benchmark_graph result, or [] when the graph exceeds max_nodes
+    """
+    options = dict(options)
+    max_nodes = options.pop("max_nodes", None)
+    name, G = _load_case(case)
+    if max_nodes is not None and G.number_of_nodes() > max_nodes:
+        return []
+    return benchmark_graph(G, name, (case["algorithm"],), **options)
+
+
+def _worker(case, options, conn, cpu):
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    try:
+        conn.send(("ok", run_case(case, options)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _stop(process):
+    process.terminate()
+    process.join(KILL_GRACE)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def run_parallel(cases, workers=None, pin=False, timeout=DEFAULT_TIMEOUT, pairs=DEFAULT_PAIRS,
+                 warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT, trace=True, seed=0, max_nodes=None,
+                 memory=False, counters=False, progress=None):
+    """
+    Run benchmark cases in isolated worker processes.
+
+    Every case gets a fresh process, so one case's heap, caches and garbage
+    cannot affect another's timings, and a case that exceeds ``timeout`` is
+    terminated without stalling the sweep. At most ``workers`` run at once.
+
+    Args:
+        cases: Case dictionaries from corpus_cases / synthetic_cases
+        workers: Concurrent processes (default: number of usable CPUs)
+        pin: Pin each running case to its own CPU (Linux only)
+        timeout: Seconds per case, including loading or generating its graph
+        pairs, warmup, repeat, trace, seed, max_nodes, memory, counters: As for Main.benchmark.run_suite
+        progress: Optional callable(case, status, elapsed) called as cases finish
+
+    Returns:
+        Tuple of (results in the same format and order as run_suite, list of
+        (case, reason) for cases that timed out or failed)
+    """
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    workers = max(1, min(workers or len(cpus), len(cases) or 1))
+    if pin:
+        if not hasattr(os, "sched_setaffinity"):
+            raise OSError("CPU pinning is not supported on this platform")
+        if workers > len(cpus):
+            raise ValueError(f"Cannot pin {workers} workers to {len(cpus)} CPUs")
+    free_cpus = deque(cpus[:workers]) if pin else None
+    options = {"pairs": pairs, "warmup": warmup, "repeat": repeat, "trace": trace, "seed": seed,
+               "max_nodes": max_nodes, "memory": memory, "counters": counters}
+
+    pending = deque(enumerate(cases))
+    running = {}  # connection -> (index, process, start time, cpu)
+    outcomes = {}
+    failures = []
+
+    def finish(conn, status, reason=None, payload=None):
+        index, process, start, cpu = running.pop(conn)
+        conn.close()
+        if status == "ok":
+            process.join()
+            outcomes[index] = payload
+        else:
+            _stop(process)
+            failures.append((index, reason))
+        if cpu is not None:
+            free_cpus.append(cpu)
+        if progress:
+            progress(cases[index], status, time.monotonic() - start)
+
+    while pending or running:
+        while pending and len(running) < workers:
+            index, case = pending.popleft()
+            cpu = free_cpus.popleft() if pin else None
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_worker, args=(case, options, sender, cpu), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (index, process, time.monotonic(), cpu)
+
+        wait_for = None
+        if timeout is not None:
+            oldest = min(start for _, _, start, _ in running.values())
+            wait_for = max(0.0, oldest + timeout - time.monotonic())
+        for conn in wait(list(running), timeout=wait_for):
+            try:
+                status, payload = conn.recv()
+            except EOFError:
+                exitcode = running[conn][1].exitcode
+                finish(conn, "error", f"worker exited without a result (exit code {exitcode})")
+                continue
+            if status == "ok":
+                finish(conn, "ok", payload=payload)
+            else:
+                finish(conn, "error", payload)
+
+        if timeout is not None:
+            now = time.monotonic()
+            for conn in [c for c, (_, _, start, _) in running.items() if now - start >= timeout]:
+                finish(conn, "timeout", f"timed out after {timeout:g}s")
+
+    # Same order as run_suite: graphs by node count, algorithms in the order given per graph
+    results = [r for index in sorted(outcomes) for r in outcomes[index]]
+    results.sort(key=lambda r: r["nodes"])
+    return results, [(cases[index], reason) for index, reason in sorted(failures)]
+
+
+def format_failures(failures):
+    return "\n".join(f"{case_label(case)}: {reason}" for case, reason in failures)
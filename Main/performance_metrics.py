@@ -0,0 +1,179 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+HISTOGRAM_WINDOW = 512    # most recent durations kept per span name for the percentiles
+TRACE_EVENTS = 100000     # most recent spans kept for the Chrome trace
+PERCENTILES = (50, 95, 99)
+
+
+class _Span:
+    """Context manager timing one span; also returned by ``Metrics.span``."""
+
+    __slots__ = ("metrics", "name", "args", "start", "duration")
+
+    def __init__(self, metrics, name, args):
+        self.metrics = metrics
+        self.name = name
+        self.args = args
+        self.start = None
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.duration = (end - self.start) / 1e9
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        self.metrics.record(self.name, self.start, end, self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+    duration = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """
+    Span timer with rolling per-name percentiles and a Chrome trace buffer.
+
+    ``span`` is a context manager and ``timed`` a decorator; both record the
+    wall-clock duration of the block under a stage name. The last
+    HISTOGRAM_WINDOW durations per name feed ``summary`` (p50/p95/p99), and the
+    last TRACE_EVENTS spans can be written with ``dump_chrome_trace`` for
+    chrome://tracing or Perfetto. Recording is thread-safe; spans from worker
+    threads show up on their own track.
+    """
+
+    def __init__(self, enabled=True, window=HISTOGRAM_WINDOW, trace_events=TRACE_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self._durations = {}  # name -> deque of seconds
+        self._counts = {}     # name -> total spans recorded
+        self._events = deque(maxlen=trace_events)
+        self._thread_names = {}  # ident -> name, kept after the thread exits
+        self._listeners = []
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name, **args):
+        """Time a ``with`` block as stage ``name``; keyword arguments are stored in the trace."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def timed(self, name=None):
+        """Decorator timing every call of the function (default name: its qualified name)."""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_listener(self, listener):
+        """Call ``listener(name, seconds, args)`` after every recorded span (e.g. slow-operation hooks)."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def record(self, name, start_ns, end_ns, args=None):
+        seconds = (end_ns - start_ns) / 1e9
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self.window)
+            durations.append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            thread = threading.current_thread()
+            self._thread_names[thread.ident] = thread.name
+            self._events.append((name, start_ns, end_ns, thread.ident, args))
+        for listener in list(self._listeners):
+            listener(name, seconds, args)
+
+    def summary(self):
+        """
+        Rolling statistics per stage.
+
+        Returns:
+            Dictionary of name -> {count, window, p50, p95, p99, max} (seconds)
+        """
+        with self._lock:
+            snapshot = {name: (sorted(d), self._counts[name]) for name, d in self._durations.items()}
+        stats = {}
+        for name, (ordered, count) in snapshot.items():
+            row = {"count": count, "window": len(ordered), "max": ordered[-1]}
+            for q in PERCENTILES:
+                row[f"p{q}"] = ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+            stats[name] = row
+        return stats
+
+    def format_summary(self):
+        lines = [f"{'stage':<32} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for name, row in sorted(self.summary().items()):
+            lines.append(f"{name:<32} {row['count']:>6} {row['p50'] * 1e3:9.2f} {row['p95'] * 1e3:9.2f} "
+                         f"{row['p99'] * 1e3:9.2f} {row['max'] * 1e3:9.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Buffered spans as a Chrome trace-event dictionary (complete "X" events, microseconds)."""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        trace = []
+        for tid in {e[3] for e in events}:
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                          "args": {"name": thread_names.get(tid, f"thread {tid}")}})
+        for name, start, end, tid, args in events:
+            event = {"name": name, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start - self._origin) / 1e3, "dur": (end - start) / 1e3}
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path):
+        """Write the buffered spans as a Chrome-trace JSON file; returns the path."""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+            self._events.clear()
+
+
+# Process-wide instance used by the app's instrumentation
+metrics = Metrics(enabled=os.environ.get("PERF_METRICS", "1") != "0")
+span = metrics.span
+timed = metrics.timed
+
+# Write the trace on exit when a path is configured
+_TRACE_PATH = os.environ.get("PERF_TRACE_PATH")
+if _TRACE_PATH:
+    atexit.register(metrics.dump_chrome_trace, _TRACE_PATH)
@@ -0,0 +1,139 @@
+import ast
+from collections import defaultdict
+
+# Long chains have large bounding boxes and defeat viewport culling, so cap them
+MAX_CHAIN_EDGES = 64
+
+
+def street_name(name):
+    """Normalise an OSM name tag (string, list, or graphml list repr) to one string or None."""
+    if isinstance(name, str) and name.startswith("["):
+        try:
+            name = ast.literal_eval(name)
+        except (ValueError, SyntaxError):
+            pass
+    if isinstance(name, (list, tuple)):
+        name = name[0] if name else None
+    if isinstance(name, float):  # NaN from missing graphml attributes
+        return None
+    return name or None
+
+
+def dedupe_directions(edge_ids, edge_nodes):
+    """Keep one edge per undirected (u, v) pair; two-way streets are drawn once."""
+    seen = set()
+    result = []
+    for edge_id in edge_ids:
+        u, v = edge_nodes[edge_id]
+        key = (u, v) if u <= v else (v, u)
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(edge_id)
+    return result
+
+
+def build_chains(edge_ids, edge_nodes, edge_names=None, max_edges=MAX_CHAIN_EDGES):
+    """
+    Chain edges into maximal polylines.
+
+    A chain continues through a node when the node has exactly two incident edges
+    in the set, or when exactly one other incident edge carries the same street
+    name as the edge being followed.
+
+    Args:
+        edge_ids: Edge ids to chain (already deduplicated by direction)
+        edge_nodes: List of (u, v) node ids, indexed by edge id
+        edge_names: Optional list of normalised street names, indexed by edge id
+        max_edges: Maximum number of edges per chain
+
+    Returns:
+        List of (node sequence, edge ids) tuples
+    """
+    incident = defaultdict(list)
+    for edge_id in edge_ids:
+        u, v = edge_nodes[edge_id]
+        incident[u].append(edge_id)
+        incident[v].append(edge_id)
+
+    used = set()
+
+    def next_edge(node, came_from):
+        candidates = [e for e in incident[node] if e not in used]
+        if not candidates:
+            return None
+        if len(incident[node]) == 2:
+            return candidates[0]
+        name = edge_names[came_from] if edge_names else None
+        if name is not None:
+            same = [e for e in incident[node] if e != came_from and edge_names[e] == name]
+            if len(same) == 1 and same[0] in candidates:
+                return same[0]
+        return None
+
+    def extend(node, edge_id, budget):
+        """Walk away from ``node`` starting after ``edge_id``; returns (nodes, ids) beyond it."""
+        nodes, ids = [], []
+        while budget > 0:
+            edge_id = next_edge(node, edge_id)
+            if edge_id is None:
+                break
+            used.add(edge_id)
+            u, v = edge_nodes[edge_id]
+            node = v if node == u else u
+            nodes.append(node)
+            ids.append(edge_id)
+            budget -= 1
+        return nodes, ids
+
+    chains = []
+    for seed in edge_ids:
+        if seed in used:
+            continue
+        used.add(seed)
+        u, v = edge_nodes[seed]
+        fwd_nodes, fwd_ids = extend(v, seed, max_edges - 1)
+        back_nodes, back_ids = extend(u, seed, max_edges - 1 - len(fwd_ids))
+        nodes = back_nodes[::-1] + [u, v] + fwd_nodes
+        ids = back_ids[::-1] + [seed] + fwd_ids
+        chains.append((nodes, ids))
+    return chains
+
+
+class EdgeChains:
+    """
+    Full-detail drawing chains for a graph, with a mapping back to edge ids.
+
+    Both directions of a two-way street map to the same chain, so a node path
+    can be resolved to the chains that draw it.
+    """
+
+    def __init__(self):
+        self.polylines = []    # [(lat, lon), ...] per chain
+        self.edge_ids = []     # constituent edge ids per chain
+        self.edge_to_chain = {}
+
+    def __len__(self):
+        return len(self.polylines)
+
+    @classmethod
+    def from_edges(cls, edge_nodes, node_coords, edge_names=None, max_edges=MAX_CHAIN_EDGES):
+        chains = cls()
+        unique = dedupe_directions(range(len(edge_nodes)), edge_nodes)
+        pair_to_chain = {}
+        for nodes, ids in build_chains(unique, edge_nodes, edge_names, max_edges):
+            chain_id = len(chains.polylines)
+            chains.polylines.append([node_coords[n] for n in nodes])
+            chains.edge_ids.append(ids)
+            for edge_id in ids:
+                u, v = edge_nodes[edge_id]
+                pair_to_chain[(u, v) if u <= v else (v, u)] = chain_id
+
+        # Map every edge, including reverse directions and parallel edges
+        for edge_id, (u, v) in enumerate(edge_nodes):
+            chains.edge_to_chain[edge_id] = pair_to_chain[(u, v) if u <= v else (v, u)]
+        return chains
+
+    def chains_for_edges(self, edge_ids):
+        """Return the ids of the chains that draw the given edges."""
+        return {self.edge_to_chain[e] for e in edge_ids if e in self.edge_to_chain}
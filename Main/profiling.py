@@ -0,0 +1,197 @@
+import cProfile
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from Main.performance_metrics import metrics
+
+PROFILE_MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+DEFAULT_PROFILE_DIR = "profiles"
+
+
+class StackSampler:
+    """
+    Sampling profiler for one thread, producing collapsed stacks.
+
+    A daemon thread snapshots the target thread's Python stack every
+    ``interval`` seconds; identical stacks are counted. The output is the
+    "collapsed" format (``root;caller;callee count`` per line) read by
+    flamegraph.pl, speedscope and similar tools. Cheap enough to leave running
+    for the duration of every operation.
+    """
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class _Operation:
+    """Handle yielded by ``ProfileController.operation``; set graph/algorithm before it ends."""
+
+    def __init__(self, kind, graph=None, algorithm=None):
+        self.kind = kind
+        self.graph = graph
+        self.algorithm = algorithm
+        self.slow_stages = []
+        self.files = []
+
+
+class ProfileController:
+    """
+    On-demand profiling of build and route operations.
+
+    ``arm(n)`` profiles the next ``n`` operations with cProfile (``.prof``,
+    for pstats/snakeviz) or the sampler (``.collapsed`` flamegraph input).
+    Independently, with ``slow_threshold`` set every operation runs under the
+    sampler and its stacks are kept only when a stage (any span recorded on
+    the operation's thread, see Main.performance_metrics) or the whole
+    operation takes longer than the threshold. Files are named
+    ``<kind>_<graph>_<algorithm>_<time>-<n>`` inside ``output_dir``.
+
+    Environment: PROFILE_NEXT (operations to profile), PROFILE_MODE
+    (cprofile|sample), PROFILE_DIR, PROFILE_SLOW_MS.
+    """
+
+    def __init__(self, output_dir=DEFAULT_PROFILE_DIR, mode="cprofile", remaining=0, slow_threshold=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}, got {mode!r}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.remaining = remaining
+        self.slow_threshold = slow_threshold  # seconds, None = no auto-capture
+        self.saved = []  # every file written, oldest first
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, default_dir=DEFAULT_PROFILE_DIR):
+        slow_ms = os.environ.get("PROFILE_SLOW_MS")
+        return cls(output_dir=os.environ.get("PROFILE_DIR", default_dir),
+                   mode=os.environ.get("PROFILE_MODE", "cprofile"),
+                   remaining=int(os.environ.get("PROFILE_NEXT", "0") or 0),
+                   slow_threshold=float(slow_ms) / 1000 if slow_ms else None)
+
+    def arm(self, count=1, mode=None):
+        """Profile the next ``count`` operations (optionally switching mode)."""
+        if mode is not None:
+            if mode not in PROFILE_MODES:
+                raise ValueError(f"mode must be one of {PROFILE_MODES}, got {mode!r}")
+            self.mode = mode
+        with self._lock:
+            self.remaining = count
+
+    @property
+    def active(self):
+        return self.remaining > 0 or self.slow_threshold is not None
+
+    def _take(self):
+        with self._lock:
+            if self.remaining > 0:
+                self.remaining -= 1
+                return True
+            return False
+
+    def _path(self, op, suffix):
+        parts = [op.kind, op.graph or "nograph"] + ([op.algorithm] if op.algorithm else [])
+        stem = re.sub(r"[^\w.-]+", "-", "_".join(str(p) for p in parts))
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir,
+                            f"{stem}_{time.strftime('%Y%m%d-%H%M%S')}-{next(self._sequence)}{suffix}")
+
+    def _save(self, op, path):
+        op.files.append(path)
+        self.saved.append(path)
+        logging.info("Saved %s profile: %s", op.kind, path)
+
+    @contextmanager
+    def operation(self, kind, graph=None, algorithm=None):
+        """
+        Profile one operation if armed, or watch it for slow stages.
+
+        Yields an operation handle whose ``graph``/``algorithm`` may be filled in
+        by the caller (e.g. once the graph is known) before the block ends.
+        """
+        op = _Operation(kind, graph, algorithm)
+        if not self.active:
+            yield op
+            return
+
+        profiled = self._take()
+        profiler = cProfile.Profile() if profiled and self.mode == "cprofile" else None
+        sampler = None
+        if (profiled and self.mode == "sample") or self.slow_threshold is not None:
+            sampler = StackSampler().start()
+
+        thread_id = threading.get_ident()
+        threshold = self.slow_threshold
+
+        def watch(name, seconds, args):
+            if threshold is not None and seconds > threshold and threading.get_ident() == thread_id:
+                op.slow_stages.append((name, seconds))
+
+        metrics.add_listener(watch)
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield op
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+            metrics.remove_listener(watch)
+            if sampler is not None:
+                sampler.stop()
+            if threshold is not None and elapsed > threshold and not op.slow_stages:
+                op.slow_stages.append((kind, elapsed))
+
+            if profiler is not None:
+                path = self._path(op, ".prof")
+                profiler.dump_stats(path)
+                self._save(op, path)
+            if sampler is not None and sampler.samples and ((profiled and self.mode == "sample") or op.slow_stages):
+                suffix = ".collapsed"
+                if op.slow_stages and not profiled:
+                    stage, seconds = max(op.slow_stages, key=lambda s: s[1])
+                    suffix = f"_slow-{stage}-{seconds * 1e3:.0f}ms.collapsed"
+                self._save(op, sampler.write_collapsed(self._path(op, suffix)))
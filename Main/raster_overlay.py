@@ -0,0 +1,258 @@
+import math
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw, ImageTk
+
+TILE_SIZE = 256
+SUPERSAMPLE = 2  # draw at 2x and downsample for anti-aliased lines
+TILE_MARGIN = 1  # extra ring of tiles rendered around the viewport
+MAX_TILES = 192  # canvas tiles kept at the current zoom; those farthest from the viewport go first
+
+
+def lonlat_to_tile(lat, lon, zoom):
+    """Fractional web-mercator tile coordinates of a point (same scheme as the map tiles)."""
+    n = 2 ** zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_bounds(x, y, zoom):
+    """Return (lat_s, lon_w, lat_n, lon_e) of tile (x, y) at ``zoom``."""
+    n = 2 ** zoom
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def render_tile_image(polylines, x, y, zoom, color, width):
+    """
+    Rasterise polylines into one transparent map tile.
+
+    Args:
+        polylines: Iterable of [(lat, lon), ...] intersecting the tile
+        x, y, zoom: Tile address
+        color: Line colour
+        width: Line width in output pixels
+
+    Returns:
+        RGBA PIL image, or None if nothing was drawn
+    """
+    scale = TILE_SIZE * SUPERSAMPLE
+    img = Image.new("RGBA", (scale, scale), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    drawn = False
+    for coords in polylines:
+        pts = []
+        for lat, lon in coords:
+            tx, ty = lonlat_to_tile(lat, lon, zoom)
+            pts.append(((tx - x) * scale, (ty - y) * scale))
+        if len(pts) >= 2:
+            draw.line(pts, fill=color, width=width * SUPERSAMPLE, joint="curve")
+            drawn = True
+    if not drawn:
+        return None
+    return img.resize((TILE_SIZE, TILE_SIZE), Image.LANCZOS)
+
+
+class OverlayTile:
+    """
+    Canvas image for one overlay tile.
+
+    Registered in the map widget's ``canvas_path_list`` so tkintermapview moves
+    it together with its own paths on every pan and zoom redraw.
+    """
+
+    def __init__(self, map_widget, x, y, zoom, photo):
+        self.map_widget = map_widget
+        self.x, self.y, self.zoom = x, y, zoom
+        self.photo = photo
+        self.canvas_image = None
+
+    def _canvas_pos(self):
+        mw = self.map_widget
+        widget_tile_width = mw.lower_right_tile_pos[0] - mw.upper_left_tile_pos[0]
+        widget_tile_height = mw.lower_right_tile_pos[1] - mw.upper_left_tile_pos[1]
+        cx = ((self.x - mw.upper_left_tile_pos[0]) / widget_tile_width) * mw.width
+        cy = ((self.y - mw.upper_left_tile_pos[1]) / widget_tile_height) * mw.height
+        return cx, cy
+
+    def draw(self, move=False):
+        canvas = self.map_widget.canvas
+        # Tiles are rasterised per integer zoom; hide them while another zoom is shown
+        if round(self.map_widget.zoom) != self.zoom:
+            if self.canvas_image is not None:
+                canvas.delete(self.canvas_image)
+                self.canvas_image = None
+            return
+        cx, cy = self._canvas_pos()
+        if self.canvas_image is None:
+            self.canvas_image = canvas.create_image(cx, cy, image=self.photo, anchor="nw", tag="graph_overlay")
+            try:
+                # Sit directly above the base map tiles and below routes and markers
+                canvas.tag_raise(self.canvas_image, "tile")
+            except Exception:
+                pass
+        else:
+            canvas.coords(self.canvas_image, cx, cy)
+
+    def delete(self):
+        if self in self.map_widget.canvas_path_list:
+            self.map_widget.canvas_path_list.remove(self)
+        if self.canvas_image is not None:
+            self.map_widget.canvas.delete(self.canvas_image)
+            self.canvas_image = None
+
+
+class RasterOverlay:
+    """
+    Pre-rasterised graph overlay.
+
+    Tiles are rendered on a background thread, once per graph and zoom level,
+    and cached on disk as PNGs; the UI thread only wraps finished images into
+    canvas images.
+    """
+
+    def __init__(self, map_widget, cache_dir, color, width_for_zoom=None):
+        self.map_widget = map_widget
+        self.cache_dir = cache_dir
+        self.color = color
+        self.width_for_zoom = width_for_zoom or (lambda z: 2 if z >= 16 else 1)
+
+        self.graph_key = None
+        self.polylines = []
+        self.spatial_index = None
+        self.bounds = None
+
+        self.tiles = {}  # (x, y, zoom) -> OverlayTile
+        self._pending = set()
+        self._empty = set()
+        self._wanted = set()  # tiles of the latest viewport; queued tiles outside it are skipped
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="overlay")
+
+    def set_graph(self, graph_key, polylines, spatial_index):
+        """Switch to a new graph; clears tiles drawn for the previous one."""
+        self.clear()
+        self.graph_key = graph_key
+        self.polylines = polylines
+        self.spatial_index = spatial_index
+        if polylines:
+            lats = [p[0] for line in polylines for p in line]
+            lons = [p[1] for line in polylines for p in line]
+            self.bounds = (min(lats), min(lons), max(lats), max(lons))
+        else:
+            self.bounds = None
+
+    def _tile_path(self, x, y, zoom):
+        return os.path.join(self.cache_dir, "overlay", self.graph_key, str(zoom), f"{x}_{y}.png")
+
+    def _wanted_tiles(self, viewport, zoom):
+        """Tiles covering the part of the graph inside the viewport (plus a margin)."""
+        if self.bounds is None:
+            return []
+        g_lat_s, g_lon_w, g_lat_n, g_lon_e = self.bounds
+        lat_s, lon_w, lat_n, lon_e = viewport
+        lat_s, lat_n = max(lat_s, g_lat_s), min(lat_n, g_lat_n)
+        lon_w, lon_e = max(lon_w, g_lon_w), min(lon_e, g_lon_e)
+        if lat_s > lat_n or lon_w > lon_e:
+            return []
+        x0, y0 = lonlat_to_tile(lat_n, lon_w, zoom)
+        x1, y1 = lonlat_to_tile(lat_s, lon_e, zoom)
+        return [(x, y, zoom)
+                for x in range(int(x0) - TILE_MARGIN, int(x1) + TILE_MARGIN + 1)
+                for y in range(int(y0) - TILE_MARGIN, int(y1) + TILE_MARGIN + 1)]
+
+    def show(self, viewport, zoom):
+        """Ensure the tiles for the viewport at ``zoom`` are shown, rendering missing ones off-thread."""
+        if self.graph_key is None or viewport is None:
+            return
+        zoom = int(round(zoom))
+        visible = self._wanted_tiles(viewport, zoom)
+        with self._lock:
+            self._wanted = set(visible)
+            # Tiles of other zoom levels are dropped; their PNGs stay cached on disk
+            for key in [k for k in self.tiles if k[2] != zoom]:
+                self.tiles.pop(key).delete()
+            self._evict_offscreen(visible)
+            missing = [k for k in visible
+                       if k not in self.tiles and k not in self._pending and k not in self._empty]
+            self._pending.update(missing)
+        for key in missing:
+            self._executor.submit(self._render, key)
+
+    def _evict_offscreen(self, visible):
+        """Keep at most MAX_TILES canvas tiles, dropping those farthest from the viewport first."""
+        excess = len(self.tiles) - MAX_TILES
+        if excess <= 0 or not visible:
+            return
+        cx = sum(k[0] for k in visible) / len(visible)
+        cy = sum(k[1] for k in visible) / len(visible)
+        offscreen = sorted((k for k in self.tiles if k not in self._wanted),
+                           key=lambda k: (k[0] - cx) ** 2 + (k[1] - cy) ** 2, reverse=True)
+        for key in offscreen[:excess]:
+            self.tiles.pop(key).delete()
+
+    def _still_wanted(self, key):
+        """False (and the tile un-queued) once the viewport has moved away from it."""
+        with self._lock:
+            if key in self._wanted:
+                return True
+            self._pending.discard(key)
+            return False
+
+    def _render(self, key):
+        x, y, zoom = key
+        try:
+            if not self._still_wanted(key):
+                return  # viewport moved on before this tile was reached
+            path = self._tile_path(x, y, zoom)
+            if os.path.exists(path):
+                img = Image.open(path)
+                img.load()
+            elif os.path.exists(path + ".empty"):
+                img = None
+            else:
+                lat_s, lon_w, lat_n, lon_e = tile_bounds(x, y, zoom)
+                ids = self.spatial_index.query(lat_s, lon_w, lat_n, lon_e)
+                img = render_tile_image((self.polylines[i] for i in ids), x, y, zoom,
+                                        self.color, self.width_for_zoom(zoom))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if img is None:
+                    open(path + ".empty", "w").close()
+                else:
+                    img.save(path)
+            self.map_widget.after(0, lambda: self._place(key, img))
+        except Exception as e:
+            warnings.warn(f"Error rendering overlay tile {key}: {e}")
+            with self._lock:
+                self._pending.discard(key)
+
+    def _place(self, key, img):
+        """Runs on the UI thread: wrap a finished tile into a canvas image."""
+        with self._lock:
+            self._pending.discard(key)
+            if img is None:
+                self._empty.add(key)
+                return
+            if key in self.tiles or key not in self._wanted:
+                return
+            tile = OverlayTile(self.map_widget, *key, ImageTk.PhotoImage(img))
+            self.tiles[key] = tile
+        self.map_widget.canvas_path_list.append(tile)
+        tile.draw()
+
+    def clear(self):
+        with self._lock:
+            self._wanted = set()
+            for tile in self.tiles.values():
+                tile.delete()
+            self.tiles.clear()
+            self._pending.clear()
+            self._empty.clear()
@@ -0,0 +1,116 @@
+import heapq
+import time
+import warnings
+
+from Main.performance_metrics import metrics
+
+FRAME_BUDGET_MS = 8        # drawing time allowed per frame, leaving room for Tk's own redraw
+FRAME_INTERVAL_MS = 16     # delay between frames (~60 fps)
+VIEWPORT_DEBOUNCE_MS = 120  # quiet period after the last pan/zoom event before re-rendering
+
+
+class RenderScheduler:
+    """
+    Frame-budgeted, priority-ordered drawing on the Tk event loop.
+
+    Work is submitted as a batch of keys with priorities; each frame pops keys
+    in priority order and draws them until the frame budget is spent, then
+    yields to Tk. Submitting a new batch cancels whatever is left of the old
+    one, so panning never finishes drawing a viewport the user has already left.
+    Every frame is timed as a "render_frame" span, and a batch drawn to the end
+    as "render_batch" (submit to last frame, including the gaps between frames).
+    Viewport events are debounced on the trailing edge so the final position is
+    always rendered.
+    """
+
+    def __init__(self, widget, frame_budget_ms=FRAME_BUDGET_MS, frame_interval_ms=FRAME_INTERVAL_MS,
+                 debounce_ms=VIEWPORT_DEBOUNCE_MS):
+        self.widget = widget
+        self.frame_budget = frame_budget_ms / 1000
+        self.frame_interval_ms = frame_interval_ms
+        self.debounce_ms = debounce_ms
+
+        self._heap = []
+        self._draw = None
+        self._frame_id = None
+        self._debounce_id = None
+        self._seq = 0
+        self._batch_start = None  # perf_counter_ns of the current batch's submit
+        self._batch_size = 0
+        self.stats = {"batches": 0, "frames": 0, "drawn": 0, "cancelled": 0}
+
+    def request_viewport(self, callback):
+        """Trailing-edge debounce: run ``callback`` once events stop for ``debounce_ms``."""
+        if self._debounce_id is not None:
+            try:
+                self.widget.after_cancel(self._debounce_id)
+            except Exception:
+                pass
+        self._debounce_id = self.widget.after(self.debounce_ms, self._fire_viewport, callback)
+
+    def _fire_viewport(self, callback):
+        self._debounce_id = None
+        callback()
+
+    def submit(self, prioritized, draw):
+        """
+        Replace pending work with a new batch.
+
+        Args:
+            prioritized: Iterable of (priority, key); lower priorities are drawn first
+            draw: Callable taking a key, invoked on the Tk thread
+        """
+        self.cancel()
+        self._heap = []
+        for priority, key in prioritized:
+            self._seq += 1
+            self._heap.append((priority, self._seq, key))
+        heapq.heapify(self._heap)
+        self._draw = draw
+        self._batch_start = time.perf_counter_ns()
+        self._batch_size = len(self._heap)
+        self.stats["batches"] += 1
+        if self._heap:
+            # First frame runs synchronously so the nearest items appear without delay
+            self._run_frame()
+
+    def _run_frame(self):
+        self._frame_id = None
+        deadline = time.perf_counter() + self.frame_budget
+        heap, draw = self._heap, self._draw
+        drawn = 0
+        with metrics.span("render_frame"):
+            while heap:
+                _, _, key = heapq.heappop(heap)
+                try:
+                    draw(key)
+                except Exception as e:
+                    warnings.warn(f"Error drawing {key}: {e}")
+                drawn += 1
+                if time.perf_counter() >= deadline:
+                    break
+        self.stats["frames"] += 1
+        self.stats["drawn"] += drawn
+        if heap:
+            self._frame_id = self.widget.after(self.frame_interval_ms, self._run_frame)
+        elif self._batch_start is not None:
+            if metrics.enabled:
+                metrics.record("render_batch", self._batch_start, time.perf_counter_ns(),
+                               {"items": self._batch_size})
+            self._batch_start = None
+
+    def cancel(self):
+        """Drop all pending work."""
+        if self._frame_id is not None:
+            try:
+                self.widget.after_cancel(self._frame_id)
+            except Exception:
+                pass
+            self._frame_id = None
+        self.stats["cancelled"] += len(self._heap)
+        self._heap = []
+        self._batch_start = None  # an unfinished batch is not a render time
+
+    @property
+    def pending(self):
+        return len(self._heap)
@@ -0,0 +1,283 @@
+import bisect
+import time
+
+from Main.canvas_pool import PathPool
+
+KEYFRAME_INTERVAL = 5000   # steps between dist/prev snapshots used for seeking
+FRAME_INTERVAL_MS = 33     # ~30 fps animation
+FRAME_BUDGET_MS = 12       # drawing time allowed per animation frame
+DEFAULT_SPEED = 200        # steps per second
+
+TREE_COLOR = "#FFA500"     # shortest-path tree edges (prev[v] -> v)
+ACTIVE_COLOR = "#FF00FF"   # edge being checked/relaxed right now
+
+
+def _apply_step(step, dist, prev, visited):
+    """
+    Apply one step to dist/prev/visited.
+
+    Returns:
+        Tuple of (nodes whose tree edge changed, edge now being examined or None)
+    """
+    kind = step[0]
+    if kind == "update":
+        node, new_dist, prev_node = step[1], step[2], step[3]
+        dist[node] = new_dist
+        prev[node] = prev_node
+        return (node,), (prev_node, node)
+    if kind == "visit":
+        visited.add(step[1])
+    elif kind == "check_neighbor" or kind == "check_edge":
+        return (), (step[1], step[2])
+    return (), None
+
+
+class StepReplay:
+    """
+    Replayable state of an algorithm run reconstructed from its ``steps``.
+
+    Tracks dist/prev for updated nodes and the visited set. Snapshots are taken
+    every ``keyframe_interval`` steps so ``seek`` only re-applies the steps after
+    the nearest keyframe instead of replaying from the start. With
+    ``build=False`` the keyframes are built incrementally by ``build_keyframes``
+    (the player does so a frame at a time); playing does not need them.
+    """
+
+    def __init__(self, steps, source, keyframe_interval=KEYFRAME_INTERVAL, build=True):
+        self.steps = steps
+        self.source = source
+        self.keyframe_interval = keyframe_interval
+        self._reset()
+        self.keyframes = [(0, dict(self.dist), {}, set())]  # (position, dist, prev, visited)
+        self._build_position = 0
+        self._build_state = (dict(self.dist), {}, set())
+        if build:
+            self.build_keyframes()
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _reset(self):
+        self.position = 0
+        self.dist = {self.source: 0}
+        self.prev = {}
+        self.visited = set()
+        self.active_edge = None
+
+    def _apply(self, step):
+        """Apply one step; returns the nodes whose tree edge changed."""
+        changed, edge = _apply_step(step, self.dist, self.prev, self.visited)
+        if edge is not None:
+            self.active_edge = edge
+        return changed
+
+    @property
+    def keyframes_ready(self):
+        return self._build_position >= len(self.steps)
+
+    def build_keyframes(self, deadline=None):
+        """
+        Continue building keyframes, one keyframe interval at a time.
+
+        Args:
+            deadline: Optional time.perf_counter() value to stop at (checked between intervals)
+
+        Returns:
+            True once every keyframe is built
+        """
+        dist, prev, visited = self._build_state
+        while not self.keyframes_ready:
+            start = self._build_position
+            end = min(start + self.keyframe_interval, len(self.steps))
+            for step in self.steps[start:end]:
+                _apply_step(step, dist, prev, visited)
+            self._build_position = end
+            if end % self.keyframe_interval == 0:
+                self.keyframes.append((end, dict(dist), dict(prev), set(visited)))
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        if self.keyframes_ready:
+            self._build_state = None
+        return self.keyframes_ready
+
+    def advance(self, count):
+        """
+        Apply up to ``count`` steps.
+
+        Returns:
+            Tuple of (number of steps applied, set of nodes whose tree edge changed)
+        """
+        end = min(self.position + count, len(self.steps))
+        changed = set()
+        for i in range(self.position, end):
+            changed.update(self._apply(self.steps[i]))
+        applied = end - self.position
+        self.position = end
+        return applied, changed
+
+    def seek(self, position):
+        """
+        Jump to ``position`` (number of steps applied) via the nearest earlier keyframe.
+        Until the keyframes are built, positions past them are replayed from the last one.
+        """
+        position = max(0, min(position, len(self.steps)))
+        idx = bisect.bisect_right([k[0] for k in self.keyframes], position) - 1
+        key_pos, dist, prev, visited = self.keyframes[idx]
+        self.position = key_pos
+        self.dist, self.prev, self.visited = dict(dist), dict(prev), set(visited)
+        self.active_edge = None
+        self.advance(position - key_pos)
+
+    @property
+    def finished(self):
+        return self.position >= len(self.steps)
+
+
+class ReplayPlayer:
+    """
+    Animates a ``StepReplay`` on the map.
+
+    Each frame consumes ``speed * elapsed`` steps, coalescing all of them into a
+    set of dirty tree edges; dirty edges are then drawn through a path pool until
+    the frame budget is spent and the rest carry over to the next frame.
+    Missing seek keyframes are built in frame-budgeted chunks on the Tk loop,
+    so long runs never freeze the UI; ``on_ready`` fires once seeking is cheap.
+    """
+
+    def __init__(self, map_widget, replay, node_coords, on_progress=None, on_finish=None,
+                 speed=DEFAULT_SPEED, on_ready=None):
+        self.map_widget = map_widget
+        self.replay = replay
+        self.node_coords = node_coords
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.speed = speed
+
+        self.pool = PathPool(map_widget)
+        self.active_path = None
+        self.dirty = set()
+        self.playing = False
+        self._frame_id = None
+        self._last_tick = None
+        self._carry = 0.0
+        self.on_ready = on_ready
+        self._build_id = None
+        if replay.keyframes_ready:
+            if on_ready:
+                on_ready()
+        else:
+            self._build_id = map_widget.after(0, self._build_keyframes)
+
+    @property
+    def ready(self):
+        """Whether seeking is available (all keyframes built)."""
+        return self.replay.keyframes_ready
+
+    def _build_keyframes(self):
+        self._build_id = None
+        if self.replay.build_keyframes(time.perf_counter() + FRAME_BUDGET_MS / 1000):
+            if self.on_ready:
+                self.on_ready()
+        else:
+            self._build_id = self.map_widget.after(FRAME_INTERVAL_MS, self._build_keyframes)
+
+    def play(self):
+        if self.replay.finished:
+            self.seek(0)
+        self.playing = True
+        self._last_tick = time.perf_counter()
+        self._schedule()
+
+    def pause(self):
+        self.playing = False
+        if self._frame_id is not None:
+            try:
+                self.map_widget.after_cancel(self._frame_id)
+            except Exception:
+                pass
+            self._frame_id = None
+
+    def toggle(self):
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def set_speed(self, steps_per_second):
+        self.speed = max(1, steps_per_second)
+
+    def seek(self, position):
+        """Jump to a step; the tree is redrawn from the restored keyframe state. Ignored until ``ready``."""
+        if position > 0 and not self.ready:
+            return
+        self.replay.seek(position)
+        self.dirty = set(self.pool.active_keys()) | set(self.replay.prev)
+        self._carry = 0.0
+        self._render(time.perf_counter() + FRAME_BUDGET_MS / 1000)
+        if not self.playing and self.dirty:
+            # Finish drawing the restored state even while paused
+            self._schedule()
+
+    def _schedule(self):
+        if self._frame_id is None:
+            self._frame_id = self.map_widget.after(FRAME_INTERVAL_MS, self._tick)
+
+    def _tick(self):
+        self._frame_id = None
+        now = time.perf_counter()
+        deadline = now + FRAME_BUDGET_MS / 1000
+        if self.playing:
+            self._carry += (now - self._last_tick) * self.speed
+            self._last_tick = now
+            count = int(self._carry)
+            self._carry -= count
+            # Stepping is cheap dict work; only drawing is budgeted
+            _, changed = self.replay.advance(count)
+            self.dirty |= changed
+        self._render(deadline)
+
+        if self.playing and self.replay.finished and not self.dirty:
+            self.playing = False
+            if self.on_finish:
+                self.on_finish()
+        elif self.playing or self.dirty:
+            self._schedule()
+
+    def _render(self, deadline):
+        """Draw dirty tree edges until ``deadline``; leftovers stay dirty."""
+        prev = self.replay.prev
+        while self.dirty and time.perf_counter() < deadline:
+            node = self.dirty.pop()
+            parent = prev.get(node)
+            if parent is None or node not in self.node_coords or parent not in self.node_coords:
+                self.pool.hide(node)
+            else:
+                self.pool.show(node, ([self.node_coords[parent], self.node_coords[node]], TREE_COLOR, 2))
+
+        edge = self.replay.active_edge
+        if edge and edge[0] in self.node_coords and edge[1] in self.node_coords:
+            coords = [self.node_coords[edge[0]], self.node_coords[edge[1]]]
+            if self.active_path is None:
+                self.active_path = self.map_widget.set_path(coords, color=ACTIVE_COLOR, width=3)
+            else:
+                self.active_path.set_position_list(coords)
+
+        if self.on_progress:
+            self.on_progress(self.replay.position, len(self.replay))
+
+    def clear(self):
+        self.pause()
+        if self._build_id is not None:
+            try:
+                self.map_widget.after_cancel(self._build_id)
+            except Exception:
+                pass
+            self._build_id = None
+        self.pool.clear()
+        if self.active_path is not None:
+            try:
+                self.active_path.delete()
+            except Exception:
+                pass
+            self.active_path = None
+        self.dirty.clear()
@@ -0,0 +1,215 @@
+import math
+import random
+import time
+from collections import defaultdict
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over (lat, lon) bounding boxes.
+
+    Every item is registered in each grid cell its bounding box overlaps, so a
+    viewport query only touches the cells under the viewport and the items in
+    them instead of scanning every item in the graph.
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.bboxes = {}
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.cell_size))
+
+    def insert(self, item_id, bbox):
+        """Register an item with bbox (lat_min, lon_min, lat_max, lon_max)."""
+        lat_min, lon_min, lat_max, lon_max = bbox
+        self.bboxes[item_id] = bbox
+        r0, c0 = self._cell(lat_min, lon_min)
+        r1, c1 = self._cell(lat_max, lon_max)
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                self.cells[(r, c)].append(item_id)
+
+    def query(self, lat_s, lon_w, lat_n, lon_e):
+        """Return the ids of all items whose bbox intersects the given bounds."""
+        r0, c0 = self._cell(lat_s, lon_w)
+        r1, c1 = self._cell(lat_n, lon_e)
+        # Don't walk more cells than exist; very wide viewports fall back to the occupied ones
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self.cells):
+            keys = [(r, c) for r, c in self.cells if r0 <= r <= r1 and c0 <= c <= c1]
+        else:
+            keys = [(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+        result = set()
+        bboxes = self.bboxes
+        for key in keys:
+            for item_id in self.cells.get(key, ()):
+                if item_id in result:
+                    continue
+                b_lat_min, b_lon_min, b_lat_max, b_lon_max = bboxes[item_id]
+                if (b_lat_min <= lat_n and b_lat_max >= lat_s and
+                        b_lon_min <= lon_e and b_lon_max >= lon_w):
+                    result.add(item_id)
+        return result
+
+    def __len__(self):
+        return len(self.bboxes)
+
+    @staticmethod
+    def _auto_cell_size(lats, lons, count, items_per_cell=8):
+        """Pick a cell size giving roughly ``items_per_cell`` items per occupied cell."""
+        extent = max(max(lats) - min(lats), max(lons) - min(lons), 1e-6)
+        cells_per_side = max(1, int(math.sqrt(count / items_per_cell)))
+        return extent / cells_per_side
+
+    @classmethod
+    def from_segments(cls, edge_coords, cell_size=None):
+        """Build an index over edges or polylines given as [(lat, lon), ...], keyed by position."""
+        if cell_size is None:
+            if not edge_coords:
+                cell_size = 0.01
+            else:
+                lats = [p[0] for seg in edge_coords for p in seg]
+                lons = [p[1] for seg in edge_coords for p in seg]
+                cell_size = cls._auto_cell_size(lats, lons, len(edge_coords))
+        index = cls(cell_size)
+        for edge_id, seg in enumerate(edge_coords):
+            index.insert(edge_id, segment_bbox(seg))
+        return index
+
+    @classmethod
+    def from_points(cls, points, cell_size=None):
+        """Build an index over a {key: (lat, lon)} mapping."""
+        if cell_size is None:
+            if not points:
+                cell_size = 0.01
+            else:
+                lats = [p[0] for p in points.values()]
+                lons = [p[1] for p in points.values()]
+                cell_size = cls._auto_cell_size(lats, lons, len(points))
+        index = cls(cell_size)
+        for key, (lat, lon) in points.items():
+            index.insert(key, (lat, lon, lat, lon))
+        return index
+
+
+def segment_bbox(seg):
+    """Bounding box (lat_min, lon_min, lat_max, lon_max) of a polyline."""
+    lats = [p[0] for p in seg]
+    lons = [p[1] for p in seg]
+    return min(lats), min(lons), max(lats), max(lons)
+
+
+def grid_clusters(points, cell_size):
+    """
+    Aggregate points into grid cells.
+
+    Args:
+        points: Iterable of (key, (lat, lon))
+        cell_size: Cell side in degrees
+
+    Returns:
+        Dictionary of (row, col) -> [count, mean lat, mean lon, list of keys]
+    """
+    cells = {}
+    for key, (lat, lon) in points:
+        cell = (int(math.floor(lat / cell_size)), int(math.floor(lon / cell_size)))
+        entry = cells.get(cell)
+        if entry is None:
+            cells[cell] = [1, lat, lon, [key]]
+        else:
+            entry[0] += 1
+            entry[1] += lat
+            entry[2] += lon
+            entry[3].append(key)
+    for entry in cells.values():
+        entry[1] /= entry[0]
+        entry[2] /= entry[0]
+    return cells
+
+
+def linear_scan(edge_coords, lat_s, lon_w, lat_n, lon_e):
+    """Reference viewport culling: test every edge against the bounds."""
+    visible = set()
+    for edge_id, (start, end) in enumerate(edge_coords):
+        lat1, lon1 = start
+        lat2, lon2 = end
+        if (min(lat1, lat2) <= lat_n and max(lat1, lat2) >= lat_s and
+                min(lon1, lon2) <= lon_e and max(lon1, lon2) >= lon_w):
+            visible.add(edge_id)
+    return visible
+
+
+def benchmark_viewport_culling(edge_coords, n_viewports=200, viewport_fraction=0.1, seed=0):
+    """
+    Compare grid-index culling against the linear scan on random viewports.
+
+    Args:
+        edge_coords: List of ((lat1, lon1), (lat2, lon2)) edges
+        n_viewports: Number of random viewports to query
+        viewport_fraction: Viewport side as a fraction of the graph extent
+        seed: Random seed for reproducible viewports
+
+    Returns:
+        Dictionary with build time, mean per-query times and the speedup
+    """
+    rng = random.Random(seed)
+    lats = [p[0] for seg in edge_coords for p in seg]
+    lons = [p[1] for seg in edge_coords for p in seg]
+    lat_lo, lat_hi, lon_lo, lon_hi = min(lats), max(lats), min(lons), max(lons)
+    h = (lat_hi - lat_lo) * viewport_fraction
+    w = (lon_hi - lon_lo) * viewport_fraction
+
+    viewports = []
+    for _ in range(n_viewports):
+        lat_s = rng.uniform(lat_lo, lat_hi - h)
+        lon_w = rng.uniform(lon_lo, lon_hi - w)
+        viewports.append((lat_s, lon_w, lat_s + h, lon_w + w))
+
+    t0 = time.perf_counter()
+    index = GridIndex.from_segments(edge_coords)
+    build_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    linear_results = [linear_scan(edge_coords, *vp) for vp in viewports]
+    linear_time = (time.perf_counter() - t0) / n_viewports
+
+    t0 = time.perf_counter()
+    grid_results = [index.query(*vp) for vp in viewports]
+    grid_time = (time.perf_counter() - t0) / n_viewports
+
+    if linear_results != grid_results:
+        raise AssertionError("Grid index and linear scan disagree on visible edges")
+
+    return {
+        "edges": len(edge_coords),
+        "build_s": build_time,
+        "linear_query_s": linear_time,
+        "grid_query_s": grid_time,
+        "speedup": linear_time / grid_time if grid_time > 0 else float('inf'),
+        "mean_visible": sum(len(r) for r in grid_results) / n_viewports,
+    }
+
+
+def main():
+    import glob
+    import os
+    import osmnx as ox
+
+    graph_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphs")
+    print("--- Viewport Culling: Grid Index vs Linear Scan ---")
+    for path in sorted(glob.glob(os.path.join(graph_dir, "*.graphml"))):
+        G = ox.load_graphml(path)
+        edge_coords = [((G.nodes[u]['y'], G.nodes[u]['x']), (G.nodes[v]['y'], G.nodes[v]['x']))
+                       for u, v in G.edges()]
+        r = benchmark_viewport_culling(edge_coords)
+        print(f"{os.path.basename(path)}: {r['edges']} edges, build {r['build_s'] * 1e3:.2f} ms, "
+              f"linear {r['linear_query_s'] * 1e6:.1f} µs, grid {r['grid_query_s'] * 1e6:.1f} µs "
+              f"({r['speedup']:.1f}x, ~{r['mean_visible']:.0f} visible)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import math
+from xml.sax.saxutils import escape
+
+import numpy as np
+import networkx as nx
+
+DEFAULT_ORIGIN = (7.07, 125.60)  # (lat, lon) the synthetic networks are placed around
+STREET_SPACING_M = 100           # typical distance between neighbouring intersections
+ONEWAY_FRACTION = 0.15           # share of streets that only run in one direction
+ARTERIAL_EVERY = 10              # every n-th grid row/column is a secondary road
+GRAPHML_CHUNK = 50000            # nodes/edges formatted per write when streaming graphml
+METERS_PER_DEGREE = 111320.0
+
+ROAD_CLASSES = ("residential", "secondary")
+
+
+def _require_scipy():
+    try:
+        import scipy.sparse
+        import scipy.sparse.csgraph
+        import scipy.spatial
+    except ImportError as e:
+        raise ImportError("Random geometric and Delaunay networks require the 'scipy' package") from e
+    return scipy
+
+
+class SyntheticNetwork:
+    """
+    Road-like graph held as NumPy arrays.
+
+    Nodes are positions in metres (x east, y north) around ``origin``; edges are
+    directed (u, v) index pairs with their length and road class. Two-way
+    streets appear as two opposite edges. Conversions to NetworkX or graphml
+    are done once, at the edge of the module, so generation itself never builds
+    per-node Python objects.
+    """
+
+    def __init__(self, name, x, y, u, v, road_class=None, origin=DEFAULT_ORIGIN):
+        self.name = name
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.u = np.asarray(u, dtype=np.int64)
+        self.v = np.asarray(v, dtype=np.int64)
+        self.road_class = (np.zeros(len(self.u), dtype=np.uint8) if road_class is None
+                           else np.asarray(road_class, dtype=np.uint8))
+        self.origin = origin
+        self.length = np.hypot(self.x[self.u] - self.x[self.v], self.y[self.u] - self.y[self.v])
+
+    @property
+    def num_nodes(self):
+        return len(self.x)
+
+    @property
+    def num_edges(self):
+        return len(self.u)
+
+    @property
+    def lat(self):
+        return self.origin[0] + self.y / METERS_PER_DEGREE
+
+    @property
+    def lon(self):
+        return self.origin[1] + self.x / (METERS_PER_DEGREE * math.cos(math.radians(self.origin[0])))
+
+    def largest_component(self):
+        """Restrict to the largest strongly connected component (every O-D pair in it is routable)."""
+        scipy = _require_scipy()
+        n = self.num_nodes
+        matrix = scipy.sparse.csr_matrix((np.ones(self.num_edges, dtype=np.int8), (self.u, self.v)), shape=(n, n))
+        _, labels = scipy.sparse.csgraph.connected_components(matrix, directed=True, connection="strong")
+        keep = labels == np.bincount(labels).argmax()
+        new_index = np.cumsum(keep) - 1
+        edge_keep = keep[self.u] & keep[self.v]
+        return SyntheticNetwork(self.name, self.x[keep], self.y[keep], new_index[self.u[edge_keep]],
+                                new_index[self.v[edge_keep]], self.road_class[edge_keep], self.origin)
+
+    def to_networkx(self, weight='length'):
+        """Simple DiGraph in the shape the routing code uses (x/y node attributes, edge lengths)."""
+        G = nx.DiGraph(name=self.name, crs="epsg:4326")
+        lat, lon = self.lat, self.lon
+        G.add_nodes_from((i, {"x": x, "y": y}) for i, (x, y) in enumerate(zip(lon.tolist(), lat.tolist())))
+        G.add_edges_from(
+            (a, b, {weight: w, "highway": ROAD_CLASSES[c]})
+            for a, b, w, c in zip(self.u.tolist(), self.v.tolist(), self.length.tolist(), self.road_class.tolist())
+        )
+        return G
+
+    def to_adjacency(self):
+        """{u: {v: length}} as used by the standalone implementations in DijsktraANDBellmanFord.py."""
+        adjacency = {i: {} for i in range(self.num_nodes)}
+        for a, b, w in zip(self.u.tolist(), self.v.tolist(), self.length.tolist()):
+            adjacency[a][b] = w
+        return adjacency
+
+    def iter_edges(self, chunk_size=GRAPHML_CHUNK):
+        """Yield (u, v, length, road class) array chunks."""
+        for start in range(0, self.num_edges, chunk_size):
+            stop = start + chunk_size
+            yield self.u[start:stop], self.v[start:stop], self.length[start:stop], self.road_class[start:stop]
+
+    def write_graphml(self, path, chunk_size=GRAPHML_CHUNK):
+        """
+        Stream the network to an OSMnx-compatible graphml file.
+
+        The file loads with ``ox.load_graphml`` like the cached Overpass graphs,
+        so the benchmark and the map view can use it unchanged. Nodes and edges
+        are formatted in chunks and written as they are produced.
+        """
+        lat, lon = self.lat, self.lon
+        # An edge is one-way when its reverse edge doesn't exist
+        n = self.num_nodes
+        oneway = ~np.isin(self.v * n + self.u, self.u * n + self.v)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                    '<key id="d0" for="graph" attr.name="crs" attr.type="string"/>\n'
+                    '<key id="d1" for="node" attr.name="y" attr.type="string"/>\n'
+                    '<key id="d2" for="node" attr.name="x" attr.type="string"/>\n'
+                    '<key id="d3" for="edge" attr.name="osmid" attr.type="string"/>\n'
+                    '<key id="d4" for="edge" attr.name="highway" attr.type="string"/>\n'
+                    '<key id="d5" for="edge" attr.name="oneway" attr.type="string"/>\n'
+                    '<key id="d6" for="edge" attr.name="length" attr.type="string"/>\n'
+                    f'<graph edgedefault="directed" id="{escape(self.name)}">\n'
+                    '<data key="d0">epsg:4326</data>\n')
+            for start in range(0, self.num_nodes, chunk_size):
+                stop = min(start + chunk_size, self.num_nodes)
+                f.write("".join(
+                    f'<node id="{i}"><data key="d1">{y!r}</data><data key="d2">{x!r}</data></node>\n'
+                    for i, y, x in zip(range(start, stop), lat[start:stop].tolist(), lon[start:stop].tolist())))
+            for start in range(0, self.num_edges, chunk_size):
+                stop = min(start + chunk_size, self.num_edges)
+                f.write("".join(
+                    f'<edge source="{a}" target="{b}" id="0"><data key="d3">{i}</data>'
+                    f'<data key="d4">{ROAD_CLASSES[c]}</data><data key="d5">{o}</data>'
+                    f'<data key="d6">{w:.3f}</data></edge>\n'
+                    for i, a, b, w, c, o in zip(range(start, stop), self.u[start:stop].tolist(),
+                                                self.v[start:stop].tolist(), self.length[start:stop].tolist(),
+                                                self.road_class[start:stop].tolist(),
+                                                oneway[start:stop].tolist())))
+            f.write("</graph>\n</graphml>\n")
+        return path
+
+
+def _orient_streets(a, b, road_class, rng, oneway_fraction):
+    """Turn undirected streets into directed edges: both directions, or one random direction for one-way streets."""
+    oneway = rng.random(len(a)) < oneway_fraction
+    flip = oneway & (rng.random(len(a)) < 0.5)
+    a, b = np.where(flip, b, a), np.where(flip, a, b)
+    two_way = ~oneway
+    u = np.concatenate([a, b[two_way]])
+    v = np.concatenate([b, a[two_way]])
+    return u, v, np.concatenate([road_class, road_class[two_way]])
+
+
+def _side(num_nodes, spacing):
+    return math.sqrt(num_nodes) * spacing
+
+
+def perturbed_grid(num_nodes, seed=0, spacing=STREET_SPACING_M, jitter=0.25, drop=0.1,
+                   oneway_fraction=ONEWAY_FRACTION, origin=DEFAULT_ORIGIN):
+    """
+    Jittered street grid with missing blocks and arterials.
+
+    Args:
+        num_nodes: Approximate number of intersections (rounded to a square grid)
+        seed: Random seed
+        spacing: Block size in metres
+        jitter: Standard deviation of intersection displacement, in blocks
+        drop: Fraction of street segments removed
+        oneway_fraction: Fraction of remaining segments that are one-way
+        origin: (lat, lon) of the grid's south-west corner
+
+    Returns:
+        SyntheticNetwork restricted to its largest strongly connected component
+    """
+    rng = np.random.default_rng(seed)
+    cols = max(2, int(round(math.sqrt(num_nodes))))
+    rows = max(2, int(math.ceil(num_nodes / cols)))
+    idx = np.arange(rows * cols).reshape(rows, cols)
+    gy, gx = np.divmod(np.arange(rows * cols), cols)
+    x = (gx + rng.normal(0, jitter, rows * cols)) * spacing
+    y = (gy + rng.normal(0, jitter, rows * cols)) * spacing
+
+    # Horizontal then vertical segments; arterial rows/columns are secondary roads
+    a = np.concatenate([idx[:, :-1].ravel(), idx[:-1, :].ravel()])
+    b = np.concatenate([idx[:, 1:].ravel(), idx[1:, :].ravel()])
+    road_class = np.concatenate([
+        np.repeat((np.arange(rows) % ARTERIAL_EVERY == 0).astype(np.uint8), cols - 1),
+        np.tile((np.arange(cols) % ARTERIAL_EVERY == 0).astype(np.uint8), rows - 1),
+    ])
+    # Arterials are never dropped and stay two-way
+    keep = (road_class == 1) | (rng.random(len(a)) >= drop)
+    a, b, road_class = a[keep], b[keep], road_class[keep]
+    u, v, road_class = _orient_streets(a, b, road_class, rng, np.where(road_class == 1, 0.0, oneway_fraction))
+    return SyntheticNetwork(f"grid_{num_nodes}_s{seed}", x, y, u, v, road_class, origin).largest_component()
+
+
+def random_geometric(num_nodes, seed=0, mean_degree=6.0, spacing=STREET_SPACING_M,
+                     oneway_fraction=ONEWAY_FRACTION, origin=DEFAULT_ORIGIN):
+    """
+    Random geometric graph: uniform intersections joined when closer than a radius.
+
+    The radius is chosen from the point density so the expected number of
+    neighbours is ``mean_degree``; pairs are found with a k-d tree. Below a
+    mean degree of about 4.5 (the percolation threshold) the graph falls apart
+    into small pieces, so the default stays well above it.
+    """
+    scipy = _require_scipy()
+    rng = np.random.default_rng(seed)
+    side = _side(num_nodes, spacing)
+    points = rng.random((num_nodes, 2)) * side
+    radius = spacing * math.sqrt(mean_degree / math.pi)
+    pairs = scipy.spatial.cKDTree(points).query_pairs(radius, output_type="ndarray")
+    road_class = np.zeros(len(pairs), dtype=np.uint8)
+    u, v, road_class = _orient_streets(pairs[:, 0], pairs[:, 1], road_class, rng, oneway_fraction)
+    return SyntheticNetwork(f"geometric_{num_nodes}_s{seed}", points[:, 0], points[:, 1], u, v,
+                            road_class, origin).largest_component()
+
+
+def delaunay_network(num_nodes, seed=0, drop=0.3, max_length_factor=3.0, spacing=STREET_SPACING_M,
+                     oneway_fraction=ONEWAY_FRACTION, origin=DEFAULT_ORIGIN):
+    """
+    Planar network from a Delaunay triangulation of random intersections.
+
+    Triangulation edges longer than ``max_length_factor`` times the median
+    (slivers along the hull) are removed, then a ``drop`` fraction of the rest
+    so the mean degree comes down from ~6 towards that of real street networks.
+    """
+    scipy = _require_scipy()
+    rng = np.random.default_rng(seed)
+    side = _side(num_nodes, spacing)
+    points = rng.random((num_nodes, 2)) * side
+    simplices = scipy.spatial.Delaunay(points).simplices
+    a = np.concatenate([simplices[:, 0], simplices[:, 1], simplices[:, 2]])
+    b = np.concatenate([simplices[:, 1], simplices[:, 2], simplices[:, 0]])
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    key = np.unique(lo.astype(np.int64) * num_nodes + hi)
+    a, b = np.divmod(key, num_nodes)
+
+    length = np.hypot(*(points[a] - points[b]).T)
+    keep = (length <= max_length_factor * np.median(length)) & (rng.random(len(a)) >= drop)
+    a, b = a[keep], b[keep]
+    road_class = np.zeros(len(a), dtype=np.uint8)
+    u, v, road_class = _orient_streets(a, b, road_class, rng, oneway_fraction)
+    return SyntheticNetwork(f"delaunay_{num_nodes}_s{seed}", points[:, 0], points[:, 1], u, v,
+                            road_class, origin).largest_component()
+
+
+GENERATORS = {
+    "grid": perturbed_grid,
+    "geometric": random_geometric,
+    "delaunay": delaunay_network,
+}
+
+
+def generate(kind, num_nodes, seed=0, **kwargs):
+    """Generate a network by generator name (see GENERATORS)."""
+    try:
+        generator = GENERATORS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown generator {kind!r}; choose from {sorted(GENERATORS)}") from None
+    return generator(num_nodes, seed=seed, **kwargs)
+
+
+def synthetic_corpus(kinds=tuple(GENERATORS), sizes=(1000, 10000, 100000), seed=0):
+    """Yield (name, NetworkX graph) for every kind and size, e.g. for Main.benchmark.run_suite."""
+    for kind in kinds:
+        for size in sizes:
+            network = generate(kind, size, seed=seed)
+            yield network.name, network.to_networkx()
+
+
+def main():
+    import time
+
+    print("--- Synthetic road networks ---")
+    for kind in GENERATORS:
+        for size in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+            start = time.perf_counter()
+            network = generate(kind, size)
+            elapsed = time.perf_counter() - start
+            print(f"{kind:<10} {size:>8} requested -> {network.num_nodes:>8} nodes, {network.num_edges:>8} edges "
+                  f"({network.num_edges / max(network.num_nodes, 1):.2f} out-edges/node) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import json
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+TRACE_FORMAT_VERSION = 1
+CHUNK_EVENTS = 65536  # events buffered in memory before a column flush
+
+# Step kinds recorded by PathAlgorithms, stored as their index in this tuple
+EVENT_TYPES = ("examine", "skip", "visit", "target_reached", "check_neighbor", "update",
+               "iteration", "check_edge", "early_termination", "negative_cycle")
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+# One file per column. Which fields an event uses:
+#   examine            u, dist
+#   skip/visit/target  u
+#   check_neighbor     u=current, v=neighbor, dist=old distance, alt_dist=new distance
+#   update             u=node, v=predecessor, dist=new distance
+#   iteration/early_termination   iteration
+#   check_edge         u, v, dist=dist[u], alt_dist=dist[v], weight
+#   negative_cycle     u, v
+# ``iteration`` is filled for every event: the Bellman-Ford pass, or for Dijkstra the
+# number of heap pops so far. Unused node fields are -1, unused floats NaN.
+TRACE_COLUMNS = (
+    ("event", "u1"),
+    ("iteration", "<u4"),
+    ("u", "<i4"),
+    ("v", "<i4"),
+    ("dist", "<f8"),
+    ("alt_dist", "<f8"),
+    ("weight", "<f8"),
+)
+TRACE_DTYPE = np.dtype(list(TRACE_COLUMNS))
+
+
+class TraceWriter:
+    """
+    Streams algorithm steps to a columnar trace directory.
+
+    Steps are encoded into a fixed-size structured buffer and each column is
+    appended to its own raw file whenever the buffer fills, so memory stays
+    bounded by ``chunk_size`` regardless of trace length. Nodes are stored as
+    indices into a node table written on close. The writer has an ``append``
+    method, so it can be passed as the ``steps`` sink of PathAlgorithms and the
+    trace never has to exist as a Python list.
+    """
+
+    def __init__(self, path, metadata=None, nodes=None, chunk_size=CHUNK_EVENTS):
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+
+        # Node table: given up front (graph order) or grown on first sight
+        self.nodes = list(nodes) if nodes is not None else []
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+
+        self._buffer = np.empty(chunk_size, dtype=TRACE_DTYPE)
+        self._fill = 0
+        self.count = 0
+        self._iteration = 0
+        self._files = {name: open(os.path.join(path, f"{name}.bin"), "wb") for name, _ in TRACE_COLUMNS}
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _node(self, node):
+        if node is None:
+            return -1
+        index = self.node_index.get(node)
+        if index is None:
+            index = self.node_index[node] = len(self.nodes)
+            self.nodes.append(node)
+        return index
+
+    def append(self, step):
+        """Encode one step tuple."""
+        kind = step[0]
+        u = v = -1
+        dist = alt_dist = weight = np.nan
+
+        if kind == "examine":
+            self._iteration += 1
+            u, dist = self._node(step[1]), step[2]
+        elif kind in ("skip", "visit", "target_reached"):
+            u = self._node(step[1])
+        elif kind == "check_neighbor":
+            u, v, dist, alt_dist = self._node(step[1]), self._node(step[2]), step[3], step[4]
+        elif kind == "update":
+            u, dist, v = self._node(step[1]), step[2], self._node(step[3])
+        elif kind in ("iteration", "early_termination"):
+            self._iteration = step[1]
+        elif kind == "check_edge":
+            u, v = self._node(step[1]), self._node(step[2])
+            dist, alt_dist, weight = step[3], step[4], step[5]
+        elif kind == "negative_cycle":
+            u, v = self._node(step[1]), self._node(step[2])
+        else:
+            raise ValueError(f"Unknown step type: {kind!r}")
+
+        self._buffer[self._fill] = (EVENT_CODES[kind], self._iteration, u, v, dist, alt_dist, weight)
+        self._fill += 1
+        self.count += 1
+        if self._fill == self.chunk_size:
+            self._flush()
+
+    def extend(self, steps):
+        for step in steps:
+            self.append(step)
+
+    def _flush(self):
+        if not self._fill:
+            return
+        chunk = self._buffer[:self._fill]
+        for name, _ in TRACE_COLUMNS:
+            # Copy to a contiguous column so each file is a plain array of one dtype
+            np.ascontiguousarray(chunk[name]).tofile(self._files[name])
+        self._fill = 0
+
+    def close(self):
+        """Flush remaining events and write the node table and metadata."""
+        if self.closed:
+            return
+        self._flush()
+        for f in self._files.values():
+            f.close()
+        np.save(os.path.join(self.path, "nodes.npy"), np.asarray(self.nodes))
+        meta = {
+            "format_version": TRACE_FORMAT_VERSION,
+            "count": self.count,
+            "columns": [list(c) for c in TRACE_COLUMNS],
+            "event_types": list(EVENT_TYPES),
+            "metadata": self.metadata,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+        self.closed = True
+
+
+class TraceSteps(Sequence):
+    """
+    Read-only sequence of step tuples decoded lazily from a ``TraceReader``.
+
+    Slices are decoded in bulk, and indexing decodes the whole ``block_size``
+    block holding the index and keeps the last block, so walking the steps by
+    index (as ``StepReplay.advance`` does) costs about as much as iterating.
+    """
+
+    def __init__(self, reader, block_size=CHUNK_EVENTS):
+        self.reader = reader
+        self.block_size = block_size
+        self._block_start = None
+        self._block = []
+
+    def __len__(self):
+        return len(self.reader)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            if indices.step == 1:
+                return list(self.reader.iter_steps(indices.start, indices.stop))
+            return [self[i] for i in indices]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start = index - index % self.block_size
+        if start != self._block_start:
+            self._block = list(self.reader.iter_steps(start, start + self.block_size))
+            self._block_start = start
+        return self._block[index - start]
+
+    def __iter__(self):
+        return self.reader.iter_steps()
+
+
+class TraceReader:
+    """
+    Lazy reader for a trace directory written by ``TraceWriter``.
+
+    Columns are memory-mapped on first access, so analysing one column of a
+    multi-million-event trace only pages in that column. ``steps`` decodes
+    events back into the tuples PathAlgorithms produces, which makes a stored
+    trace usable wherever a step list is, e.g. ``StepReplay``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != TRACE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported trace format version: {meta.get('format_version')}")
+        self.count = meta["count"]
+        self.columns = [tuple(c) for c in meta["columns"]]
+        self.event_types = tuple(meta["event_types"])
+        self.metadata = meta["metadata"]
+        self._columns = {}
+        self._nodes = None
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        """Memory-mapped array of one column."""
+        array = self._columns.get(name)
+        if array is None:
+            dtype = dict(self.columns)[name]
+            if self.count == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=dtype, mode="r",
+                                  shape=(self.count,))
+            self._columns[name] = array
+        return array
+
+    @property
+    def nodes(self):
+        """Node table; node columns hold indices into it."""
+        if self._nodes is None:
+            self._nodes = np.load(os.path.join(self.path, "nodes.npy")).tolist()
+        return self._nodes
+
+    def records(self, start=0, stop=None):
+        """Structured array of events[start:stop] (copied out of the column files)."""
+        stop = self.count if stop is None else min(stop, self.count)
+        out = np.empty(max(0, stop - start), dtype=np.dtype(self.columns))
+        for name, _ in self.columns:
+            out[name] = self.column(name)[start:stop]
+        return out
+
+    def event_counts(self):
+        """Dictionary of event type -> number of events."""
+        counts = np.bincount(self.column("event"), minlength=len(self.event_types))
+        return {name: int(n) for name, n in zip(self.event_types, counts)}
+
+    def _decode(self, kind, iteration, u, v, dist, alt_dist, weight):
+        nodes = self.nodes
+        if kind == "examine":
+            return kind, nodes[u], dist
+        if kind in ("skip", "visit", "target_reached"):
+            return kind, nodes[u]
+        if kind == "check_neighbor":
+            return kind, nodes[u], nodes[v], dist, alt_dist
+        if kind == "update":
+            return kind, nodes[u], dist, nodes[v]
+        if kind in ("iteration", "early_termination"):
+            return kind, iteration
+        if kind == "check_edge":
+            return kind, nodes[u], nodes[v], dist, alt_dist, weight
+        return kind, nodes[u], nodes[v]  # negative_cycle
+
+    def step(self, index):
+        """Decode a single event into its step tuple."""
+        row = self.records(index, index + 1)[0]
+        return self._decode(self.event_types[row["event"]], int(row["iteration"]), int(row["u"]),
+                            int(row["v"]), float(row["dist"]), float(row["alt_dist"]),
+                            float(row["weight"]))
+
+    def iter_steps(self, start=0, stop=None, chunk_size=CHUNK_EVENTS):
+        """Decode events[start:stop] into step tuples, one chunk at a time."""
+        stop = self.count if stop is None else min(stop, self.count)
+        event_types = self.event_types
+        for chunk_start in range(start, stop, chunk_size):
+            chunk = self.records(chunk_start, min(chunk_start + chunk_size, stop))
+            columns = [chunk[name].tolist() for name, _ in self.columns]
+            for event, iteration, u, v, dist, alt_dist, weight in zip(*columns):
+                yield self._decode(event_types[event], iteration, u, v, dist, alt_dist, weight)
+
+    def steps(self):
+        return TraceSteps(self)
+
+
+def write_trace(path, steps, metadata=None, nodes=None):
+    """Write an in-memory step list as a trace; returns the number of events written."""
+    with TraceWriter(path, metadata=metadata, nodes=nodes) as writer:
+        writer.extend(steps)
+    return writer.count
+
+
+def record_run(path, G, algorithm, source, target, weight='length', metadata=None):
+    """
+    Run a PathAlgorithms algorithm with its steps streamed straight to a trace.
+
+    Args:
+        path: Trace directory to write
+        G: NetworkX graph
+        algorithm: "dijkstra" or "bellman_ford"
+        source: Source node
+        target: Target node
+        weight: Edge weight attribute
+        metadata: Extra metadata stored with the trace (e.g. the graph name)
+
+    Returns:
+        Tuple of (dist, prev, number of events written)
+    """
+    from Main.Algorithms.pathAlgorithms import PathAlgorithms
+
+    run = {"dijkstra": PathAlgorithms.dijkstra, "bellman_ford": PathAlgorithms.bellman_ford}[algorithm]
+    meta = dict(metadata or {}, algorithm=algorithm, source=source, target=target, weight=weight,
+                nodes=G.number_of_nodes(), edges=G.number_of_edges())
+    with TraceWriter(path, metadata=meta, nodes=G.nodes()) as writer:
+        dist, prev, _ = run(G, source, target, weight, steps=writer)
+    return dist, prev, writer.count
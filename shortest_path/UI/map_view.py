@@ -1,9 +1,26 @@
+import os
+import time
+
 import customtkinter as ctk
 import tkintermapview
 from tkinter import TclError
 from Main.autocomplete import AutocompleteEntry
 from Main.locate import LocationHandler
 from Main.graph_builder import OptimizedGraphBuilder
+from Main.explanation import PagedExplanation, SEARCH_CHUNK_STEPS
+from Main.performance_metrics import metrics, timed
+
+DEBUG_PLACEHOLDER = "Debug…"
+DEBUG_SLOW_MS = 2000  # auto-capture threshold used when switched on from the debug menu
+DEBUG_ACTIONS = (
+    "Profile next operation",
+    "Profile next 5 operations",
+    "Sample next operation",
+    "Toggle slow-operation capture",
+    "Toggle operation counters",
+    "Show stage timings",
+    "Save Chrome trace",
+)
 
 
 class MapViewApp:
@@ -65,10 +82,16 @@ class MapViewApp:
         # Theme control variables
         self.selected_algorithm = ctk.StringVar(master=self.main, value="none")
         self.theme_var = ctk.StringVar(master=self.main, value="Dark")
+        self.debug_var = ctk.StringVar(master=self.main, value=DEBUG_PLACEHOLDER)
         self.show_all_var = ctk.BooleanVar(master=self.main, value=False)
 
         # Track application state
         self.graph_loaded = False
+        self.replay = None
+        self.explanation = None
+        self.explanation_page = 0
+        self.search_position = 0
+        self._search_job = None
 
         # Initialize UI
         current_theme = self.theme_var.get()
@@ -93,6 +116,7 @@ class MapViewApp:
 
         # Build components in each panel
         self.build_theme_selector()
+        self.build_debug_menu()
         self.build_option_controls()
         self.build_entry_widgets()
         self.build_map_container()
@@ -157,6 +181,61 @@ class MapViewApp:
         )
         self.theme_selector.pack(side="left", fill="x", expand=True)
 
+    def build_debug_menu(self):
+        """Build the debug dropdown: profiling, operation counters and stage timings"""
+        debug_frame = ctk.CTkFrame(self.left_panel, fg_color="transparent")
+        debug_frame.pack(fill="x", pady=(0, 15))
+
+        self.debug_menu = ctk.CTkOptionMenu(
+            master=debug_frame,
+            values=list(DEBUG_ACTIONS),
+            variable=self.debug_var,
+            command=self.handle_debug,
+            width=120,
+            height=30,
+            font=self.default_font
+        )
+        self.debug_menu.pack(side="left", fill="x", expand=True)
+
+    def handle_debug(self, action):
+        """Run a debug menu action and report it in the output panel"""
+        self.debug_var.set(DEBUG_PLACEHOLDER)
+        builder = self.graph_builder
+        profiler = builder.profiler
+
+        if action == "Profile next operation":
+            profiler.arm(1, "cprofile")
+            message = f"cProfile armed for the next build/route; .prof files go to {profiler.output_dir}"
+        elif action == "Profile next 5 operations":
+            profiler.arm(5, "cprofile")
+            message = f"cProfile armed for the next 5 builds/routes; .prof files go to {profiler.output_dir}"
+        elif action == "Sample next operation":
+            profiler.arm(1, "sample")
+            message = f"Sampling profiler armed; collapsed stacks go to {profiler.output_dir}"
+        elif action == "Toggle slow-operation capture":
+            if profiler.slow_threshold is None:
+                profiler.slow_threshold = float(os.environ.get("PROFILE_SLOW_MS", DEBUG_SLOW_MS)) / 1000
+                message = f"Capturing stacks of stages slower than {profiler.slow_threshold * 1e3:.0f} ms"
+            else:
+                profiler.slow_threshold = None
+                message = "Slow-operation capture off"
+        elif action == "Toggle operation counters":
+            builder.count_operations = not builder.count_operations
+            message = f"Operation counters {'on' if builder.count_operations else 'off'} for the next runs"
+        elif action == "Show stage timings":
+            message = metrics.format_summary() if metrics.summary() else "No stages timed yet"
+            if profiler.saved:
+                message += "\n\nProfiles saved:\n" + "\n".join(profiler.saved[-10:])
+        elif action == "Save Chrome trace":
+            os.makedirs(profiler.output_dir, exist_ok=True)
+            path = os.path.join(profiler.output_dir, f"trace_{time.strftime('%Y%m%d-%H%M%S')}.json")
+            message = f"Chrome trace written to {metrics.dump_chrome_trace(path)}"
+        else:
+            return
+        self.reset_explanation()
+        self.text_output.delete("1.0", "end")
+        self.text_output.insert("end", message + "\n")
+
     def handle_theme(self, theme):
         """Handle theme change event"""
         # Update appearance mode
@@ -176,7 +255,7 @@ class MapViewApp:
         self.update_map_theme(theme)
 
         # Update other UI elements
-        for entry in [self.entry_from, self.entry_to]:
+        for entry in [self.entry_from, self.entry_to, self.search_entry, self.jump_entry]:
             entry.configure(
                 fg_color=config["entry_fg"],
                 border_color=config["border"],
@@ -189,7 +268,12 @@ class MapViewApp:
             self.button_bellman,
             self.search_from_button,
             self.search_to_button,
-            self.show_graph_button
+            self.show_graph_button,
+            self.replay_button,
+            self.prev_page_button,
+            self.next_page_button,
+            self.search_button,
+            self.jump_button
         ]:
             button.configure(
                 fg_color=config["button"],
@@ -201,6 +285,7 @@ class MapViewApp:
             border_color=config["border"],
             border_width=config["text_border_width"]
         )
+        self.text_output.tag_config("step_highlight", background=config["hover"])
 
     def build_entry_widgets(self):
         """Build location entry widgets"""
@@ -393,6 +478,59 @@ class MapViewApp:
         )
         self.show_graph_button.pack(fill="x", pady=5)
 
+        self.build_replay_controls()
+
+    def build_replay_controls(self):
+        """Build replay controls for animating the last algorithm run on the map"""
+        config = self.default_colors[self.theme_var.get()]
+
+        replay_frame = ctk.CTkFrame(self.right_panel, fg_color="transparent")
+        replay_frame.pack(fill="x", pady=(20, 0))
+
+        replay_label = ctk.CTkLabel(
+            replay_frame,
+            text="Replay",
+            font=("Helvetica", 14, "bold")
+        )
+        replay_label.pack(anchor="w", pady=(0, 10))
+
+        self.replay_button = ctk.CTkButton(
+            master=replay_frame,
+            text="Play ▶",
+            width=150,
+            height=40,
+            font=self.default_font,
+            fg_color=config["button"],
+            hover_color=config["hover"],
+            state="disabled",  # Enabled after an algorithm run
+            command=self.toggle_replay
+        )
+        self.replay_button.pack(fill="x", pady=5)
+
+        # Speed slider on a log scale: 10^0 .. 10^5 steps per second
+        speed_label = ctk.CTkLabel(replay_frame, text="Speed", font=self.default_font)
+        speed_label.pack(anchor="w")
+        self.replay_speed_slider = ctk.CTkSlider(
+            master=replay_frame,
+            from_=0,
+            to=5,
+            command=self.set_replay_speed
+        )
+        self.replay_speed_slider.set(2.3)
+        self.replay_speed_slider.pack(fill="x", pady=5)
+
+        self.replay_progress_label = ctk.CTkLabel(replay_frame, text="Step 0 / 0", font=self.default_font)
+        self.replay_progress_label.pack(anchor="w")
+        self.replay_seek_slider = ctk.CTkSlider(
+            master=replay_frame,
+            from_=0,
+            to=1,
+            command=self.seek_replay,
+            state="disabled"
+        )
+        self.replay_seek_slider.set(0)
+        self.replay_seek_slider.pack(fill="x", pady=5)
+
     def build_text_output(self):
         """Build text output widget"""
         config = self.default_colors[self.theme_var.get()]
@@ -412,6 +550,90 @@ class MapViewApp:
             border_width=config["text_border_width"]
         )
         self.text_output.pack(fill="x", expand=False)
+        self.text_output.tag_config("step_highlight", background=config["hover"])
+        self.text_output.bind("<Prior>", lambda e: self.show_explanation_page(self.explanation_page - 1))
+        self.text_output.bind("<Next>", lambda e: self.show_explanation_page(self.explanation_page + 1))
+
+        self.build_explanation_controls()
+
+    def build_explanation_controls(self):
+        """Build page, search and jump-to-step controls for long explanations"""
+        config = self.default_colors[self.theme_var.get()]
+
+        nav_frame = ctk.CTkFrame(self.center_panel, fg_color="transparent")
+        nav_frame.pack(fill="x", pady=(5, 0))
+
+        self.prev_page_button = ctk.CTkButton(
+            master=nav_frame,
+            text="◀",
+            width=40,
+            font=self.default_font,
+            fg_color=config["button"],
+            hover_color=config["hover"],
+            state="disabled",
+            command=lambda: self.show_explanation_page(self.explanation_page - 1)
+        )
+        self.prev_page_button.pack(side="left")
+
+        self.page_label = ctk.CTkLabel(nav_frame, text="Page 0 / 0", font=self.default_font)
+        self.page_label.pack(side="left", padx=10)
+
+        self.next_page_button = ctk.CTkButton(
+            master=nav_frame,
+            text="▶",
+            width=40,
+            font=self.default_font,
+            fg_color=config["button"],
+            hover_color=config["hover"],
+            state="disabled",
+            command=lambda: self.show_explanation_page(self.explanation_page + 1)
+        )
+        self.next_page_button.pack(side="left")
+
+        self.jump_button = ctk.CTkButton(
+            master=nav_frame,
+            text="Go",
+            width=40,
+            font=self.default_font,
+            fg_color=config["button"],
+            hover_color=config["hover"],
+            state="disabled",
+            command=self.jump_to_step
+        )
+        self.jump_button.pack(side="right")
+        self.jump_entry = ctk.CTkEntry(
+            nav_frame,
+            width=80,
+            placeholder_text="Step #",
+            font=self.default_font,
+            fg_color=config["entry_fg"],
+            border_color=config["border"],
+            border_width=config["text_border_width"]
+        )
+        self.jump_entry.pack(side="right", padx=(10, 5))
+        self.jump_entry.bind("<Return>", lambda e: self.jump_to_step())
+
+        self.search_button = ctk.CTkButton(
+            master=nav_frame,
+            text="Find",
+            width=60,
+            font=self.default_font,
+            fg_color=config["button"],
+            hover_color=config["hover"],
+            state="disabled",
+            command=self.search_explanation
+        )
+        self.search_button.pack(side="right")
+        self.search_entry = ctk.CTkEntry(
+            nav_frame,
+            placeholder_text="Search steps",
+            font=self.default_font,
+            fg_color=config["entry_fg"],
+            border_color=config["border"],
+            border_width=config["text_border_width"]
+        )
+        self.search_entry.pack(side="right", fill="x", expand=True, padx=(10, 5))
+        self.search_entry.bind("<Return>", lambda e: self.search_explanation())
 
     def handle_location_selected(self, event):
         """Handle location selection event"""
@@ -434,6 +656,7 @@ class MapViewApp:
             fg_color=selected_color if algo_name == "bellman-ford" else unselected_color
         )
 
+    @timed("show_graph")
     def show_graph(self):
         """Display the graph for the selected route without running algorithm"""
         marker_from = self.locator.markers.get("FROM")
@@ -451,6 +674,8 @@ class MapViewApp:
         self.text_output.insert("end", f"Building graph from {start} to {end}...\n")
 
         # Build the graph but don't run any algorithm yet
+        self.reset_replay()
+        self.reset_explanation()
         try:
             # Build the graph and display it
             self.graph_builder.build_graph(start, end)
@@ -468,6 +693,7 @@ class MapViewApp:
             self.text_output.insert("end", f"Error building graph: {str(e)}\n")
             self.graph_loaded = False
 
+    @timed("run_algorithm")
     def execute_algorithm(self):
         """Execute the selected algorithm on the loaded graph"""
         if not self.graph_loaded:
@@ -481,6 +707,7 @@ class MapViewApp:
             self.text_output.insert("end", "⚠️ Select an algorithm first.\n")
             return
 
+        self.reset_explanation()
         self.text_output.delete("1.0", "end")
         self.text_output.insert("end", f"Running {algo.title()} algorithm...\n")
 
@@ -492,15 +719,152 @@ class MapViewApp:
                 # Fixed method name (it was defined but not called correctly)
                 path, explanation = self.graph_builder.run_bellman_ford()
 
-            # Insert the step-by-step explanation
-            if explanation:
+            # Show the step-by-step explanation; long traces are paged
+            if isinstance(explanation, PagedExplanation):
+                self.show_explanation(explanation)
+            elif explanation:
                 self.text_output.insert("end", explanation)
             else:
                 self.text_output.insert("end", "No path found or no explanation available.\n")
 
+            self.prepare_replay("dijkstra" if algo == "dijkstra" else "bellman_ford")
+
         except Exception as e:
             self.text_output.insert("end", f"Error running algorithm: {str(e)}\n")
 
+    def show_explanation(self, explanation):
+        """Show a paged explanation, starting at its first page"""
+        self.explanation = explanation
+        self.search_position = 0
+        for widget in [self.prev_page_button, self.next_page_button, self.search_button, self.jump_button]:
+            widget.configure(state="normal")
+        self.show_explanation_page(0)
+
+    def show_explanation_page(self, number, highlight_step=None):
+        """Render a single page of the explanation; only that page's steps are formatted"""
+        if self.explanation is None:
+            return "break"
+        number = max(0, min(number, self.explanation.page_count - 1))
+        self.explanation_page = number
+        text, step_lines = self.explanation.page(number)
+        start, stop = self.explanation.page_range(number)
+
+        self.text_output.delete("1.0", "end")
+        self.text_output.insert("end", text)
+        self.page_label.configure(
+            text=f"Page {number + 1:,} / {self.explanation.page_count:,}  "
+                 f"(steps {min(start + 1, stop):,}–{stop:,} of {len(self.explanation):,})")
+
+        if highlight_step is not None and start <= highlight_step < stop:
+            line = step_lines[highlight_step - start] + 1  # Tk lines are 1-based
+            self.text_output.tag_add("step_highlight", f"{line}.0", f"{line}.end")
+            self.text_output.see(f"{line}.0")
+        # Stop Tk's own PageUp/PageDown handling when bound to the textbox
+        return "break"
+
+    def jump_to_step(self):
+        """Show the page holding the step number typed into the jump entry"""
+        if self.explanation is None or not len(self.explanation):
+            return
+        try:
+            step = int(self.jump_entry.get().strip().replace(",", "")) - 1
+        except ValueError:
+            return
+        step = max(0, min(step, len(self.explanation) - 1))
+        self.show_explanation_page(self.explanation.page_of(step), highlight_step=step)
+
+    def search_explanation(self):
+        """Find the next step containing the search text, scanning in chunks between Tk events"""
+        if self.explanation is None or not self.search_entry.get().strip():
+            return
+        self._cancel_search()
+        query = self.search_entry.get().strip()
+        start = self.search_position
+        if start >= len(self.explanation):
+            start = 0
+        self.page_label.configure(text="Searching...")
+        self._search_job = self.main.after(1, self._search_chunk, query, start, start, False)
+
+    def _search_chunk(self, query, position, origin, wrapped):
+        self._search_job = None
+        explanation = self.explanation
+        if explanation is None:
+            return
+        # After wrapping around, only scan up to where the search began
+        limit = origin - position if wrapped else len(explanation) - position
+        match, position = explanation.find(query, position, min(SEARCH_CHUNK_STEPS, limit))
+        if match is not None:
+            self.search_position = match + 1
+            self.show_explanation_page(explanation.page_of(match), highlight_step=match)
+        elif wrapped and position >= origin:
+            self.show_explanation_page(self.explanation_page)
+            self.page_label.configure(text=f"No step matches \"{query}\"")
+        elif position >= len(explanation):
+            self._search_job = self.main.after(1, self._search_chunk, query, 0, origin, True)
+        else:
+            self._search_job = self.main.after(1, self._search_chunk, query, position, origin, wrapped)
+
+    def _cancel_search(self):
+        if self._search_job is not None:
+            self.main.after_cancel(self._search_job)
+            self._search_job = None
+
+    def reset_explanation(self):
+        """Drop the paged explanation and disable its controls"""
+        self._cancel_search()
+        self.explanation = None
+        self.explanation_page = 0
+        for widget in [self.prev_page_button, self.next_page_button, self.search_button, self.jump_button]:
+            widget.configure(state="disabled")
+        self.page_label.configure(text="Page 0 / 0")
+
+    def prepare_replay(self, algorithm):
+        """Set up the replay of a finished run and enable its controls"""
+        try:
+            self.replay = self.graph_builder.create_replay(
+                algorithm,
+                on_progress=self.update_replay_progress,
+                on_finish=lambda: self.replay_button.configure(text="Play ▶"),
+                # Seeking stays disabled until the keyframes are built
+                on_ready=lambda: self.replay_seek_slider.configure(state="normal")
+            )
+        except RuntimeError:
+            self.replay = None
+            return
+        self.set_replay_speed(self.replay_speed_slider.get())
+        self.replay_button.configure(state="normal", text="Play ▶")
+        if not self.replay.ready:
+            self.replay_seek_slider.configure(state="disabled")
+        self.update_replay_progress(0, len(self.replay.replay))
+
+    def toggle_replay(self):
+        """Play or pause the replay"""
+        if self.replay is None:
+            return
+        self.replay.toggle()
+        self.replay_button.configure(text="Pause ⏸" if self.replay.playing else "Play ▶")
+
+    def set_replay_speed(self, value):
+        """Slider callback: value is log10 of steps per second"""
+        if self.replay is not None:
+            self.replay.set_speed(int(10 ** float(value)))
+
+    def seek_replay(self, value):
+        """Slider callback: jump to a fraction of the recorded steps"""
+        if self.replay is not None:
+            self.replay.seek(int(float(value) * len(self.replay.replay)))
+
+    def update_replay_progress(self, position, total):
+        self.replay_progress_label.configure(text=f"Step {position:,} / {total:,}")
+        if total:
+            self.replay_seek_slider.set(position / total)
+
+    def reset_replay(self):
+        """Disable replay controls; the builder clears the animation with the graph"""
+        self.replay = None
+        self.replay_button.configure(state="disabled", text="Play ▶")
+        self.replay_seek_slider.configure(state="disabled")
+
     def search_from_location(self):
         """Handle 'From' location search"""
         self.locator.search_location(self.entry_from.get(), "FROM")
@@ -521,6 +885,10 @@ class MapViewApp:
 
     def on_closing(self):
         """Handle window close event"""
+        if metrics.summary():
+            # Printed rather than logged: the root logger's level is set by whichever
+            # module calls basicConfig first, which may hide INFO records
+            print(f"Stage latencies this session:\n{metrics.format_summary()}")
         self.main.destroy()
 
     def run(self):